@@ -0,0 +1,46 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables.
+
+    An exact `COUNT(*)` reads every matching row, so on PostgreSQL the count
+    is taken from the planner's row estimate (`EXPLAIN`, which reads the
+    table statistics) and only counted exactly when the estimate is below
+    `exact_count_threshold`, where that is cheap and page links should be
+    precise. Other backends always count exactly.
+    """
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.get_estimated_count()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def get_estimated_count(self) -> int | None:
+        """
+        Return the planner's estimate of the number of rows of the object
+        list, or `None` when it can not be estimated.
+        """
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            (plan,) = cursor.fetchone()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class BaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "base"
+
+    def ready(self):
+        from .cache import check_shared_cache
+        from .metrics import install_query_recorder
+
+        connection_created.connect(install_query_recorder)
+        if settings.DATABASE_REPLICAS:
+            check_shared_cache("DATABASE_REPLICA_CACHE_ALIAS")
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_MISSING = object()
+
+# Cache backends whose entries only exist in the process that set them.
+PROCESS_LOCAL_CACHE_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def check_shared_cache(setting: str) -> None:
+    """
+    Raise `ImproperlyConfigured` when the cache alias named by `setting` is
+    process-local and DEBUG is off.
+
+    Caches invalidated by the process that handles a write must be shared,
+    or the other processes keep serving what they cached before it. A
+    process-local cache is only accepted for a single development server.
+    """
+    alias = getattr(settings, setting)
+    backend = settings.CACHES[alias]["BACKEND"]
+    if backend in PROCESS_LOCAL_CACHE_BACKENDS and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            f"{setting} ({alias!r}) uses {backend}, which is not shared between "
+            f"processes; configure a shared cache such as Redis."
+        )
+
+
+class LocalLRUCache:
+    """
+    Thread-safe, in-process LRU cache whose entries also expire after `ttl`
+    seconds.
+
+    Meant as a small first level in front of Django's cache framework: it
+    saves the cache round trip for hot keys, and the TTL bounds how long a
+    process can serve an entry that was invalidated in another process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires_at = self._data.get(key, (_MISSING, 0))
+            if value is _MISSING:
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so consecutive IDs
+    land next to each other in a btree index. `rand_a` holds a counter that
+    starts at a random value every millisecond and is incremented for each
+    ID generated within the same millisecond, keeping IDs monotonic within a
+    process; `rand_b` is random.
+    """
+    global _last_timestamp, _last_counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            counter = int.from_bytes(os.urandom(2)) & 0x7FF
+        else:
+            # Same millisecond (or the clock went back): keep counting from
+            # the last ID, borrowing the next millisecond on overflow.
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > 0xFFF:
+                timestamp += 1
+                counter = 0
+        _last_timestamp, _last_counter = timestamp, counter
+
+    rand_b = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(
+        int=(timestamp << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    )
+
+
+def generate_id() -> uuid.UUID:
+    """
+    Default primary key of `BaseModel`: a UUID of version `MODEL_ID_VERSION`
+    (4 for random, 7 for time-ordered).
+    """
+    if settings.MODEL_ID_VERSION == 7:
+        return uuid7()
+    return uuid.uuid4()
@@ -0,0 +1,161 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# Statements that only manage transactions; they are not counted as queries.
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    """
+    Query count and timings of one request.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.endpoint = None
+        self.query_budget = None
+
+    @property
+    def over_budget(self):
+        return self.query_budget is not None and self.queries > self.query_budget
+
+    def get_server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"render;dur={self.render_time * 1000:.1f}, "
+            f"total;dur={self.total_time * 1000:.1f}"
+        )
+
+
+_current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "base_request_metrics", default=None
+)
+
+
+def get_current_metrics() -> RequestMetrics | None:
+    return _current_metrics.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    `execute_wrapper` installed on every connection that adds the query and
+    its duration to the current request's metrics, if any. The metrics are
+    found through a context variable, so queries run by `sync_to_async` on
+    behalf of an async view are counted too.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or sql.startswith(TRANSACTION_STATEMENTS):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    `connection_created` receiver adding `record_query` to a new connection.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Per-endpoint histograms of the requests served by this process, in the
+    Prometheus text format. Each worker process keeps its own registry.
+    """
+
+    histograms = {
+        # name: (help, buckets, RequestMetrics attribute)
+        "http_request_duration_seconds": (
+            "Total request time.",
+            DURATION_BUCKETS,
+            "total_time",
+        ),
+        "http_request_db_duration_seconds": (
+            "Time spent executing SQL queries.",
+            DURATION_BUCKETS,
+            "db_time",
+        ),
+        "http_request_render_duration_seconds": (
+            "Time spent rendering the response.",
+            DURATION_BUCKETS,
+            "render_time",
+        ),
+        "http_request_queries": ("SQL queries per request.", QUERY_BUCKETS, "queries"),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._over_budget = {}
+
+    def observe(self, metrics: RequestMetrics):
+        with self._lock:
+            for name, (_, buckets, attribute) in self.histograms.items():
+                key = (name, metrics.endpoint)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(buckets)
+                self._histograms[key].observe(getattr(metrics, attribute))
+            if metrics.over_budget:
+                self._over_budget[metrics.endpoint] = (
+                    self._over_budget.get(metrics.endpoint, 0) + 1
+                )
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets, _) in self.histograms.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (key_name, endpoint), histogram in sorted(self._histograms.items()):
+                    if key_name != name:
+                        continue
+                    label = f'endpoint="{endpoint}"'
+                    cumulative = 0
+                    for bound, count in zip((*buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+            name = "http_request_query_budget_exceeded_total"
+            lines += [
+                f"# HELP {name} Requests that ran more queries than their budget.",
+                f"# TYPE {name} counter",
+            ]
+            for endpoint, count in sorted(self._over_budget.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
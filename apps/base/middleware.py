@@ -0,0 +1,152 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import RequestMetrics, _current_metrics, registry
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the number of SQL queries, the DB time, the response rendering
+    time and the total time of every request.
+
+    The timings are sent in a `Server-Timing` header when
+    `REQUEST_METRICS_SERVER_TIMING` is on, attached to the response as
+    `response.metrics` and aggregated per endpoint for `/metrics/`. Requests
+    running more queries than their view's `query_budgets` entry for the
+    action are logged.
+
+    Streamed responses run queries while the server iterates their content,
+    after the view returned, so they are metered until the stream is
+    exhausted or closed and get no `Server-Timing` header.
+
+    Place it first in `MIDDLEWARE` so the total covers the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return None
+        view_class = getattr(view_func, "cls", None) or getattr(
+            view_func, "view_class", None
+        )
+        if view_class is None:
+            metrics.endpoint = request.resolver_match.view_name
+            return None
+        # ViewSets map HTTP methods to actions, e.g. `{"get": "list"}`.
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        metrics.endpoint = f"{view_class.__name__}.{action}"
+        metrics.query_budget = getattr(view_class, "query_budgets", {}).get(action)
+        return None
+
+    def process_template_response(self, request, response):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            render_started_at = time.perf_counter()
+
+            def finish_render(response):
+                metrics.render_time = time.perf_counter() - render_started_at
+
+            response.add_post_render_callback(finish_render)
+        return response
+
+    def finish(self, request, response, metrics):
+        if metrics.endpoint is None:
+            metrics.endpoint = "unmatched"
+        response.metrics = metrics
+        if response.streaming:
+            meter_stream = (
+                self.ameter_stream if response.is_async else self.meter_stream
+            )
+            response.streaming_content = meter_stream(
+                request, metrics, response.streaming_content
+            )
+            return response
+        self.record(request, metrics)
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.get_server_timing()
+        return response
+
+    def meter_stream(self, request, metrics, content):
+        """
+        Iterate the content of a streamed response with `metrics` as the
+        current metrics, and record them once it ends.
+        """
+        chunks = iter(content)
+        try:
+            while True:
+                token = _current_metrics.set(metrics)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    _current_metrics.reset(token)
+                yield chunk
+        finally:
+            self.record(request, metrics)
+
+    async def ameter_stream(self, request, metrics, content):
+        """
+        Async variant of `meter_stream`.
+        """
+        chunks = aiter(content)
+        try:
+            while True:
+                token = _current_metrics.set(metrics)
+                try:
+                    chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _current_metrics.reset(token)
+                yield chunk
+        finally:
+            self.record(request, metrics)
+
+    def record(self, request, metrics):
+        metrics.total_time = time.perf_counter() - metrics.started_at
+        if metrics.over_budget:
+            logger.warning(
+                "%s ran %d queries, over its budget of %d (%s %s).",
+                metrics.endpoint,
+                metrics.queries,
+                metrics.query_budget,
+                request.method,
+                request.get_full_path(),
+            )
+        registry.observe(metrics)
@@ -1,12 +1,14 @@
-import uuid
-
 from django.db import models
 
+from .ids import generate_id
+
 
 class BaseModel(models.Model):
+    # Time-ordered (UUIDv7) by default so that inserts append to the primary
+    # key index instead of splitting random pages; see `MODEL_ID_VERSION`.
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=generate_id,
         unique=True,
         editable=False,
     )
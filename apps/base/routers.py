@@ -0,0 +1,71 @@
+import random
+import uuid
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+class PrimaryReplicaRouter:
+    """
+    Send every write, and every read not explicitly opted in to a replica
+    with `.using(get_read_database(...))`, to the primary.
+
+    The replicas are physical copies of the primary, so relations between
+    objects read from any of them are allowed and only the primary is
+    migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def get_pin_key(user_id: uuid.UUID) -> str:
+    return f"db:pinned:{user_id}"
+
+
+def get_read_database(*user_ids: uuid.UUID | None) -> str:
+    """
+    Return the database alias to read from: a random one of
+    `DATABASE_REPLICAS`, or the primary if there are none, if the read is
+    part of a transaction on the primary, or if any of `user_ids` (`None`
+    values are ignored) wrote within the last
+    `DATABASE_REPLICA_STICKY_TIMEOUT` seconds (read-your-writes).
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    keys = [get_pin_key(user_id) for user_id in user_ids if user_id is not None]
+    if keys and caches[settings.DATABASE_REPLICA_CACHE_ALIAS].get_many(keys):
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+def pin_to_primary(user_ids: Iterable[uuid.UUID]) -> None:
+    """
+    Send the reads of the given users to the primary for the next
+    `DATABASE_REPLICA_STICKY_TIMEOUT` seconds, counted from now and again
+    from the commit of the current transaction.
+    """
+    keys = {get_pin_key(user_id): True for user_id in user_ids}
+    if not keys or not settings.DATABASE_REPLICAS:
+        return
+
+    def pin():
+        caches[settings.DATABASE_REPLICA_CACHE_ALIAS].set_many(
+            keys, settings.DATABASE_REPLICA_STICKY_TIMEOUT
+        )
+
+    pin()
+    transaction.on_commit(pin)
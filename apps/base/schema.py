@@ -0,0 +1,83 @@
+import hashlib
+import json
+from functools import lru_cache
+
+import drf_spectacular
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import translation
+from drf_spectacular.views import SpectacularAPIView
+
+SCHEMA_CACHE_PREFIX = "openapi-schema"
+
+
+@lru_cache
+def get_code_hash() -> str:
+    """
+    Hash the project's Python sources and the drf-spectacular version, which
+    is all a generated schema depends on. Computed once per process, as the
+    code of a running process does not change.
+    """
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    for path in sorted(settings.BASE_DIR.rglob("*.py")):
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def load_schema_file(path: str) -> dict:
+    with open(path) as schema_file:
+        return json.load(schema_file)
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serve the OpenAPI schema without introspecting every viewset and
+    serializer, or rendering it, on each request.
+
+    When `OPENAPI_SCHEMA_FILE` is set (the production settings point it at the
+    file `manage.py spectacular --format openapi-json` writes at build time),
+    the default schema is read from it. Otherwise, and for other versions or
+    languages, it is generated. Either way the rendered YAML or JSON is cached
+    in `OPENAPI_SCHEMA_CACHE_ALIAS` under a hash of the code, so it is built
+    once per deployment rather than once per request.
+    """
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        language = translation.get_language() if request.GET.get("lang") else None
+        from_file = bool(settings.OPENAPI_SCHEMA_FILE and not version and not language)
+        key = ":".join(
+            [
+                SCHEMA_CACHE_PREFIX,
+                get_code_hash(),
+                "file" if from_file else f"{version}:{language}",
+                request.accepted_media_type,
+            ]
+        )
+        cache = caches[settings.OPENAPI_SCHEMA_CACHE_ALIAS]
+        content = cache.get(key)
+        if content is None:
+            if from_file:
+                schema = load_schema_file(str(settings.OPENAPI_SCHEMA_FILE))
+            else:
+                generator = self.generator_class(
+                    urlconf=self.urlconf, api_version=version, patterns=self.patterns
+                )
+                schema = generator.get_schema(request=request, public=self.serve_public)
+            content = request.accepted_renderer.render(
+                schema, request.accepted_media_type, self.get_renderer_context()
+            )
+            cache.set(key, content, timeout=None)
+
+        content_type = request.accepted_media_type
+        if request.accepted_renderer.charset:
+            content_type += f"; charset={request.accepted_renderer.charset}"
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'inline; filename="{self._get_filename(request, version)}"'
+        )
+        return response
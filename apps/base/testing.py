@@ -0,0 +1,20 @@
+class QueryBudgetTestMixin:
+    """
+    Assertions on the metrics `RequestMetricsMiddleware` attaches to test
+    client responses.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        if response.streaming:
+            # Streamed responses run their queries while being iterated.
+            b"".join(response.streaming_content)
+        metrics = response.metrics
+        self.assertIsNotNone(
+            metrics.query_budget, f"{metrics.endpoint} has no query budget."
+        )
+        self.assertLessEqual(
+            metrics.queries,
+            metrics.query_budget,
+            f"{metrics.endpoint} ran {metrics.queries} queries, "
+            f"over its budget of {metrics.query_budget}.",
+        )
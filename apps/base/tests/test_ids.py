@@ -0,0 +1,34 @@
+import time
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+
+from base.ids import generate_id, uuid7
+
+
+class UUID7Test(SimpleTestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_embeds_unix_time_in_milliseconds(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        self.assertLessEqual(before, value.int >> 80)
+        # Allow for the counter borrowing the next millisecond.
+        self.assertLessEqual(value.int >> 80, after + 1)
+
+    def test_monotonic(self):
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    @override_settings(MODEL_ID_VERSION=7)
+    def test_generate_id_v7(self):
+        self.assertEqual(generate_id().version, 7)
+
+    @override_settings(MODEL_ID_VERSION=4)
+    def test_generate_id_v4(self):
+        self.assertEqual(generate_id().version, 4)
@@ -0,0 +1,138 @@
+from uuid import uuid4
+from datetime import date
+from unittest import mock
+
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from base.metrics import registry
+from base.middleware import RequestMetricsMiddleware
+from users.models import User
+from expenses.api.viewsets import ExpensesViewSet
+from expenses.models import Expenses
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with one expense, reset the metrics registry and create
+        an APIClient instance.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        Expenses.objects.create(
+            user=self.user,
+            title="Groceries",
+            amount=50,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+        registry.reset()
+        self.client = APIClient()
+
+    def test_records_request_metrics(self):
+        response = self.client.get(
+            "/api/", {"user_id": str(self.user.id), "pagination": "cursor"}
+        )
+
+        metrics = response.metrics
+        self.assertEqual(metrics.endpoint, "ExpensesViewSet.list")
+        self.assertEqual(metrics.queries, 1)
+        self.assertGreater(metrics.db_time, 0)
+        self.assertGreater(metrics.render_time, 0)
+        self.assertGreaterEqual(metrics.total_time, metrics.db_time)
+
+    async def test_records_async_view_queries(self):
+        response = await self.async_client.get(
+            "/api/async/", {"user_id": str(self.user.id)}
+        )
+
+        self.assertEqual(response.metrics.endpoint, "ExpensesAsyncView.get")
+        self.assertEqual(response.metrics.queries, 1)
+
+    def test_records_streamed_response_queries(self):
+        """
+        Test the queries run while a streamed response is iterated are
+        counted, and recorded once the stream ends.
+        """
+        response = self.client.get("/api/export/", {"user_id": str(self.user.id)})
+        self.assertNotIn("ExpensesViewSet.export", registry.render())
+
+        b"".join(response.streaming_content)
+
+        self.assertEqual(response.metrics.endpoint, "ExpensesViewSet.export")
+        self.assertEqual(response.metrics.queries, 1)
+        self.assertGreater(response.metrics.db_time, 0)
+        self.assertIn(
+            'http_request_queries_count{endpoint="ExpensesViewSet.export"} 1',
+            registry.render(),
+        )
+
+    async def test_records_async_streamed_response_queries(self):
+        async def content():
+            yield str(await Expenses.objects.acount()).encode()
+
+        async def get_response(request):
+            return StreamingHttpResponse(content())
+
+        middleware = RequestMetricsMiddleware(get_response)
+        response = await middleware(RequestFactory().get("/"))
+
+        self.assertEqual(
+            b"".join([chunk async for chunk in response.streaming_content]), b"1"
+        )
+        self.assertEqual(response.metrics.queries, 1)
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get("/api/", {"user_id": str(self.user.id)})
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="2 queries", render;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_header_disabled(self):
+        response = self.client.get("/api/", {"user_id": str(self.user.id)})
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.client.get(f"/api/{uuid4()}/")
+        self.client.get(f"/api/{uuid4()}/")
+
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_queries_count{endpoint="ExpensesViewSet.retrieve"} 2',
+            content,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{endpoint="ExpensesViewSet.retrieve",'
+            'le="+Inf"} 2',
+            content,
+        )
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_metrics_endpoint_closed_without_token(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_query_budget_exceeded(self):
+        with mock.patch.dict(ExpensesViewSet.query_budgets, {"list": 0}):
+            with self.assertLogs("base.middleware", "WARNING") as logs:
+                response = self.client.get("/api/", {"user_id": str(self.user.id)})
+
+        self.assertTrue(response.metrics.over_budget)
+        self.assertIn("ExpensesViewSet.list ran 2 queries", logs.output[0])
+        metrics = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertIn(
+            'http_request_query_budget_exceeded_total{endpoint="ExpensesViewSet.list"} 1',
+            metrics.content.decode(),
+        )
@@ -0,0 +1,137 @@
+from uuid import uuid4
+from datetime import date
+
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from base.routers import PrimaryReplicaRouter, get_read_database
+from users.models import User
+from expenses.models import Expenses
+from expenses.selectors.expenses import ExpensesSelector
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class PrimaryReplicaRouterTest(TransactionTestCase):
+    """
+    `replica` mirrors `default` in tests, so both see the same data and the
+    tests check which connection runs each query.
+    """
+
+    databases = {"default", "replica"}
+
+    @classmethod
+    def tearDownClass(cls):
+        # Only the primary's pool is closed before the test database is
+        # dropped, and only PostgreSQL connections are pooled.
+        if connections["replica"].vendor == "postgresql":
+            connections["replica"].close_pool()
+        super().tearDownClass()
+
+    def setUp(self):
+        """
+        Create two users, one with an expense, and forget that they wrote.
+        """
+        self.user, self.other_user = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        self.expense = Expenses.objects.create(
+            user=self.user,
+            title="Groceries",
+            amount=50,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+        caches["default"].clear()
+        self.client = APIClient()
+
+    def test_get_read_database(self):
+        self.assertEqual(get_read_database(), "replica")
+        self.assertEqual(get_read_database(self.user.id, None), "replica")
+        with transaction.atomic():
+            self.assertEqual(get_read_database(), "default")
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(get_read_database(), "default")
+
+    def test_write_pins_user_to_primary(self):
+        Expenses.objects.create(
+            user=self.user,
+            title="Dinner",
+            amount=30,
+            date=date(2024, 11, 2),
+            category="food",
+        )
+
+        self.assertEqual(get_read_database(self.user.id), "default")
+        self.assertEqual(get_read_database(self.other_user.id), "replica")
+        self.assertEqual(get_read_database(self.other_user.id, self.user.id), "default")
+        self.assertEqual(
+            ExpensesSelector.list_expenses_by_user(self.user.id).db, "default"
+        )
+        self.assertEqual(
+            ExpensesSelector.list_expenses_by_user(self.other_user.id).db, "replica"
+        )
+
+        # The pin expires after DATABASE_REPLICA_STICKY_TIMEOUT.
+        caches["default"].clear()
+        self.assertEqual(get_read_database(self.user.id), "replica")
+
+    def test_update_pins_user_to_primary(self):
+        Expenses.objects.filter(pk=self.expense.pk).update(title="Market")
+
+        self.assertEqual(get_read_database(self.user.id), "default")
+        self.assertEqual(get_read_database(self.other_user.id), "replica")
+
+    def test_selectors_read_from_replica(self):
+        for queryset in (
+            ExpensesSelector.list_expenses_by_user(self.user.id),
+            ExpensesSelector.list_expenses_by_date_range(
+                self.user.id, "2024-11-01", "2024-11-30"
+            ),
+            ExpensesSelector.get_category_summary(
+                self.user.id, date(2024, 11, 1), date(2024, 12, 1)
+            ),
+            ExpensesSelector.get_category_summary(
+                self.user.id, date(2024, 11, 1), date(2024, 11, 15)
+            ),
+        ):
+            with self.subTest(query=str(queryset.query)):
+                self.assertEqual(queryset.db, "replica")
+                self.assertEqual(len(queryset), 1)
+
+    def test_list_and_retrieve_read_from_replica(self):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                listed = self.client.get("/api/", {"user_id": str(self.user.id)})
+                retrieved = self.client.get(f"/api/{self.expense.id}/")
+
+        self.assertEqual(listed.data["count"], 1)
+        self.assertEqual(retrieved.data["id"], str(self.expense.id))
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+    def test_export_reads_from_replica(self):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = self.client.get(
+                    "/api/export/", {"user_id": str(self.user.id)}
+                )
+                rows = b"".join(response.streaming_content).splitlines()
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+    def test_writes_go_to_primary(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.patch(
+                f"/api/{self.expense.id}/", {"amount": 70}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Expenses), "default")
+        self.assertFalse(PrimaryReplicaRouter().allow_migrate("replica", "expenses"))
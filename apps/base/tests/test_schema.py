@@ -0,0 +1,129 @@
+import importlib
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+
+from base.cache import PROCESS_LOCAL_CACHE_BACKENDS
+
+
+class CachedSpectacularAPIViewTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_schema_is_generated_once(self):
+        """
+        Test the rendered schema is cached per format, and matches what
+        drf-spectacular generates.
+        """
+        with mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            first = self.client.get("/schema/")
+            second = self.client.get("/schema/")
+            as_json = self.client.get(
+                "/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        self.assertEqual(get_schema.call_count, 2)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            first["Content-Type"], "application/vnd.oai.openapi; charset=utf-8"
+        )
+        self.assertEqual(first.content, second.content)
+        self.assertIn('filename="Expenses API.yaml"', first["Content-Disposition"])
+        schema = json.loads(as_json.content)
+        self.assertIn("/api/", schema["paths"])
+        self.assertIn("/api/totals/", schema["paths"])
+
+    def test_schema_file(self):
+        path = Path(self.enterContext(TemporaryDirectory())) / "openapi.json"
+        path.write_text(json.dumps({"openapi": "3.0.3", "paths": {}}))
+
+        with override_settings(OPENAPI_SCHEMA_FILE=path), mock.patch.object(
+            SchemaGenerator, "get_schema"
+        ) as get_schema:
+            response = self.client.get(
+                "/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        get_schema.assert_not_called()
+        self.assertEqual(
+            json.loads(response.content), {"openapi": "3.0.3", "paths": {}}
+        )
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def load_production(self, environ):
+        """
+        Import `config.production` with `environ` as the environment, and
+        reload it as it was afterwards.
+        """
+        production = importlib.import_module("config.production")
+        self.addCleanup(importlib.reload, production)
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return importlib.reload(production)
+
+    def test_development_apps_are_removed(self):
+        production = importlib.import_module("config.production")
+
+        self.assertFalse(production.DEBUG)
+        self.assertNotIn("debug_toolbar", production.INSTALLED_APPS)
+        self.assertFalse(
+            [m for m in production.MIDDLEWARE if m.startswith("debug_toolbar")]
+        )
+        self.assertEqual(
+            production.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"],
+            ["rest_framework.renderers.JSONRenderer"],
+        )
+
+    def test_cache_is_shared(self):
+        production = self.load_production({})
+        self.assertNotIn(
+            production.CACHES["default"]["BACKEND"], PROCESS_LOCAL_CACHE_BACKENDS
+        )
+
+        production = self.load_production(
+            {
+                "CACHE_BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+                "CACHE_LOCATION": "memcached:11211",
+            }
+        )
+        self.assertEqual(
+            production.CACHES["default"],
+            {
+                "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+                "LOCATION": "memcached:11211",
+            },
+        )
+
+    def test_schema_file_is_used_once_generated(self):
+        for exists in (False, True):
+            with self.subTest(exists=exists), mock.patch.object(
+                Path, "exists", return_value=exists
+            ):
+                production = self.load_production({})
+                self.assertEqual(
+                    production.OPENAPI_SCHEMA_FILE,
+                    production.BASE_DIR / "openapi.json" if exists else None,
+                )
+
+    def test_missing_schema_file_is_generated(self):
+        with mock.patch.object(Path, "exists", return_value=False):
+            production = self.load_production({})
+        with override_settings(OPENAPI_SCHEMA_FILE=production.OPENAPI_SCHEMA_FILE):
+            response = self.client.get(
+                "/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/api/", json.loads(response.content)["paths"])
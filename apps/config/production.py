@@ -0,0 +1,55 @@
+"""
+Production settings: `DJANGO_SETTINGS_MODULE=config.production`.
+
+Extends `config.settings` with DEBUG off and the development-only apps,
+middleware and renderers removed, so workers import less at startup and do
+less per request. The OpenAPI schema is read from the file generated at
+build time (see docker/Dockerfile), when there is one, instead of being
+introspected.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, os
+
+DEBUG = False
+
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", SECRET_KEY)  # noqa: F405
+
+if os.getenv("DJANGO_ALLOWED_HOSTS"):
+    ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS").split(",")
+
+DEVELOPMENT_APPS = ["debug_toolbar"]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEVELOPMENT_APPS]
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware.split(".")[0] not in DEVELOPMENT_APPS
+]
+
+# Only JSON: the browsable API renders templates and forms for every
+# response, and its import pulls in the template and form machinery.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
+
+REQUEST_METRICS_SERVER_TIMING = False
+
+# Every worker must see the invalidations of the others (cached users and
+# responses, read-your-writes pins), so the cache is shared: CACHE_BACKEND at
+# CACHE_LOCATION, Redis by default. A process-local cache is refused at
+# startup.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://redis:6379/0"),
+    }
+}
+
+# The schema file is only there once the image has been built; without it the
+# schema is generated on first use.
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE")
+if not OPENAPI_SCHEMA_FILE and (BASE_DIR / "openapi.json").exists():
+    OPENAPI_SCHEMA_FILE = BASE_DIR / "openapi.json"
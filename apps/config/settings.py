@@ -24,7 +24,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = "django-insecure-t@89l-@bsecx#g@0+p)_pimaqc%_@r0i9vav&b3i0rr=kb&e12"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True").lower() in ("1", "true", "yes")
 
 ALLOWED_HOSTS = [
     "localhost",
@@ -41,13 +41,13 @@ LOCAL_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "django.contrib.postgres",
     "django.contrib.staticfiles",
 ]
 
 THIRD_PARTY_APPS = [
     "rest_framework",
     "drf_spectacular",
-    "debug_toolbar",
     "django_filters",
 ]
 
@@ -60,6 +60,7 @@ DJANGO_APPS = [
 INSTALLED_APPS = LOCAL_APPS + THIRD_PARTY_APPS + DJANGO_APPS
 
 MIDDLEWARE = [
+    "base.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,9 +68,15 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+# The debug toolbar is a development tool: it records every query and renders
+# a panel on each page, so it is only enabled with DEBUG.
+if DEBUG:
+    INSTALLED_APPS += ["debug_toolbar"]
+    MIDDLEWARE += ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+    INTERNAL_IPS = ["127.0.0.1"]
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -94,17 +101,122 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections come from a psycopg pool of POSTGRES_POOL_MIN_SIZE to
+# POSTGRES_POOL_MAX_SIZE connections per process, waiting at most
+# POSTGRES_POOL_TIMEOUT seconds for a free one. With POSTGRES_POOL off, each
+# thread keeps its connection open for POSTGRES_CONN_MAX_AGE seconds instead
+# (0 closes it after every request).
+POSTGRES_POOL = os.getenv("POSTGRES_POOL", "True").lower() in ("1", "true", "yes")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
-        "HOST": "db",
-        "PORT": "5432",
+        "HOST": os.getenv("POSTGRES_HOST", "db"),
+        "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": (
+            0 if POSTGRES_POOL else int(os.getenv("POSTGRES_CONN_MAX_AGE", "60"))
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+                    "timeout": float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+                }
+            }
+            if POSTGRES_POOL
+            else {}
+        ),
     }
 }
 
+# Selectors and the expense list/retrieve endpoints read from a replica at
+# POSTGRES_REPLICA_HOST when it is set, except for users who wrote within the
+# last DATABASE_REPLICA_STICKY_TIMEOUT seconds, whose reads stay on the primary
+# so they see their own writes. Keep the timeout above the replication lag,
+# and DATABASE_REPLICA_CACHE_ALIAS shared between processes.
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "HOST": os.getenv("POSTGRES_REPLICA_HOST", DATABASES["default"]["HOST"]),
+    "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+    "TEST": {"MIRROR": "default"},
+}
+DATABASE_REPLICAS = ["replica"] if os.getenv("POSTGRES_REPLICA_HOST") else []
+DATABASE_ROUTERS = ["base.routers.PrimaryReplicaRouter"]
+DATABASE_REPLICA_STICKY_TIMEOUT = 5
+DATABASE_REPLICA_CACHE_ALIAS = "default"
+
+# Primary keys of `BaseModel` subclasses are generated as UUIDs of this
+# version: 7 (time-ordered, so inserts append to the primary key index) or 4
+# (random). Existing UUID4 keys stay valid either way.
+MODEL_ID_VERSION = 7
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# USER_CACHE_ALIAS, EXPENSES_CACHE_ALIAS and DATABASE_REPLICA_CACHE_ALIAS are
+# invalidated by the process that handles a write, so the cache must be shared
+# by every process: CACHE_BACKEND at CACHE_LOCATION, Redis by default (or e.g.
+# django.core.cache.backends.memcached.PyMemcacheCache). A process-local
+# LocMemCache is refused at startup unless DEBUG is on; see
+# `base.cache.check_shared_cache`.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://redis:6379/0"),
+    }
+}
+
+# User lookups are cached in `USER_CACHE_ALIAS` for `USER_CACHE_TIMEOUT`
+# seconds, and in a per-process LRU of `USER_CACHE_LOCAL_MAXSIZE` entries for
+# `USER_CACHE_LOCAL_TTL` seconds, which bounds how stale another process's
+# copy can be after a user changes. Missing users are not cached. The alias
+# must be shared between processes unless DEBUG is on.
+USER_CACHE_ALIAS = "default"
+USER_CACHE_TIMEOUT = 300
+USER_CACHE_LOCAL_MAXSIZE = 1024
+USER_CACHE_LOCAL_TTL = 5
+
+# Expense list and summary responses scoped to a `user_id` are cached in
+# `EXPENSES_CACHE_ALIAS` for `EXPENSES_CACHE_TIMEOUT` seconds, keyed by a
+# per-user version that every expense write bumps. The alias must be shared
+# between processes unless DEBUG is on.
+EXPENSES_CACHE_ALIAS = "default"
+EXPENSES_CACHE_TIMEOUT = 300
+
+# On PostgreSQL the expenses table is range-partitioned on `date`, one
+# partition per `EXPENSES_PARTITION_INTERVAL` ("month" or "year").
+# `manage_expense_partitions` keeps `EXPENSES_PARTITIONS_AHEAD` upcoming
+# intervals created; dates without a partition land in a default partition.
+# Lookups by id alone probe every partition, so keep the count low.
+EXPENSES_PARTITION_INTERVAL = "year"
+EXPENSES_PARTITIONS_AHEAD = 3
+
+# `GET /api/changes/` hands out sync tokens that point EXPENSES_SYNC_OVERLAP
+# seconds back once a client is up to date, so writes committed late are not
+# missed. Tombstones of deleted expenses are kept, and tokens accepted, for
+# EXPENSES_TOMBSTONE_RETENTION_DAYS; `purge_expense_tombstones` deletes older
+# ones.
+EXPENSES_SYNC_OVERLAP = 30
+EXPENSES_TOMBSTONE_RETENTION_DAYS = 90
+
+
+# Request metrics
+# Query count and timings of every request are sent in a `Server-Timing`
+# header when REQUEST_METRICS_SERVER_TIMING is on, and aggregated per endpoint
+# at /metrics/, which requires `Authorization: Bearer <METRICS_TOKEN>` (or
+# DEBUG when no token is set).
+
+REQUEST_METRICS_SERVER_TIMING = DEBUG
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -163,6 +275,13 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# /schema/ serves OPENAPI_SCHEMA_FILE (written by `manage.py spectacular
+# --format openapi-json --file ...`) when it is set. Otherwise the schema is
+# generated on first use and cached in OPENAPI_SCHEMA_CACHE_ALIAS under a hash
+# of the code.
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE")
+OPENAPI_SCHEMA_CACHE_ALIAS = "default"
+
 # CSRF TRUSTED ORIGINS
 CSRF_COOKIE_SECURE = False
 CSRF_COOKIE_HTTPONLY = False
@@ -1,10 +1,100 @@
+from datetime import date, timedelta
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db import models
+from django.utils.translation import gettext_lazy as _, ngettext
+
+from base.admin import EstimatedCountPaginator
+
+from .models import Expenses, ExpensesQuerySet
+
+
+def make_set_category_action(category, label):
+    """
+    Build an action that moves the selected expenses to `category` with a
+    single `UPDATE` (see `ExpensesQuerySet.update`).
+    """
+
+    def set_category(modeladmin, request, queryset):
+        updated = queryset.update(category=category)
+        modeladmin.message_user(
+            request,
+            ngettext(
+                "%(count)d expense was moved to %(category)s.",
+                "%(count)d expenses were moved to %(category)s.",
+                updated,
+            )
+            % {"count": updated, "category": label},
+        )
 
-from .models import Expenses
+    set_category.__name__ = f"set_category_{category}"
+    return admin.action(description=_("Move selected expenses to %s") % label)(
+        set_category
+    )
+
+
+class ExpensesChangeListQuerySet(ExpensesQuerySet):
+    """
+    Queryset of the expenses changelist, whose `date_hierarchy` lists the
+    periods that have expenses through `dates()`.
+    """
+
+    def dates(self, field_name, kind, order="ASC"):
+        """
+        List the distinct years, months or days of `date` that have expenses
+        with one indexed `EXISTS` probe per period between the first and last
+        date, instead of a `DISTINCT` over every matching row.
+        """
+        if field_name != "date" or kind not in ("year", "month", "day"):
+            return super().dates(field_name, kind, order)
+        bounds = self.aggregate(first=models.Min("date"), last=models.Max("date"))
+        periods = []
+        if bounds["first"] is not None:
+            start = bounds["first"].replace(
+                month=1 if kind == "year" else bounds["first"].month,
+                day=1 if kind != "day" else bounds["first"].day,
+            )
+            while start <= bounds["last"]:
+                if kind == "year":
+                    end = start.replace(year=start.year + 1)
+                elif kind == "month":
+                    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+                else:
+                    end = start + timedelta(days=1)
+                if self.filter(date__gte=start, date__lt=end).exists():
+                    periods.append(start)
+                start = end
+        return periods[::-1] if order == "DESC" else periods
+
+
+class ExpensesChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return ExpensesChangeListQuerySet(self.model, queryset.query, queryset.db)
 
 
 class ExpensesAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "title", "amount", "category", "date")
+    # Load the user of every row in the same query instead of one per row.
+    list_select_related = ("user",)
+    # Served by the `date` index; `ExpensesChangeListQuerySet.dates` probes
+    # each period instead of scanning every row for distinct dates.
+    date_hierarchy = "date"
+    list_filter = ("date", "category")
+    ordering = ("-date",)
+    # Render `user` as a search box instead of a <select> of every user.
+    autocomplete_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered `COUNT(*)` of the whole table.
+    show_full_result_count = False
+    actions = [
+        make_set_category_action(category, label)
+        for category, label in Expenses.CATEGORY_CHOICES
+    ]
+
+    def get_changelist(self, request, **kwargs):
+        return ExpensesChangeList
 
 
 admin.site.register(Expenses, ExpensesAdmin)
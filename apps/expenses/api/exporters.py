@@ -0,0 +1,72 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+
+# Columns read from the database, in output order, and the names they are
+# exported under (matching `ExpensesSerializer`).
+EXPORT_FIELDS = ("id", "user_id", "title", "amount", "date", "category")
+EXPORT_HEADER = ("id", "user", "title", "amount", "date", "category")
+
+
+class Echo:
+    """
+    File-like object whose `write` returns the value instead of buffering it,
+    so `csv.writer` can encode one row at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _encode_row(row: tuple) -> tuple:
+    expense_id, user_id, title, amount, expense_date, category = row
+    return (
+        str(expense_id),
+        str(user_id),
+        title,
+        amount,
+        expense_date.isoformat(),
+        category,
+    )
+
+
+def _chunked(lines: Iterable[str], rows_per_chunk: int) -> Iterator[str]:
+    """
+    Join encoded rows into larger chunks to keep per-write overhead low while
+    bounding the memory held at any time.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= rows_per_chunk:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_ndjson(rows: Iterable[tuple], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode `EXPORT_FIELDS` value tuples as newline-delimited JSON objects.
+    """
+    return _chunked(
+        (json.dumps(dict(zip(EXPORT_HEADER, _encode_row(row)))) + "\n" for row in rows),
+        rows_per_chunk,
+    )
+
+
+def iter_csv(rows: Iterable[tuple], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode `EXPORT_FIELDS` value tuples as CSV, preceded by a header row.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    yield from _chunked(
+        (writer.writerow(_encode_row(row)) for row in rows), rows_per_chunk
+    )
+
+
+EXPORTERS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv"),
+}
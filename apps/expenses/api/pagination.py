@@ -0,0 +1,148 @@
+import base64
+import binascii
+import uuid
+from collections.abc import Mapping
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class ExpensesKeysetPagination(BasePagination):
+    """
+    Keyset pagination over `(date, id)`.
+
+    The opaque cursor holds the `date` and `id` of the last expense of the
+    previous page, and the next page starts right after it with a range
+    predicate on the indexed `date` column. There is no `COUNT(*)` and no
+    `OFFSET`, so deep pages cost the same as the first one. Pages only move
+    forward.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("date", "id")
+    invalid_cursor_message = "Invalid cursor"
+    search_message = (
+        "Search results are ranked and can not be cursor-paginated; "
+        "use page numbers."
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of `paginate_queryset`, evaluated with the async ORM.
+        """
+        return self.set_page(
+            [item async for item in self.get_page_queryset(queryset, request)]
+        )
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the queryset of the requested page plus one item, which tells
+        whether there is a next page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            position_date, position_id = position
+            queryset = queryset.filter(
+                Q(date__gt=position_date) | Q(id__gt=position_id),
+                date__gte=position_date,
+            )
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_position(self, item):
+        """
+        Return the `(date, id)` of a paginated item, which is either a model
+        instance or a mapping of field values.
+        """
+        if isinstance(item, Mapping):
+            return item["date"], item["id"]
+        return item.date, item.id
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position_date, position_id = (
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+                .decode("ascii")
+                .split("|")
+            )
+            return date.fromisoformat(position_date), uuid.UUID(position_id)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        position_date, position_id = position
+        return base64.urlsafe_b64encode(
+            f"{position_date.isoformat()}|{position_id}".encode("ascii")
+        ).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.get_position(self.page[-1])),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page (at most {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
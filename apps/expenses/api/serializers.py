@@ -1,13 +1,47 @@
+import base64
+import binascii
 import uuid
+from datetime import date, datetime, timedelta
+from operator import methodcaller
 
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
-from ..models import Expenses
-from ..selectors.expenses import ExpensesSelector
+from users.models import User
+from users.selectors.user import UserSelector
+
+from ..models import Expenses, ExpensesBudget
+from ..selectors.expenses import (
+    AGGREGATE_DIMENSIONS,
+    AGGREGATE_METRICS,
+    AGGREGATE_PERIODS,
+    ExpensesSelector,
+)
 from .validators import validate_uuid4, validate_user_exists
 
 
+class CachedUserPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    `user` foreign key resolved through `UserSelector`'s cache instead of a
+    query per validated item.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            user_id = uuid.UUID(str(data))
+        except ValueError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        user = UserSelector.get_user_by_id(user_id)
+        if user is None:
+            self.fail("does_not_exist", pk_value=data)
+        return user
+
+
 class ExpensesSerializer(serializers.ModelSerializer):
+    user = CachedUserPrimaryKeyRelatedField(queryset=User.objects.all())
     date = serializers.DateField(format="%Y-%m-%d")
 
     class Meta:
@@ -21,39 +55,613 @@ class ExpensesSerializer(serializers.ModelSerializer):
         return value
 
 
+class ExpensesBudgetSerializer(serializers.ModelSerializer):
+    user = CachedUserPrimaryKeyRelatedField(queryset=User.objects.all())
+
+    class Meta:
+        model = ExpensesBudget
+        fields = ["id", "user", "category", "amount"]
+        read_only_fields = ["id"]
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Budget amount must be positive.")
+        return value
+
+
+class ExpensesValuesSerializer:
+    """
+    Read-only fast path producing the same representation as
+    `ExpensesSerializer` from `.values()` rows.
+
+    Each output field has a precomputed `(source column, encoder)` pair, so
+    a row is encoded without DRF's per-field machinery or model instances.
+    Only `data` is supported.
+    """
+
+    encoders = {
+        "id": ("id", str),
+        "user": ("user_id", None),
+        "title": ("title", None),
+        "amount": ("amount", int),
+        "date": (
+            "date",
+            methodcaller(
+                "strftime", ExpensesSerializer._declared_fields["date"].format
+            ),
+        ),
+        "category": ("category", None),
+    }
+    source_fields = tuple(source for source, _ in encoders.values())
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            field: row[source] if encode is None else encode(row[source])
+            for field, (source, encode) in cls.encoders.items()
+        }
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class ExpensesBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates a batch of expenses with a single query for all referenced users
+    and writes it with `bulk_create`/`bulk_update`.
+
+    For updates, pass the queryset of updatable expenses as `instance`; the
+    expenses referenced by `id` are fetched from it with a single query.
+    """
+
+    def to_internal_value(self, data):
+        # Checked here rather than in `validate()` so that errors keep their
+        # per-item list shape instead of being wrapped in `non_field_errors`.
+        attrs = super().to_internal_value(data)
+        errors = [{} for _ in attrs]
+
+        existing_user_ids = UserSelector.get_existing_user_ids(
+            {item["user_id"] for item in attrs if "user_id" in item}
+        )
+        for item, item_errors in zip(attrs, errors):
+            if "user_id" in item and item["user_id"] not in existing_user_ids:
+                item_errors["user"] = [
+                    f'Invalid pk "{item["user_id"]}" - object does not exist.'
+                ]
+
+        if self.instance is not None:
+            ids = [item.get("id") for item in attrs]
+            self.expenses = self.instance.in_bulk(filter(None, ids))
+            seen = set()
+            for expense_id, item_errors in zip(ids, errors):
+                if expense_id is None:
+                    item_errors["id"] = ["This field is required."]
+                elif expense_id not in self.expenses:
+                    item_errors["id"] = ["Expense with this ID does not exist."]
+                elif expense_id in seen:
+                    item_errors["id"] = ["Duplicate expense ID in the batch."]
+                seen.add(expense_id)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        return Expenses.objects.bulk_create(
+            [Expenses(**item) for item in validated_data], batch_size=1000
+        )
+
+    def update(self, instance, validated_data):
+        expenses = []
+        fields = set()
+        for item in validated_data:
+            expense = self.expenses[item.pop("id")]
+            for field, value in item.items():
+                setattr(expense, field, value)
+            fields.update(item)
+            expenses.append(expense)
+        if fields:
+            Expenses.objects.bulk_update(expenses, fields, batch_size=1000)
+        return expenses
+
+
+class ExpensesBulkSerializer(ExpensesSerializer):
+    # Existence of the users is checked by `ExpensesBulkListSerializer` for
+    # the whole batch at once.
+    user = serializers.UUIDField(source="user_id")
+
+    class Meta(ExpensesSerializer.Meta):
+        list_serializer_class = ExpensesBulkListSerializer
+
+
+class ExpensesBulkUpdateSerializer(ExpensesBulkSerializer):
+    id = serializers.UUIDField()
+
+
+class ExpensesBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    class Meta:
+        fields = ["ids"]
+
+    def validate_ids(self, value):
+        """
+        Ensure every expense exists, using a single query.
+        """
+        max_length = self.context.get("max_length")
+        if max_length is not None and len(value) > max_length:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {max_length} elements."
+            )
+        existing = set(
+            self.context["queryset"].filter(id__in=value).values_list("id", flat=True)
+        )
+        errors = {
+            index: ["Expense with this ID does not exist."]
+            for index, expense_id in enumerate(value)
+            if expense_id not in existing
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+
+    def delete(self):
+        """
+        Delete the validated expenses and return how many were deleted.
+        """
+        queryset = self.context["queryset"].filter(id__in=self.validated_data["ids"])
+        return queryset.delete()[1].get(Expenses._meta.label, 0)
+
+
 class ExpensesSummarySerializer(serializers.Serializer):
     user_id = serializers.UUIDField(
         required=True, validators=[validate_uuid4, validate_user_exists]
     )
-    month = serializers.IntegerField(required=True, min_value=1, max_value=12)
+    # Periods are resolved into half-open ranges, whose end is the day after
+    # the period: 9999-12 and 9999-12-31 would end past `date.max`.
+    year = serializers.IntegerField(required=False, min_value=1, max_value=9998)
+    month = serializers.IntegerField(required=False, min_value=1, max_value=12)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
 
     class Meta:
-        fields = ["user_id", "month"]
+        fields = ["user_id", "year", "month", "start_date", "end_date"]
+
+    def validate_end_date(self, value):
+        if value == date.max:
+            raise serializers.ValidationError(f"Ensure this date is before {date.max}.")
+        return value
 
     def validate(self, data):
         """
-        Ensure the month is a valid number between 1 and 12.
+        Resolve the requested period into half-open `start_date`/`end_date`
+        bounds.
+
+        A period is either a calendar month (`month`, with `year` defaulting to
+        the current year) or an inclusive `start_date`..`end_date` range.
         """
-        if not (1 <= data["month"] <= 12):
-            raise serializers.ValidationError("Month must be between 1 and 12.")
+        if "month" in data:
+            year = data.get("year", timezone.localdate().year)
+            data["start_date"], data["end_date"] = ExpensesSelector.get_month_range(
+                year, data["month"]
+            )
+            return data
+
+        if "start_date" not in data or "end_date" not in data:
+            raise serializers.ValidationError(
+                "Either 'month' or both 'start_date' and 'end_date' are required."
+            )
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError("Start date must be before end date.")
+        data["end_date"] += timedelta(days=1)
         return data
 
     def get_summary(self):
         """
-        Retrieve the total expenses per category for a user in a specified month.
+        Retrieve the total expenses per category for a user in the requested
+        period.
 
         Utilizes the `ExpensesSelector.get_category_summary` method to fetch
         a summary of expenses categorized and totaled for the given user ID
-        and month.
+        and period.
 
         :return: QuerySet with category and total amount of expenses.
         """
         return ExpensesSelector.get_category_summary(
             user_id=self.validated_data["user_id"],
-            month=self.validated_data["month"],
+            start_date=self.validated_data["start_date"],
+            end_date=self.validated_data["end_date"],
         )
 
+    async def aget_summary(self):
+        """
+        Async variant of `get_summary`.
+
+        :return: List of category and total amount rows.
+        """
+        return await ExpensesSelector.aget_category_summary(
+            user_id=self.validated_data["user_id"],
+            start_date=self.validated_data["start_date"],
+            end_date=self.validated_data["end_date"],
+        )
+
+
+class ExpensesAsyncSummarySerializer(ExpensesSummarySerializer):
+    """
+    `ExpensesSummarySerializer` for the async view, whose validation must not
+    touch the ORM: the user is looked up with the async ORM beforehand and
+    passed as the `user` context instead of being checked by
+    `validate_user_exists`.
+    """
+
+    user_id = serializers.UUIDField(required=True, validators=[validate_uuid4])
+
+    def validate_user_id(self, value):
+        user = self.context.get("user")
+        if user is None or user.id != value:
+            raise serializers.ValidationError("User with this ID does not exist.")
+        return value
+
+
+class ExpensesBatchSummarySerializer(ExpensesSummarySerializer):
+    """
+    `ExpensesSummarySerializer` for up to `max_users` users at once: every
+    user is checked with a single query and every summary computed with
+    another.
+    """
+
+    max_users = 1000
+
+    user_id = None
+    user_ids = serializers.ListField(
+        child=serializers.UUIDField(validators=[validate_uuid4]),
+        allow_empty=False,
+        max_length=max_users,
+    )
+
+    class Meta:
+        fields = ["user_ids", "year", "month", "start_date", "end_date"]
+
+    def validate_user_ids(self, value):
+        """
+        Ensure every user exists, reporting the unknown ones by index.
+        """
+        existing = UserSelector.get_existing_user_ids(value)
+        errors = {
+            index: ["User with this ID does not exist."]
+            for index, user_id in enumerate(value)
+            if user_id not in existing
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return list(dict.fromkeys(value))
+
+    def get_summary(self):
+        """
+        Retrieve the total expenses per category of every requested user.
+
+        :return: Dictionary of each user ID to its category and total amount
+            rows.
+        """
+        return ExpensesSelector.get_category_summaries(
+            user_ids=self.validated_data["user_ids"],
+            start_date=self.validated_data["start_date"],
+            end_date=self.validated_data["end_date"],
+        )
+
+
+class ExpensesTotalsSerializer(serializers.Serializer):
+    user_id = serializers.UUIDField(
+        required=True, validators=[validate_uuid4, validate_user_exists]
+    )
+
+    class Meta:
+        fields = ["user_id"]
+
+    def get_totals(self):
+        """
+        Retrieve what the user has spent to date and this month, overall and
+        per category; see `ExpensesSelector.get_running_totals`.
+        """
+        totals = ExpensesSelector.get_running_totals(
+            user_id=self.validated_data["user_id"], today=timezone.localdate()
+        )
+        return {
+            period: {
+                "total_amount": serializers.DecimalField(
+                    max_digits=None, decimal_places=2
+                ).to_representation(sum(row["total_amount"] for row in rows)),
+                "count": sum(row["count"] for row in rows),
+                "categories": ExpensesTotalsResponseSerializer(rows, many=True).data,
+            }
+            for period, rows in totals.items()
+        }
+
+
+class ExpensesChangesSerializer(serializers.Serializer):
+    """
+    Validates an incremental sync request and returns the changes after its
+    `since` token, at most `page_size` of them:
+    `{"updated": [...], "deleted": [...], "token": "...", "has_more": false}`.
+
+    Without `since` the user's whole history is returned, page by page.
+    Clients apply `updated` expenses as upserts and `deleted` IDs as deletes,
+    and pass the returned `token` as the next `since`.
+
+    The token is opaque: it holds the position of the last change returned
+    and, for a full sync, when the sync started. Once there are no more
+    changes it points `EXPENSES_SYNC_OVERLAP` seconds back rather than at the
+    last change, so writes that committed after it with an earlier
+    `updated_at` are still picked up; a change returned twice is harmless.
+    Tokens older than `EXPENSES_TOMBSTONE_RETENTION_DAYS` are rejected, as
+    the deletions since then may have been purged.
+    """
+
+    user_id = serializers.UUIDField(
+        required=True, validators=[validate_uuid4, validate_user_exists]
+    )
+    since = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=1000, default=500
+    )
+
+    invalid_token_message = "Invalid sync token."
+    expired_token_message = "The sync token has expired; sync again without `since`."
+
+    class Meta:
+        fields = ["user_id", "since", "page_size"]
+
+    @staticmethod
+    def encode_token(
+        position: tuple[datetime, uuid.UUID | None], deleted_after: datetime | None
+    ) -> str:
+        timestamp, key = position
+        value = "|".join(
+            [
+                timestamp.isoformat(),
+                str(key or ""),
+                deleted_after.isoformat() if deleted_after else "",
+            ]
+        )
+        return base64.urlsafe_b64encode(value.encode("ascii")).decode("ascii")
+
+    def validate_since(self, value):
+        """
+        Decode the token into the `position` and `deleted_after` arguments of
+        `ExpensesSelector.get_changes`.
+        """
+        try:
+            timestamp, key, deleted_after = (
+                base64.urlsafe_b64decode(value.encode("ascii"))
+                .decode("ascii")
+                .split("|")
+            )
+            position = (
+                datetime.fromisoformat(timestamp),
+                uuid.UUID(key) if key else None,
+            )
+            deleted_after = (
+                datetime.fromisoformat(deleted_after) if deleted_after else None
+            )
+        except (binascii.Error, UnicodeError, ValueError):
+            raise serializers.ValidationError(self.invalid_token_message)
+        if timezone.is_naive(position[0]):
+            raise serializers.ValidationError(self.invalid_token_message)
+
+        retention = timedelta(days=settings.EXPENSES_TOMBSTONE_RETENTION_DAYS)
+        if (deleted_after or position[0]) < timezone.now() - retention:
+            raise serializers.ValidationError(self.expired_token_message)
+        return {"position": position, "deleted_after": deleted_after}
+
+    def get_changes(self):
+        """
+        Retrieve the next page of changes; see `ExpensesSelector.get_changes`.
+        """
+        now = timezone.now()
+        since = self.validated_data.get("since")
+        page_size = self.validated_data["page_size"]
+        if since is None:
+            # A full sync: deletions from before it started concern expenses
+            # it does not return.
+            position = None
+            deleted_after = now - timedelta(seconds=settings.EXPENSES_SYNC_OVERLAP)
+        else:
+            position, deleted_after = since["position"], since["deleted_after"]
+
+        changes = ExpensesSelector.get_changes(
+            user_id=self.validated_data["user_id"],
+            position=position,
+            deleted_after=deleted_after,
+            limit=page_size,
+        )
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        if has_more:
+            token = self.encode_token(
+                (changes[-1].timestamp, changes[-1].key), deleted_after
+            )
+        else:
+            token = self.encode_token(
+                (now - timedelta(seconds=settings.EXPENSES_SYNC_OVERLAP), None), None
+            )
+        return {
+            "updated": ExpensesValuesSerializer(
+                [change.row for change in changes if change.row is not None],
+                many=True,
+            ).data,
+            "deleted": [
+                str(change.expense_id) for change in changes if change.row is None
+            ],
+            "token": token,
+            "has_more": has_more,
+        }
+
+
+class ExpensesAggregateSerializer(serializers.Serializer):
+    """
+    Validates an aggregation request and returns its groups as columns:
+    `{"columns": {"category": [...], "sum": [...]}, "rows": 2}`.
+
+    `group_by` and `metrics` are comma-separated lists of
+    `AGGREGATE_DIMENSIONS` and `AGGREGATE_METRICS`. A request yielding more
+    than `max_groups` groups is rejected rather than truncated.
+    """
+
+    max_groups = 10000
+    too_many_groups_message = (
+        "The aggregation has more than {max_groups} groups; "
+        "narrow the period or the grouping."
+    )
+
+    user_id = serializers.UUIDField(
+        required=False, validators=[validate_uuid4, validate_user_exists]
+    )
+    category = serializers.ChoiceField(
+        required=False, choices=Expenses.CATEGORY_CHOICES
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    group_by = serializers.CharField(default="category")
+    metrics = serializers.CharField(default="sum,count")
+
+    class Meta:
+        fields = [
+            "user_id",
+            "category",
+            "start_date",
+            "end_date",
+            "group_by",
+            "metrics",
+        ]
+
+    def split_choices(self, value, choices):
+        items = value.split(",")
+        unknown = [item for item in items if item not in choices]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown value(s): {', '.join(unknown)}. "
+                f"Must be any of: {', '.join(choices)}."
+            )
+        if len(set(items)) != len(items):
+            raise serializers.ValidationError("Values must not repeat.")
+        return items
+
+    def validate_group_by(self, value):
+        group_by = self.split_choices(value, AGGREGATE_DIMENSIONS)
+        if len(set(group_by).intersection(AGGREGATE_PERIODS)) > 1:
+            raise serializers.ValidationError(
+                "Group by at most one of: " + ", ".join(AGGREGATE_PERIODS) + "."
+            )
+        return group_by
+
+    def validate_metrics(self, value):
+        return self.split_choices(value, AGGREGATE_METRICS)
+
+    def validate_end_date(self, value):
+        if value == date.max:
+            raise serializers.ValidationError(f"Ensure this date is before {date.max}.")
+        return value
+
+    def validate(self, data):
+        """
+        Turn the inclusive `start_date`..`end_date` range into half-open
+        bounds, and reject periods split into more than `max_groups` days,
+        weeks, months or years before running any query.
+        """
+        start_date, end_date = data["start_date"], data["end_date"]
+        if start_date > end_date:
+            raise serializers.ValidationError("Start date must be before end date.")
+        periods = {
+            "day": (end_date - start_date).days + 1,
+            "week": (end_date - start_date).days // 7 + 2,
+            "month": (end_date.year - start_date.year) * 12
+            + end_date.month
+            - start_date.month
+            + 1,
+            "year": end_date.year - start_date.year + 1,
+        }
+        for period in set(data.get("group_by", [])).intersection(periods):
+            if periods[period] > self.max_groups:
+                raise serializers.ValidationError(
+                    self.too_many_groups_message.format(max_groups=self.max_groups)
+                )
+        data["end_date"] += timedelta(days=1)
+        return data
+
+    def get_aggregates(self):
+        """
+        Aggregate the expenses with `ExpensesSelector.get_aggregates` and
+        encode the groups column by column.
+
+        :return: Dictionary of the columns and the number of rows.
+        """
+        data = self.validated_data
+        filters = {key: data[key] for key in ("user_id", "category") if key in data}
+        rows = ExpensesSelector.get_aggregates(
+            start_date=data["start_date"],
+            end_date=data["end_date"],
+            group_by=data["group_by"],
+            metrics=data["metrics"],
+            limit=self.max_groups + 1,
+            **filters,
+        )
+        if len(rows) > self.max_groups:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        self.too_many_groups_message.format(max_groups=self.max_groups)
+                    ]
+                }
+            )
+
+        encode_amount = serializers.DecimalField(
+            max_digits=None, decimal_places=2
+        ).to_representation
+        encoders = {
+            "user": ("user_id", str),
+            "category": ("category", None),
+            "sum": ("sum", encode_amount),
+            "count": ("count", None),
+            "avg": ("avg", encode_amount),
+        }
+        columns = {}
+        for column in data["group_by"] + data["metrics"]:
+            source, encode = encoders.get(column, (column, date.isoformat))
+            columns[column] = [
+                row[source] if encode is None else encode(row[source]) for row in rows
+            ]
+        return {"columns": columns, "rows": len(rows)}
+
 
 class ExpensesSummaryResponseSerializer(serializers.Serializer):
     category = serializers.CharField()
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class ExpensesTotalsResponseSerializer(serializers.Serializer):
+    category = serializers.CharField()
+    # Running totals are not bounded by a period, so no `max_digits`.
+    total_amount = serializers.DecimalField(max_digits=None, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class ExpensesBudgetStatusSerializer(serializers.Serializer):
+    """
+    Budget of the category and month an expense was written to, as returned
+    by `ExpensesSelector.get_budgets`.
+    """
+
+    category = serializers.CharField()
+    amount = serializers.IntegerField()
+    spent = serializers.IntegerField()
+    over_budget = serializers.SerializerMethodField()
+
+    def get_over_budget(self, budget) -> bool:
+        return budget.spent > budget.amount
@@ -4,17 +4,20 @@ from django.core.exceptions import ValidationError
 
 from users.selectors.user import UserSelector
 
+UUID_VERSIONS = (4, 7)
+
 
 def validate_uuid4(value):
     """
-    Validate that the provided value is a valid UUID4.
+    Validate that the provided value is a valid model ID: a random UUID4, or
+    a time-ordered UUID7 generated since `MODEL_ID_VERSION` defaulted to 7.
     """
     try:
-        val = uuid.UUID(str(value), version=4)
+        val = uuid.UUID(str(value))
     except ValueError:
-        raise ValidationError("Invalid UUID format. Must be a valid UUID4.")
-    if str(val) != str(value):
-        raise ValidationError("Invalid UUID4 value.")
+        raise ValidationError("Invalid UUID format. Must be a valid UUID4 or UUID7.")
+    if val.version not in UUID_VERSIONS or str(val) != str(value):
+        raise ValidationError("Invalid UUID4 or UUID7 value.")
     return value
 
 
@@ -0,0 +1,105 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from base.routers import get_read_database
+from users.selectors.user import UserSelector
+
+from ..filters import ExpensesFilter
+from ..models import Expenses
+from ..selectors.expenses import ExpensesSelector
+from .pagination import ExpensesKeysetPagination
+from .serializers import (
+    ExpensesAsyncSummarySerializer,
+    ExpensesSummaryResponseSerializer,
+    ExpensesValuesSerializer,
+)
+
+
+class ExpensesAsyncView(View):
+    """
+    Native async read path for ASGI deployments, so that slow reads wait on
+    the database without holding a worker thread.
+
+    Serves the same filters, summaries and JSON as `GET /api/`. The list is
+    paginated with `ExpensesKeysetPagination`, except search results, whose
+    rank order only page-number pagination keeps.
+    """
+
+    filterset_class = ExpensesFilter
+    pagination_class = ExpensesKeysetPagination
+    renderer = JSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            if request.query_params.get("summary"):
+                data = await self.get_summary_data(request)
+            else:
+                data = await self.get_list_data(request)
+        except APIException as exc:
+            response = exception_handler(exc, {"request": request, "view": self})
+            return self.render(response.data, response.status_code)
+        return self.render(data)
+
+    async def get_list_data(self, request):
+        try:
+            user_id = uuid.UUID(request.query_params.get("user_id", ""))
+        except ValueError:
+            user_id = None
+        database = get_read_database(user_id)
+        if request.query_params.get("search"):
+            # `search` checks for `pg_trgm` once per process, with a
+            # synchronous query; do it here.
+            await ExpensesSelector.ahas_trigram_search(database)
+        filterset = self.filterset_class(
+            request.query_params,
+            queryset=Expenses.objects.using(database).values(
+                *ExpensesValuesSerializer.source_fields
+            ),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        if request.query_params.get("search"):
+            # Django's paginator counts and slices synchronously.
+            paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+            page = await sync_to_async(paginator.paginate_queryset)(
+                filterset.qs, request, view=self
+            )
+            return paginator.get_paginated_response(
+                ExpensesValuesSerializer(page, many=True).data
+            ).data
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(filterset.qs, request, view=self)
+        return {
+            "next": paginator.get_next_link(),
+            "results": ExpensesValuesSerializer(page, many=True).data,
+        }
+
+    async def get_summary_data(self, request):
+        user = await UserSelector.aget_user_by_id(
+            request.query_params.get("user_id", "")
+        )
+        serializer = ExpensesAsyncSummarySerializer(
+            data=request.query_params, context={"user": user}
+        )
+        serializer.is_valid(raise_exception=True)
+        return ExpensesSummaryResponseSerializer(
+            await serializer.aget_summary(), many=True
+        ).data
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status,
+        )
@@ -1,56 +1,445 @@
-from rest_framework import status, serializers
+import uuid
+from datetime import date
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
-from ..models import Expenses
-from ..filters import ExpensesFilter
+from base.routers import get_read_database
+
+from ..models import Expenses, ExpensesBudget
+from ..filters import ExpensesBudgetFilter, ExpensesFilter
 from ..selectors.expenses import ExpensesSelector
+from ..services.cache import ExpensesCacheService
+from ..services.importer import IMPORT_FORMATS, ExpensesImportService
+from .exporters import EXPORT_FIELDS, EXPORTERS
+from .pagination import ExpensesKeysetPagination
 from .serializers import (
+    ExpensesAggregateSerializer,
+    ExpensesBatchSummarySerializer,
+    ExpensesBudgetSerializer,
+    ExpensesBudgetStatusSerializer,
+    ExpensesBulkDeleteSerializer,
+    ExpensesBulkSerializer,
+    ExpensesBulkUpdateSerializer,
+    ExpensesChangesSerializer,
     ExpensesSerializer,
     ExpensesSummarySerializer,
     ExpensesSummaryResponseSerializer,
+    ExpensesTotalsSerializer,
+    ExpensesValuesSerializer,
 )
 
 
 class ExpensesViewSet(ModelViewSet):
-    queryset = Expenses.objects.select_related("user").all()
+    queryset = Expenses.objects.all()
     serializer_class = ExpensesSerializer
     permission_classes = [AllowAny]
     filterset_class = ExpensesFilter
+    bulk_max_items = 5000
+    export_chunk_size = 2000
+    import_chunk_size = 10000
+    import_max_errors = 100
+    # Actions reading from a replica; see `get_read_database`.
+    replica_actions = {"list", "retrieve", "export"}
+    # Most SQL queries each action may run, not counting transaction
+    # statements, with nothing cached: writes include the user lookup and
+    # creating missing rollup and running total rows (an update that moves an
+    # expense touches two of each). Exceeding it is logged by
+    # `RequestMetricsMiddleware` and fails `test_query_budgets`.
+    # `import_expenses` runs a few statements per chunk of the upload and has
+    # no budget.
+    query_budgets = {
+        "list": 2,
+        "retrieve": 1,
+        "create": 7,
+        "update": 10,
+        "partial_update": 10,
+        "destroy": 5,
+        "bulk": 8,
+        "export": 1,
+        "aggregate": 2,
+        "summaries": 2,
+        "totals": 3,
+        "changes": 3,
+    }
 
     def get_queryset(self):
         """
-        Optionally restricts the returned expenses to a user-filtered query,
-        by filtering against query parameters in the request.
+        Read the expenses of `replica_actions` from a replica, unless the
+        `user_id` the request is scoped to has just written.
         """
         queryset = super().get_queryset()
+        if self.action in self.replica_actions:
+            queryset = queryset.using(get_read_database(self.get_cache_user_id()))
         return queryset
 
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination over `(date, id)` when the client asks for it
+        with `?pagination=cursor` (or follows a `cursor` link), and the default
+        page-number pagination otherwise.
+
+        Search results are ranked, an order keyset pagination would replace,
+        so they can not be cursor-paginated.
+        """
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                if params.get("search"):
+                    raise serializers.ValidationError(
+                        {"search": [ExpensesKeysetPagination.search_message]}
+                    )
+                self._paginator = ExpensesKeysetPagination()
+        return super().paginator
+
     def list(self, request, *args, **kwargs):
         """
         Overrides the default `list` method to apply filtering and optionally provide summaries.
+
+        Requests scoped to a `user_id` are cached under the user's version
+        (see `ExpensesCacheService`) and answered with an `ETag`. A request
+        whose `If-None-Match` matches the current `ETag` gets a `304` without
+        any database work.
         """
-        if request.query_params.get("summary"):
+        user_id = self.get_cache_user_id()
+        if user_id is None:
+            return self.get_list_response()
+
+        version = ExpensesCacheService.get_version(user_id)
+        response_key = ExpensesCacheService.get_response_key(
+            user_id, version, self.get_cache_request_key()
+        )
+        etag = ExpensesCacheService.get_etag(response_key)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = ExpensesCacheService.get_response(response_key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = self.get_list_response()
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                ExpensesCacheService.set_response(response_key, response.data)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_list_response(self):
+        if self.request.query_params.get("summary"):
             serializer = ExpensesSummaryResponseSerializer(
                 self.get_summary_data(), many=True
             )
             return Response(serializer.data)
-        return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_values_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = ExpensesValuesSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(ExpensesValuesSerializer(queryset, many=True).data)
+
+    def get_cache_user_id(self):
+        """
+        Return the user a list or summary request is scoped to, or `None` if
+        its response is not cached.
+        """
+        try:
+            return uuid.UUID(self.request.query_params["user_id"])
+        except (KeyError, ValueError):
+            return None
+
+    def get_cache_request_key(self):
+        """
+        Identify the response to a request independently of the order of its
+        query parameters. Summaries default to the current year, which is
+        made explicit so they are not served across a year boundary.
+        """
+        params = dict(self.request.query_params.lists())
+        if params.get("summary") and "year" not in params:
+            params["year"] = [str(timezone.localdate().year)]
+        return "%s?%s" % (
+            self.request.build_absolute_uri(self.request.path),
+            urlencode(sorted(params.items()), doseq=True),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Overrides the default `retrieve` method to read the expense as a
+        `.values()` row and encode it with `ExpensesValuesSerializer`, from
+        the primary if the replica does not have it yet.
+        """
+        queryset = self.filter_queryset(self.get_values_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            row = queryset.first()
+            if row is None and queryset.db != DEFAULT_DB_ALIAS:
+                # The expense may have been created after the replica's
+                # last update.
+                row = queryset.using(DEFAULT_DB_ALIAS).first()
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            raise Http404
+        self.check_object_permissions(request, row)
+        return Response(ExpensesValuesSerializer(row).data)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Overrides the default `create` method to add the status of the budget
+        the expense counts towards; see `get_budget_status`.
+        """
+        # The budget is read in the write's transaction, after the expense's
+        # rollup row was updated and locked, so its spend includes this
+        # expense and every write committed before it.
+        with transaction.atomic():
+            response = super().create(request, *args, **kwargs)
+            response.data["budget"] = self.get_budget_status(response.data)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        """
+        Overrides the default `update` method (and `partial_update`) to add
+        the status of the budget the expense counts towards; see
+        `get_budget_status`.
+        """
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+            response.data["budget"] = self.get_budget_status(response.data)
+        return response
+
+    def get_budget_status(self, expense):
+        """
+        Return the user's budget for the category of a written expense, with
+        what was spent against it in the expense's month and whether that is
+        over it, or `None` without a budget.
+
+        A single query on the budget and the maintained monthly rollup, so
+        the month's expenses are not summed on every write.
+        """
+        expense_date = date.fromisoformat(expense["date"])
+        budget = ExpensesSelector.get_budgets(
+            expense_date.year,
+            expense_date.month,
+            user_id=expense["user"],
+            category=expense["category"],
+        ).first()
+        return budget and ExpensesBudgetStatusSerializer(budget).data
+
+    def get_values_queryset(self):
+        """
+        Return the queryset as the plain rows `ExpensesValuesSerializer`
+        encodes.
+        """
+        return self.get_queryset().values(*ExpensesValuesSerializer.source_fields)
 
     def get_summary_data(self):
         """
-        Retrieve summary data (total expenses per category) for a user in a specified month.
+        Retrieve summary data (total expenses per category) for a user in a
+        specified month (`year` and `month`) or date range (`start_date` and
+        `end_date`).
         """
-        user_id = self.request.query_params.get("user_id")
-        month = self.request.query_params.get("month")
+        serializer = ExpensesSummarySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.get_summary()
 
-        if not user_id or not month:
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create (`POST`, a list of expenses), partially update (`PATCH`, a list
+        of expenses with their `id`) or delete (`DELETE`, `{"ids": [...]}`) up
+        to `bulk_max_items` expenses in a single transaction.
+
+        Validation errors are returned per item, in request order, and nothing
+        is written unless every item is valid.
+        """
+        with transaction.atomic():
+            if request.method == "DELETE":
+                serializer = ExpensesBulkDeleteSerializer(
+                    data=request.data,
+                    context={
+                        "queryset": Expenses.objects.all(),
+                        "max_length": self.bulk_max_items,
+                    },
+                )
+                serializer.is_valid(raise_exception=True)
+                return Response({"deleted": serializer.delete()})
+
+            if request.method == "PATCH":
+                serializer = ExpensesBulkUpdateSerializer(
+                    Expenses.objects.all(),
+                    data=request.data,
+                    many=True,
+                    partial=True,
+                    max_length=self.bulk_max_items,
+                )
+                response_status = status.HTTP_200_OK
+            else:
+                serializer = ExpensesBulkSerializer(
+                    data=request.data, many=True, max_length=self.bulk_max_items
+                )
+                response_status = status.HTTP_201_CREATED
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data, status=response_status)
+
+    @action(detail=False, methods=["post"], url_path="summaries")
+    def summaries(self, request, *args, **kwargs):
+        """
+        Return the per-category summaries of a list of `user_ids` for a month
+        (`year` and `month`) or date range (`start_date` and `end_date`),
+        keyed by user ID.
+        """
+        serializer = ExpensesBatchSummarySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {
+                str(user_id): ExpensesSummaryResponseSerializer(rows, many=True).data
+                for user_id, rows in serializer.get_summary().items()
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="totals")
+    def totals(self, request, *args, **kwargs):
+        """
+        Return what a `user_id` has spent to date and this calendar month,
+        overall and per category, from the maintained running totals and
+        monthly rollups.
+        """
+        serializer = ExpensesTotalsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.get_totals())
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request, *args, **kwargs):
+        """
+        Return the expenses of a `user_id` written and deleted since a sync
+        `token` (`since`), or all of them without one, for clients keeping
+        a local copy; see `ExpensesChangesSerializer`.
+        """
+        serializer = ExpensesChangesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.get_changes())
+
+    @action(detail=False, methods=["get"], url_path="aggregate")
+    def aggregate(self, request, *args, **kwargs):
+        """
+        Aggregate the expenses of an inclusive `start_date`..`end_date` period
+        grouped by any combination of category, user and one of
+        day/week/month/year, optionally for a single `user_id` or `category`.
+
+        The grouping runs as a single SQL query and the groups are returned
+        as columns; see `ExpensesAggregateSerializer`.
+        """
+        serializer = ExpensesAggregateSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.get_aggregates())
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every expense matching the `ExpensesFilter` query parameters as
+        NDJSON (default) or CSV (`?export_format=csv`), ordered by date.
+
+        Rows are read through a server-side cursor as plain value tuples and
+        encoded as they arrive, so memory use does not depend on the size of
+        the export.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORTERS:
+            raise serializers.ValidationError(
+                {"export_format": [f"Must be one of: {', '.join(EXPORTERS)}."]}
+            )
+        encode, content_type = EXPORTERS[export_format]
+
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .order_by("date", "id")
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        response = StreamingHttpResponse(encode(rows), content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="expenses.{export_format}"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_expenses(self, request, *args, **kwargs):
+        """
+        Bulk-import the expenses of an uploaded CSV or NDJSON `file` (as
+        written by `export`), in the format given by `import_format` or the
+        file extension.
+
+        Rows are parsed and loaded in chunks; see `ExpensesImportService`.
+        Invalid rows are skipped and the first `import_max_errors` of them are
+        returned with their line number.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise serializers.ValidationError({"file": ["No file was submitted."]})
+        import_format = request.data.get("import_format") or (
+            upload.name.rpartition(".")[2].lower()
+        )
+        if import_format not in IMPORT_FORMATS:
             raise serializers.ValidationError(
-                {
-                    "error": "Both 'user_id' and 'month' query parameters are required for a summary."
-                }
+                {"import_format": [f"Must be one of: {', '.join(IMPORT_FORMATS)}."]}
+            )
+
+        try:
+            result = ExpensesImportService.import_expenses(
+                (line.decode("utf-8") for line in upload),
+                import_format,
+                self.import_chunk_size,
+                self.import_max_errors,
             )
+        except UnicodeDecodeError:
+            raise serializers.ValidationError({"file": ["Must be UTF-8 encoded."]})
+        result["errors"] = [
+            {"line": line_number, "errors": errors}
+            for line_number, errors in result["errors"]
+        ]
+        return Response(result, status=status.HTTP_201_CREATED)
+
 
-        return ExpensesSelector.get_category_summary(user_id=user_id, month=month)
+class ExpensesBudgetViewSet(ModelViewSet):
+    """
+    Monthly budgets per user and category. Expense writes report the status
+    of the budget they count towards; see `ExpensesViewSet.get_budget_status`.
+    """
+
+    queryset = ExpensesBudget.objects.order_by("user_id", "category")
+    serializer_class = ExpensesBudgetSerializer
+    permission_classes = [AllowAny]
+    filterset_class = ExpensesBudgetFilter
+    # As in `ExpensesViewSet`, with nothing cached: writes include the user
+    # lookup and the unique `(user, category)` check.
+    query_budgets = {
+        "list": 2,
+        "retrieve": 1,
+        "create": 3,
+        "update": 4,
+        "partial_update": 4,
+        "destroy": 2,
+    }
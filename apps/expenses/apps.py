@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ExpensesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "expenses"
+
+    def ready(self):
+        from base.cache import check_shared_cache
+
+        from . import signals  # noqa: F401
+
+        check_shared_cache("EXPENSES_CACHE_ALIAS")
@@ -1,13 +1,29 @@
 import django_filters
 
-from .models import Expenses
+from .models import Expenses, ExpensesBudget
+from .selectors.expenses import ExpensesSelector
 
 
 class ExpensesFilter(django_filters.FilterSet):
     user_id = django_filters.UUIDFilter(field_name="user_id", lookup_expr="exact")
     start_date = django_filters.DateFilter(field_name="date", lookup_expr="gte")
     end_date = django_filters.DateFilter(field_name="date", lookup_expr="lte")
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Expenses
-        fields = ["user_id", "start_date", "end_date"]
+        fields = ["user_id", "start_date", "end_date", "search"]
+
+    def filter_search(self, queryset, name, value):
+        """
+        Full-text and fuzzy title search, ranked; see `ExpensesSelector.search`.
+        """
+        return ExpensesSelector.search(queryset, value)
+
+
+class ExpensesBudgetFilter(django_filters.FilterSet):
+    user_id = django_filters.UUIDFilter(field_name="user_id", lookup_expr="exact")
+
+    class Meta:
+        model = ExpensesBudget
+        fields = ["user_id", "category"]
@@ -0,0 +1,130 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from users.models import User
+
+MODES = {
+    # mode: environment of the run
+    "per-request": {"POSTGRES_POOL": "False", "POSTGRES_CONN_MAX_AGE": "0"},
+    "persistent": {"POSTGRES_POOL": "False", "POSTGRES_CONN_MAX_AGE": "60"},
+    "pool": {"POSTGRES_POOL": "True"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec, latency percentiles and Postgres connections "
+        "opened when serving monthly summaries from a thread pool (as with "
+        "threaded gunicorn workers) with a connection per request, persistent "
+        "connections and the psycopg pool. Each mode runs in a subprocess "
+        "configured through the POSTGRES_* environment variables read by the "
+        "settings. Requests go through the WSGI handler rather than the test "
+        "client, which keeps connections open across requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--mode", choices=list(MODES), action="append")
+
+    def handle(self, *args, **options):
+        modes = options["mode"] or list(MODES)
+        if len(modes) == 1 and os.environ.get("BENCHMARK_CONNECTIONS_CHILD"):
+            return self.run(modes[0], options)
+
+        for mode in modes:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    sys.argv[0],
+                    "benchmark_connections",
+                    f"--mode={mode}",
+                    f"--requests={options['requests']}",
+                    f"--concurrency={options['concurrency']}",
+                ],
+                env={**os.environ, **MODES[mode], "BENCHMARK_CONNECTIONS_CHILD": "1"},
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode:
+                raise CommandError(result.stderr)
+            self.stdout.write(result.stdout, ending="")
+
+    def run(self, mode, options):
+        user_ids = [
+            str(user_id) for user_id in User.objects.values_list("id", flat=True)
+        ]
+        if not user_ids:
+            raise CommandError("No users to query; load some data first.")
+        sessions = self.count_sessions()
+        connection.close()
+
+        handler = WSGIHandler()
+        factory = RequestFactory()
+
+        def request(i):
+            # A distinct `_` parameter bypasses the response cache.
+            environ = factory.get(
+                "/api/",
+                {
+                    "summary": 1,
+                    "user_id": user_ids[i % len(user_ids)],
+                    "year": 2024,
+                    "month": 11,
+                    "_": i,
+                },
+            ).environ
+            start = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            response.close()
+            latency = time.perf_counter() - start
+            if response.status_code != 200:
+                raise CommandError(f"Request failed with {response.status_code}")
+            return latency
+
+        # The request factory sends `Host: testserver`.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ), ThreadPoolExecutor(options["concurrency"]) as executor:
+            start = time.perf_counter()
+            latencies = list(executor.map(request, range(options["requests"])))
+            elapsed = time.perf_counter() - start
+            # Close the persistent connections of the worker threads.
+            list(
+                executor.map(
+                    lambda _: connections.close_all(), range(options["concurrency"])
+                )
+            )
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{mode:<12} {len(latencies) / elapsed:>9,.0f} req/sec"
+            f"  p50 {quantiles[49] * 1000:>6.2f} ms"
+            f"  p99 {quantiles[98] * 1000:>6.2f} ms"
+            f"  {self.count_sessions() - sessions - 1:>6} connections opened"
+        )
+
+    def count_sessions(self):
+        """
+        Return how many sessions the server has established to the database,
+        after giving the statistics of finished sessions time to be flushed.
+        """
+        time.sleep(1)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+            cursor.execute(
+                "SELECT sessions FROM pg_stat_database WHERE datname = "
+                "current_database()"
+            )
+            return cursor.fetchone()[0]
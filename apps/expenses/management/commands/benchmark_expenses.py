@@ -0,0 +1,388 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import count
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from expenses.models import Expenses
+from expenses.selectors.expenses import ExpensesSelector
+from expenses.services.generator import ExpensesGeneratorService
+
+END_DATE = date(2024, 12, 31)
+DAYS = 730
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every ExpensesSelector method and ExpensesViewSet action at "
+        "several dataset sizes, recording query counts, latency percentiles "
+        "and peak memory as JSON. Runs against a throwaway test database that "
+        "is filled with generate_expenses data and dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000",
+            help="Comma-separated numbers of expenses to benchmark at.",
+        )
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument(
+            "--compare",
+            help="Print the change against a previous JSON results file.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["sizes"].split(","))
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            # The test clients send `Host: testserver`.
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                results = self.run_suite(sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {"meta": self.get_meta(options), "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+        if options["compare"]:
+            with open(options["compare"]) as baseline:
+                self.write_comparison(json.load(baseline)["results"], results)
+
+    def get_meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "users": options["users"],
+            "iterations": options["iterations"],
+            "seed": options["seed"],
+        }
+
+    def run_suite(self, sizes, options):
+        rng = random.Random(options["seed"])
+        user_ids = ExpensesGeneratorService.create_users(options["users"], rng)
+        category_mix = ExpensesGeneratorService.parse_category_mix(
+            "food=6,travel=2,utilities=2"
+        )
+        results = []
+        generated = 0
+        for size in sizes:
+            generated += ExpensesGeneratorService.create_expenses(
+                user_ids,
+                size - generated,
+                start_date=END_DATE - timedelta(days=DAYS - 1),
+                end_date=END_DATE,
+                category_mix=category_mix,
+                skew=1.1,
+                rng=rng,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            self.stderr.write(f"Benchmarking {size} expenses...")
+            for name, run, prepare in self.get_cases():
+                result = self.measure(run, prepare, options["iterations"])
+                results.append({"size": size, "case": name, **result})
+        return results
+
+    def get_cases(self):
+        """
+        Return `(name, run, prepare)` for every benchmarked operation.
+        `prepare`, if set, builds the argument of one `run` call outside of
+        the timed section.
+
+        The benchmarked user is the heaviest one. Read requests carry a
+        distinct `_` parameter so the per-user response cache is bypassed.
+        """
+        user_id = (
+            Expenses.objects.values("user_id")
+            .annotate(expenses=Count("id"))
+            .order_by("-expenses")
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        user = str(user_id)
+        expense_id = (
+            Expenses.objects.filter(user_id=user_id).values_list("id", flat=True)
+        ).first()
+        client = APIClient()
+        async_client = AsyncClient()
+        nonce = count()
+        month = {"year": 2024, "month": 6}
+        date_range = {"start_date": "2024-04-10", "end_date": "2024-07-20"}
+        item = {
+            "user": user,
+            "title": "Benchmark",
+            "amount": 10,
+            "date": "2024-06-15",
+            "category": "food",
+        }
+
+        def get(path, params):
+            response = client.get(path, {**params, "_": next(nonce)})
+            self.check_response(response)
+            return response
+
+        def create_expenses(number):
+            return [
+                str(expense.id)
+                for expense in Expenses.objects.bulk_create(
+                    Expenses(
+                        user_id=user_id,
+                        title="Benchmark",
+                        amount=10,
+                        date=date(2024, 6, 15),
+                        category="food",
+                    )
+                    for _ in range(number)
+                )
+            ]
+
+        def request(method, path, data=None):
+            response = getattr(client, method)(path, data, format="json")
+            self.check_response(response)
+
+        def async_get(params):
+            response = async_to_sync(async_client.get)(
+                "/api/async/", {**params, "_": next(nonce)}
+            )
+            self.check_response(response)
+
+        return [
+            (
+                "selector.list_expenses_by_user[:100]",
+                lambda _: list(ExpensesSelector.list_expenses_by_user(user_id)[:100]),
+                None,
+            ),
+            (
+                "selector.list_expenses_by_date_range",
+                lambda _: list(
+                    ExpensesSelector.list_expenses_by_date_range(
+                        user_id, "2024-06-01", "2024-06-30"
+                    )
+                ),
+                None,
+            ),
+            (
+                "selector.get_category_summary[months]",
+                lambda _: list(
+                    ExpensesSelector.get_category_summary(
+                        user_id, date(2024, 4, 1), date(2024, 8, 1)
+                    )
+                ),
+                None,
+            ),
+            (
+                "selector.get_category_summary[range]",
+                lambda _: list(
+                    ExpensesSelector.get_category_summary(
+                        user_id, date(2024, 4, 10), date(2024, 7, 21)
+                    )
+                ),
+                None,
+            ),
+            (
+                "selector.get_monthly_category_summary",
+                lambda _: list(
+                    ExpensesSelector.get_monthly_category_summary(user_id, 2024, 6)
+                ),
+                None,
+            ),
+            (
+                "selector.alist_expenses_by_date_range",
+                lambda _: async_to_sync(ExpensesSelector.alist_expenses_by_date_range)(
+                    user_id, "2024-06-01", "2024-06-30"
+                ),
+                None,
+            ),
+            (
+                "selector.aget_monthly_category_summary",
+                lambda _: async_to_sync(ExpensesSelector.aget_monthly_category_summary)(
+                    user_id, 2024, 6
+                ),
+                None,
+            ),
+            ("viewset.list", lambda _: get("/api/", {"user_id": user}), None),
+            (
+                "viewset.list[cursor]",
+                lambda _: get("/api/", {"user_id": user, "pagination": "cursor"}),
+                None,
+            ),
+            (
+                "viewset.list[summary,month]",
+                lambda _: get("/api/", {"summary": 1, "user_id": user, **month}),
+                None,
+            ),
+            (
+                "viewset.list[summary,range]",
+                lambda _: get("/api/", {"summary": 1, "user_id": user, **date_range}),
+                None,
+            ),
+            ("viewset.retrieve", lambda _: get(f"/api/{expense_id}/", {}), None),
+            ("viewset.create", lambda _: request("post", "/api/", item), None),
+            (
+                "viewset.update",
+                lambda _: request("put", f"/api/{expense_id}/", item),
+                None,
+            ),
+            (
+                "viewset.partial_update",
+                lambda _: request("patch", f"/api/{expense_id}/", {"amount": 20}),
+                None,
+            ),
+            (
+                "viewset.destroy",
+                lambda ids: request("delete", f"/api/{ids[0]}/"),
+                lambda: create_expenses(1),
+            ),
+            (
+                "viewset.bulk[create,100]",
+                lambda _: request("post", "/api/bulk/", [item] * 100),
+                None,
+            ),
+            (
+                "viewset.bulk[update,100]",
+                lambda ids: request(
+                    "patch", "/api/bulk/", [{"id": id, "amount": 20} for id in ids]
+                ),
+                lambda: create_expenses(100),
+            ),
+            (
+                "viewset.bulk[delete,100]",
+                lambda ids: request("delete", "/api/bulk/", {"ids": ids}),
+                lambda: create_expenses(100),
+            ),
+            (
+                "viewset.export[ndjson,month]",
+                lambda _: b"".join(
+                    get(
+                        "/api/export/",
+                        {
+                            "user_id": user,
+                            "start_date": "2024-06-01",
+                            "end_date": "2024-06-30",
+                        },
+                    ).streaming_content
+                ),
+                None,
+            ),
+            (
+                "async.list[cursor]",
+                lambda _: async_get({"user_id": user}),
+                None,
+            ),
+            (
+                "async.list[summary,range]",
+                lambda _: async_get({"summary": 1, "user_id": user, **date_range}),
+                None,
+            ),
+        ]
+
+    def measure(self, run, prepare, iterations):
+        """
+        Run one warm-up call, one call counting queries, one call tracing
+        memory and `iterations` timed calls.
+        """
+
+        def call():
+            argument = prepare() if prepare else None
+            start = time.perf_counter()
+            run(argument)
+            return time.perf_counter() - start
+
+        call()
+        # Not `CaptureQueriesContext`: requests reset `connection.queries`.
+        queries = []
+        with connection.execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)
+        ):
+            call()
+        tracemalloc.start()
+        try:
+            call()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        latencies = sorted(call() for _ in range(iterations))
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {
+            "queries": len(queries),
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies) * 1000, 3),
+                "p50": round(quantiles[49] * 1000, 3),
+                "p95": round(quantiles[94] * 1000, 3),
+                "p99": round(quantiles[98] * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+            "peak_memory_kib": round(peak_memory / 1024, 1),
+        }
+
+    def check_response(self, response):
+        if response.status_code >= 400:
+            raise CommandError(
+                f"Request failed with {response.status_code}: {response.content[:200]}"
+            )
+
+    def write_comparison(self, baseline, results):
+        previous = {(result["size"], result["case"]): result for result in baseline}
+        self.stderr.write(
+            f"{'size':>9} {'case':<42} {'p50 ms':>16} {'p99 ms':>16} {'queries':>9}"
+        )
+        for result in results:
+            before = previous.get((result["size"], result["case"]))
+            if before is None:
+                continue
+            columns = [
+                f"{result['size']:>9} {result['case']:<42}",
+                *(
+                    self.format_change(
+                        before["latency_ms"][key], result["latency_ms"][key]
+                    )
+                    for key in ("p50", "p99")
+                ),
+                f"{before['queries']:>4}->{result['queries']:<4}",
+            ]
+            self.stderr.write(" ".join(columns))
+
+    def format_change(self, before, after):
+        change = (after - before) / before * 100 if before else 0
+        return f"{after:>8.2f} ({change:+5.0f}%)"
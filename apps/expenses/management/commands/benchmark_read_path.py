@@ -0,0 +1,120 @@
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from users.models import User
+
+MODES = {
+    # mode: (handler, path)
+    "wsgi": ("wsgi", "/api/"),
+    "asgi-sync": ("asgi", "/api/"),
+    "asgi-async": ("asgi", "/api/async/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency percentiles of the expense list and "
+        "summary reads served by the WSGI handler from a thread pool (as with "
+        "threaded gunicorn workers), and by the ASGI handler from an event loop "
+        "(as with uvicorn) through the sync viewset and the async view. "
+        "Requests run in-process against the configured database, each with a "
+        "distinct `_` parameter so the response cache is bypassed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--kind", choices=["summary", "range-summary", "list"], default="summary"
+        )
+        parser.add_argument("--mode", choices=list(MODES), action="append")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: every query is recorded in memory.")
+        user_ids = [
+            str(user_id) for user_id in User.objects.values_list("id", flat=True)
+        ]
+        if not user_ids:
+            raise CommandError("No users to query; load some data first.")
+        connection.close()
+
+        rng = random.Random(0)
+        params = [
+            {**self.get_params(options["kind"], rng.choice(user_ids)), "_": i}
+            for i in range(options["requests"])
+        ]
+        for mode in options["mode"] or list(MODES):
+            handler, path = MODES[mode]
+            run = self.run_wsgi if handler == "wsgi" else self.run_asgi
+            # The test clients send `Host: testserver`.
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                elapsed, latencies = run(path, params, options["concurrency"])
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{mode:<11} {len(latencies) / elapsed:>9,.0f} req/sec"
+                f"  p50 {quantiles[49] * 1000:>7.1f} ms"
+                f"  p99 {quantiles[98] * 1000:>7.1f} ms"
+            )
+
+    def get_params(self, kind, user_id):
+        if kind == "summary":
+            return {"summary": 1, "user_id": user_id, "year": 2024, "month": 11}
+        if kind == "range-summary":
+            return {
+                "summary": 1,
+                "user_id": user_id,
+                "start_date": "2024-01-10",
+                "end_date": "2024-11-20",
+            }
+        return {"user_id": user_id, "pagination": "cursor", "page_size": 50}
+
+    def check_response(self, response):
+        if response.status_code != 200:
+            raise CommandError(
+                f"Request failed with {response.status_code}: {response.content[:200]}"
+            )
+
+    def run_wsgi(self, path, params, concurrency):
+        def request(request_params):
+            start = time.perf_counter()
+            response = Client().get(path, request_params)
+            latency = time.perf_counter() - start
+            self.check_response(response)
+            return latency
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            start = time.perf_counter()
+            latencies = list(executor.map(request, params))
+            elapsed = time.perf_counter() - start
+        return elapsed, latencies
+
+    def run_asgi(self, path, params, concurrency):
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request(request_params):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(path, request_params)
+                    latency = time.perf_counter() - start
+                self.check_response(response)
+                return latency
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(request(p) for p in params))
+            return time.perf_counter() - start, latencies
+
+        return asyncio.run(run())
@@ -0,0 +1,65 @@
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from expenses.api.serializers import ExpensesSerializer, ExpensesValuesSerializer
+from expenses.models import Expenses
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the rows/sec of ExpensesSerializer and the values-based "
+        "ExpensesValuesSerializer on in-memory rows (no database access)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": uuid.uuid4(),
+                "title": f"Expense {i}",
+                "amount": i % 1000 + 1,
+                "date": date(2024, 1, 1) + timedelta(days=i % 365),
+                "category": Expenses.CATEGORY_CHOICES[i % 3][0],
+            }
+            for i in range(options["rows"])
+        ]
+        instances = [Expenses(**row) for row in rows]
+        renderer = JSONRenderer()
+
+        model_output = renderer.render(ExpensesSerializer(instances, many=True).data)
+        values_output = renderer.render(ExpensesValuesSerializer(rows, many=True).data)
+        if model_output != values_output:
+            self.stderr.write("Outputs differ.")
+
+        for name, serialize in (
+            (
+                "ExpensesSerializer",
+                lambda: ExpensesSerializer(instances, many=True).data,
+            ),
+            (
+                "ExpensesValuesSerializer",
+                lambda: ExpensesValuesSerializer(rows, many=True).data,
+            ),
+        ):
+            serialized = min(self.time(serialize) for _ in range(options["repeat"]))
+            rendered = min(
+                self.time(lambda: renderer.render(serialize()))
+                for _ in range(options["repeat"])
+            )
+            self.stdout.write(
+                f"{name:<26} {len(rows) / serialized:>12,.0f} rows/sec serialized"
+                f" {len(rows) / rendered:>12,.0f} rows/sec rendered to JSON"
+            )
+
+    def time(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,171 @@
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter for every sample: time `django.setup()`, loading
+# the WSGI application and serving the first request in-process, and print
+# the timings as JSON on the last line of stdout.
+CHILD_SCRIPT = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from config.wsgi import application
+loaded = time.perf_counter()
+path, _, query = sys.argv[1].partition("?")
+environ = {"PATH_INFO": path, "QUERY_STRING": query, "HTTP_HOST": "localhost"}
+setup_testing_defaults(environ)
+status = []
+body = application(environ, lambda status_line, headers: status.append(status_line))
+b"".join(body)
+done = time.perf_counter()
+print(json.dumps({
+    "setup": setup - start,
+    "wsgi": loaded - setup,
+    "first_request": done - loaded,
+    "status": status[0],
+}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: run a fresh interpreter with `python -X "
+        "importtime` several times and record the time from process start to "
+        "the end of the first request (split into `django.setup()`, loading "
+        "the WSGI application and the request itself), the total import time "
+        "and the slowest top-level imports, as JSON that can be compared with "
+        "a run from another commit. Pass --settings=config.production to "
+        "measure the production profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument(
+            "--path", default="/schema/", help="Path of the first request."
+        )
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument(
+            "--compare",
+            help="Print the change against a previous JSON results file.",
+        )
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be positive.")
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE
+            ),
+            "PYTHONPATH": os.pathsep.join(
+                [str(settings.BASE_DIR), os.environ.get("PYTHONPATH", "")]
+            ),
+        }
+
+        samples = []
+        for _ in range(options["runs"]):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    *("-X", "importtime", "-c", CHILD_SCRIPT),
+                    options["path"],
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            wall = time.perf_counter() - start
+            if result.returncode:
+                raise CommandError(result.stderr[-2000:])
+            timings = json.loads(result.stdout.strip().splitlines()[-1])
+            samples.append({"total": wall, **timings, **self.parse(result.stderr)})
+
+        results = self.summarize(samples, options["top"])
+        report = {"meta": self.get_meta(env, options), "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+        if options["compare"]:
+            with open(options["compare"]) as baseline:
+                self.write_comparison(json.load(baseline)["results"], results)
+
+    def parse(self, importtime: str) -> dict:
+        """
+        Sum the self time of every import in `-X importtime` output and
+        collect the cumulative time of the top-level ones, in seconds.
+        """
+        total, modules = 0, {}
+        for match in IMPORTTIME_LINE.finditer(importtime):
+            own, cumulative, indent, module = match.groups()
+            total += int(own)
+            if len(indent) == 1:
+                modules[module] = int(cumulative) / 1e6
+        return {"imports": total / 1e6, "modules": modules}
+
+    def summarize(self, samples: list[dict], top: int) -> dict:
+        statuses = {sample["status"] for sample in samples}
+        results = {
+            metric: round(statistics.median(s[metric] for s in samples), 4)
+            for metric in ("total", "setup", "wsgi", "first_request", "imports")
+        }
+        modules = {}
+        for sample in samples:
+            for module, seconds in sample["modules"].items():
+                modules.setdefault(module, []).append(seconds)
+        slowest = sorted(
+            ((module, statistics.median(times)) for module, times in modules.items()),
+            key=lambda item: -item[1],
+        )
+        results["status"] = ", ".join(sorted(statuses))
+        results["slowest_imports"] = {
+            module: round(seconds, 4) for module, seconds in slowest[:top]
+        }
+        return results
+
+    def get_meta(self, env: dict, options: dict) -> dict:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "settings": env["DJANGO_SETTINGS_MODULE"],
+            "path": options["path"],
+            "runs": options["runs"],
+        }
+
+    def write_comparison(self, baseline: dict, results: dict) -> None:
+        self.stdout.write(
+            f"{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}"
+        )
+        for metric in ("total", "setup", "wsgi", "first_request", "imports"):
+            old, new = baseline.get(metric), results[metric]
+            change = f"{(new - old) / old:+.1%}" if old else "-"
+            self.stdout.write(
+                f"{metric:<16}{old if old is not None else '-':>12}{new:>12}{change:>10}"
+            )
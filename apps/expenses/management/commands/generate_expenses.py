@@ -0,0 +1,73 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.services.generator import ExpensesGeneratorService
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic, skewed dataset of users and expenses for "
+        "benchmarking, using bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--expenses", type=int, default=1000000)
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            default=date.today(),
+            help="Date of the most recent expenses (default: today).",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=730,
+            help="Number of days the expenses are spread over, up to --end-date.",
+        )
+        parser.add_argument(
+            "--categories",
+            default="food=6,travel=2,utilities=2",
+            help="Relative weights of the categories, e.g. food=6,travel=2.",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of the expenses per user; 0 spreads them evenly.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            category_mix = ExpensesGeneratorService.parse_category_mix(
+                options["categories"]
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+        if options["users"] < 1 or options["days"] < 1:
+            raise CommandError("--users and --days must be positive.")
+
+        rng = random.Random(options["seed"])
+        start = time.perf_counter()
+        user_ids = ExpensesGeneratorService.create_users(options["users"], rng)
+        created = ExpensesGeneratorService.create_expenses(
+            user_ids,
+            options["expenses"],
+            start_date=options["end_date"] - timedelta(days=options["days"] - 1),
+            end_date=options["end_date"],
+            category_mix=category_mix,
+            skew=options["skew"],
+            rng=rng,
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(user_ids)} users and {created} expenses "
+                f"in {time.perf_counter() - start:.1f}s."
+            )
+        )
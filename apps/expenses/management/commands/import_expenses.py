@@ -0,0 +1,71 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.services.importer import IMPORT_FORMATS, ExpensesImportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import expenses from a CSV or NDJSON file, using COPY on "
+        "PostgreSQL. Invalid rows are reported by line number and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=100,
+            help="Most rejected rows to print; all of them are counted.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Pass --format, the file extension is not known.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        start = time.perf_counter()
+        try:
+            if path == "-":
+                result = ExpensesImportService.import_expenses(
+                    sys.stdin,
+                    import_format,
+                    options["chunk_size"],
+                    options["max_errors"],
+                )
+            else:
+                with open(path, newline="", encoding="utf-8") as lines:
+                    result = ExpensesImportService.import_expenses(
+                        lines,
+                        import_format,
+                        options["chunk_size"],
+                        options["max_errors"],
+                    )
+        except OSError as exc:
+            raise CommandError(exc)
+        elapsed = time.perf_counter() - start
+
+        for line_number, errors in result["errors"]:
+            self.stderr.write(
+                f"line {line_number}: "
+                + "; ".join(f"{field}: {error}" for field, error in errors.items())
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} expenses in {elapsed:.1f}s "
+                f"({result['created'] / elapsed:,.0f} rows/sec); "
+                f"rejected {result['rejected']} rows."
+            )
+        )
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from expenses.services.partitions import ExpensesPartitionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the upcoming partitions of the expenses table and optionally "
+        "detach (or drop) the partitions of old periods."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.EXPENSES_PARTITIONS_AHEAD,
+            help="Number of upcoming intervals to create partitions for.",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=date.fromisoformat,
+            help="Detach the partitions ending on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions instead of keeping them as tables.",
+        )
+
+    def handle(self, *args, **options):
+        if not ExpensesPartitionService.is_partitioned():
+            raise CommandError("The expenses table is not partitioned.")
+
+        interval = settings.EXPENSES_PARTITION_INTERVAL
+        start = timezone.localdate()
+        end = start
+        for _ in range(options["ahead"] + 1):
+            end = ExpensesPartitionService.get_interval_bounds(end, interval)[1]
+        for name in ExpensesPartitionService.ensure_partitions(start, end, interval):
+            self.stdout.write(f"Created {name}")
+
+        if options["detach_before"]:
+            for name in ExpensesPartitionService.detach_partitions(
+                options["detach_before"], drop=options["drop"]
+            ):
+                self.stdout.write(
+                    f"{'Dropped' if options['drop'] else 'Detached'} {name}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Expense partitions are up to date."))
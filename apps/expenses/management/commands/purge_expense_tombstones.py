@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from expenses.services.sync import ExpensesSyncService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the tombstones of expenses deleted longer ago than the sync "
+        "token retention. Run daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.EXPENSES_TOMBSTONE_RETENTION_DAYS,
+            help="Keep the tombstones of this many days.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < settings.EXPENSES_TOMBSTONE_RETENTION_DAYS:
+            raise CommandError(
+                "--days must be at least EXPENSES_TOMBSTONE_RETENTION_DAYS, or "
+                "clients holding valid sync tokens would miss deletions."
+            )
+        deleted = ExpensesSyncService.purge_tombstones(
+            timezone.now() - timedelta(days=options["days"])
+        )
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} tombstones."))
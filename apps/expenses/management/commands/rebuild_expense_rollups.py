@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.services.rollups import ExpensesRollupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the monthly expense rollups and running totals from the "
+        "expenses table, or verify that they are in sync with it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report drifted rows; exit with an error if any are found.",
+        )
+        parser.add_argument(
+            "--user-id",
+            help="Restrict the rebuild or verification to a single user.",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+
+        if not options["verify"]:
+            written = ExpensesRollupService.rebuild(user_id)
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {written} monthly rollup rows.")
+            )
+            written = ExpensesRollupService.rebuild_totals(user_id)
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {written} running total rows.")
+            )
+            return
+
+        drift = ExpensesRollupService.verify(user_id)
+        for (user, year, month, category), (stored, expected) in sorted(
+            drift.items(), key=lambda item: tuple(map(str, item[0]))
+        ):
+            self.stdout.write(
+                f"{user} {year}-{month:02d} {category}: "
+                f"stored={stored} expected={expected}"
+            )
+        total_drift = ExpensesRollupService.verify_totals(user_id)
+        for (user, category), (stored, expected) in sorted(
+            total_drift.items(), key=lambda item: tuple(map(str, item[0]))
+        ):
+            self.stdout.write(
+                f"{user} to date {category}: stored={stored} expected={expected}"
+            )
+        if drift:
+            raise CommandError(f"{len(drift)} monthly rollup rows are out of sync.")
+        if total_drift:
+            raise CommandError(
+                f"{len(total_drift)} running total rows are out of sync."
+            )
+        self.stdout.write(self.style.SUCCESS("Monthly rollups are in sync."))
+        self.stdout.write(self.style.SUCCESS("Running totals are in sync."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_alter_expenses_amount'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', 'date'], include=('category', 'amount'), name='expenses_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['date'], name='expenses_date_idx'),
+        ),
+        migrations.AlterField(
+            model_name='expenses',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='users.user'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:18
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_rollups(apps, schema_editor):
+    Expenses = apps.get_model("expenses", "Expenses")
+    ExpensesMonthlyRollup = apps.get_model("expenses", "ExpensesMonthlyRollup")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        Expenses.objects.using(db_alias)
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("user_id", "year", "month", "category")
+        .annotate(total_amount=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    ExpensesMonthlyRollup.objects.using(db_alias).bulk_create(
+        (ExpensesMonthlyRollup(**row) for row in rows.iterator(chunk_size=2000)),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0004_expenses_indexes"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpensesMonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("food", "Food"),
+                            ("travel", "Travel"),
+                            ("utilities", "Utilities"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                ("total_amount", models.BigIntegerField(default=0)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Expenses monthly rollup",
+                "verbose_name_plural": "Expenses monthly rollups",
+                "db_table": "expenses_monthly_rollup",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "year", "month", "category"),
+                        name="expenses_monthly_rollup_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,151 @@
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+# The partitions are created with the SQL of this migration's time, not
+# `ExpensesPartitionService`, which follows the current model.
+
+
+def _get_interval_start(day, interval):
+    if interval == "year":
+        return date(day.year, 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def _get_next_interval_start(start, interval):
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def _create_partition(cursor, name, start=None, end=None):
+    """
+    Create the `expenses` partition `name` for `[start, end)`, or the default
+    partition when no bounds are given, with its own primary key and indexes.
+    """
+    cursor.execute(
+        f'CREATE TABLE "{name}" '
+        f"(LIKE expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f'ALTER TABLE "{name}" ADD CONSTRAINT "{name}_pkey" PRIMARY KEY (id, date)'
+    )
+    cursor.execute(
+        f'CREATE INDEX "{name}_user_date_idx" ON "{name}" '
+        f"(user_id, date) INCLUDE (category, amount)"
+    )
+    cursor.execute(f'CREATE INDEX "{name}_date_idx" ON "{name}" (date)')
+    if start is None:
+        cursor.execute(f'ALTER TABLE expenses ATTACH PARTITION "{name}" DEFAULT')
+    else:
+        cursor.execute(
+            f'ALTER TABLE expenses ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+
+
+def _rebuild_table(cursor, old_name, partitioned):
+    """
+    Rename `expenses` (with its primary key and indexes) to `old_name` and
+    create an empty `expenses` with the same columns, constraints and
+    indexes, range-partitioned on `date` if `partitioned`.
+
+    A partitioned table's primary key must include the partition key, so it
+    becomes `(id, date)`.
+    """
+    cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = 'expenses'::regclass AND contype = 'f'"
+    )
+    (fk_name,) = cursor.fetchone()
+    cursor.execute(f"ALTER TABLE expenses RENAME TO {old_name}")
+    cursor.execute(
+        f"ALTER TABLE {old_name} RENAME CONSTRAINT expenses_pkey TO {old_name}_pkey"
+    )
+    cursor.execute(
+        f"ALTER INDEX expenses_user_date_idx RENAME TO {old_name}_user_date_idx"
+    )
+    cursor.execute(f"ALTER INDEX expenses_date_idx RENAME TO {old_name}_date_idx")
+
+    cursor.execute(
+        f"CREATE TABLE expenses "
+        f"(LIKE {old_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        + (" PARTITION BY RANGE (date)" if partitioned else "")
+    )
+    primary_key = "id, date" if partitioned else "id"
+    cursor.execute(
+        f"ALTER TABLE expenses ADD CONSTRAINT expenses_pkey PRIMARY KEY ({primary_key})"
+    )
+    cursor.execute(
+        f'ALTER TABLE expenses ADD CONSTRAINT "{fk_name}" FOREIGN KEY (user_id) '
+        f"REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+    cursor.execute(
+        "CREATE INDEX expenses_user_date_idx ON expenses "
+        "(user_id, date) INCLUDE (category, amount)"
+    )
+    cursor.execute("CREATE INDEX expenses_date_idx ON expenses (date)")
+
+
+def partition_expenses(apps, schema_editor):
+    """
+    Move the expenses into a table range-partitioned on `date`, with one
+    partition per `EXPENSES_PARTITION_INTERVAL` holding data, the next
+    `EXPENSES_PARTITIONS_AHEAD` intervals and a default partition.
+
+    Lookups by `id` alone can not be pruned and probe every partition, so
+    the interval should keep the partition count low (see the README).
+
+    The rows are copied within the migration's transaction, which holds an
+    exclusive lock on the table until it commits.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    interval = settings.EXPENSES_PARTITION_INTERVAL
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild_table(cursor, "expenses_unpartitioned", partitioned=True)
+        cursor.execute(
+            "SELECT DISTINCT date_trunc(%s, date)::date FROM expenses_unpartitioned",
+            [interval],
+        )
+        starts = {start for (start,) in cursor.fetchall()}
+        start = _get_interval_start(timezone.localdate(), interval)
+        for _ in range(settings.EXPENSES_PARTITIONS_AHEAD + 1):
+            starts.add(start)
+            start = _get_next_interval_start(start, interval)
+
+        for start in sorted(starts):
+            if interval == "year":
+                name = f"expenses_y{start.year}"
+            else:
+                name = f"expenses_y{start.year}m{start.month:02d}"
+            _create_partition(
+                cursor, name, start, _get_next_interval_start(start, interval)
+            )
+        _create_partition(cursor, "expenses_default")
+
+        cursor.execute("INSERT INTO expenses SELECT * FROM expenses_unpartitioned")
+        cursor.execute("DROP TABLE expenses_unpartitioned")
+
+
+def unpartition_expenses(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rebuild_table(cursor, "expenses_partitioned", partitioned=False)
+        cursor.execute("INSERT INTO expenses SELECT * FROM expenses_partitioned")
+        cursor.execute("DROP TABLE expenses_partitioned")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0005_expenses_monthly_rollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_expenses, unpartition_expenses),
+    ]
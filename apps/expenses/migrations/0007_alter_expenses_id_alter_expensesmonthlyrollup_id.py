@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:56
+
+import base.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0006_partition_expenses"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="expenses",
+            name="id",
+            field=models.UUIDField(
+                default=base.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="expensesmonthlyrollup",
+            name="id",
+            field=models.UUIDField(
+                default=base.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:18
+
+import base.ids
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_totals(apps, schema_editor):
+    ExpensesMonthlyRollup = apps.get_model("expenses", "ExpensesMonthlyRollup")
+    ExpensesTotal = apps.get_model("expenses", "ExpensesTotal")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        ExpensesMonthlyRollup.objects.using(db_alias)
+        .values("user_id", "category")
+        .annotate(total_amount=Sum("total_amount"), count=Sum("count"))
+        .order_by()
+    )
+    ExpensesTotal.objects.using(db_alias).bulk_create(
+        (ExpensesTotal(**row) for row in rows.iterator(chunk_size=2000)),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0007_alter_expenses_id_alter_expensesmonthlyrollup_id"),
+        ("users", "0002_alter_user_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpensesTotal",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=base.ids.generate_id,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("food", "Food"),
+                            ("travel", "Travel"),
+                            ("utilities", "Utilities"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                ("total_amount", models.BigIntegerField(default=0)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Expenses total",
+                "verbose_name_plural": "Expenses totals",
+                "db_table": "expenses_total",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "category"), name="expenses_total_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+    ]
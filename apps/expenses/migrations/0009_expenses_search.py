@@ -0,0 +1,51 @@
+from django.db import migrations
+
+SEARCH_CONFIG = "english"
+
+
+def add_search_columns(apps, schema_editor):
+    """
+    Add the full-text `search_vector` column, generated from `title` and
+    stored, with a GIN index, and a trigram GIN index on `title` when the
+    `pg_trgm` extension is available.
+
+    Adding a stored generated column rewrites every partition, under an
+    exclusive lock on the table until the migration commits.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "ALTER TABLE expenses ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', title)) STORED"
+        )
+        cursor.execute(
+            "CREATE INDEX expenses_search_vector_idx ON expenses "
+            "USING gin (search_vector)"
+        )
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "CREATE INDEX expenses_title_trgm_idx ON expenses "
+                "USING gin (title gin_trgm_ops)"
+            )
+
+
+def remove_search_columns(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS expenses_title_trgm_idx")
+        cursor.execute("ALTER TABLE expenses DROP COLUMN search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0008_expenses_total"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_columns, remove_search_columns),
+    ]
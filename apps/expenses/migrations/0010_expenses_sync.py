@@ -0,0 +1,59 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:36
+
+import base.ids
+import django.db.models.functions.datetime
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0009_expenses_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpensesTombstone",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=base.ids.generate_id,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("expense_id", models.UUIDField()),
+                ("user_id", models.UUIDField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name": "Expenses tombstone",
+                "verbose_name_plural": "Expenses tombstones",
+                "db_table": "expenses_tombstone",
+            },
+        ),
+        migrations.AddField(
+            model_name="expenses",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_default=django.db.models.functions.datetime.Now()
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="expenses",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="expenses_user_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="expensestombstone",
+            index=models.Index(
+                fields=["user_id", "deleted_at", "id"],
+                name="expenses_tombstone_user_idx",
+            ),
+        ),
+    ]
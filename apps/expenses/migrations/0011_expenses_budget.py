@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:42
+
+import base.ids
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0010_expenses_sync"),
+        ("users", "0003_user_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpensesBudget",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=base.ids.generate_id,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("food", "Food"),
+                            ("travel", "Travel"),
+                            ("utilities", "Utilities"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                ("amount", models.PositiveIntegerField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Expenses budget",
+                "verbose_name_plural": "Expenses budgets",
+                "db_table": "expenses_budget",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "category"), name="expenses_budget_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:43
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0011_expenses_budget"),
+        ("users", "0003_user_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="expenses",
+            name="expenses_user_updated_idx",
+        ),
+        migrations.AddIndex(
+            model_name="expenses",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "updated_at__gt",
+                        datetime.datetime(
+                            2000, 1, 1, 0, 0, tzinfo=datetime.timezone.utc
+                        ),
+                    )
+                ),
+                fields=["user", "updated_at", "id"],
+                name="expenses_user_updated_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,177 @@
-from django.db import models
+from contextvars import ContextVar
+from datetime import UTC, datetime
+
+from django.db import models, router, transaction
+from django.db.models.functions import Now
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from base.models import BaseModel
 
+# Earlier than every `updated_at`. The sync index only covers rows written
+# after it, so that queries have to bound `updated_at` to use it.
+SYNC_EPOCH = datetime(2000, 1, 1, tzinfo=UTC)
+
+# Set while `bulk_update` runs, whose own `update()` calls are already
+# accounted for in the deltas it applies.
+_rollups_synced: ContextVar[bool] = ContextVar("expenses_rollups_synced", default=False)
+
+
+class ExpensesQuerySet(models.QuerySet):
+    """
+    Keeps the monthly rollups in sync for the bulk operations that do not
+    send `post_save`/`post_delete` for every row, and `updated_at` current
+    for those that do not call `save()`.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .services.rollups import ExpensesRollupService
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            ExpensesRollupService.apply_deltas(
+                ExpensesRollupService.get_deltas(obj.get_rollup_state() for obj in objs)
+            )
+        for obj in objs:
+            obj._saved_state = obj.get_rollup_state()
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .services.rollups import ExpensesRollupService
+        from .services.sync import ExpensesSyncService
+
+        objs = list(objs)
+        if "updated_at" not in fields:
+            fields = [*fields, "updated_at"]
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        attnames = {self.model._meta.get_field(field).attname for field in fields}
+        with transaction.atomic(using=self.db):
+            unknown = [obj.pk for obj in objs if not obj.get_saved_rollup_state()]
+            if unknown:
+                stored = self.filter(pk__in=unknown).values(
+                    "pk", *self.model.ROLLUP_FIELDS
+                )
+                stored = {row.pop("pk"): row for row in stored}
+                for obj in objs:
+                    obj._saved_state = obj.get_saved_rollup_state() or stored.get(
+                        obj.pk
+                    )
+
+            previous = [obj.get_saved_rollup_state() for obj in objs]
+            current = [
+                state
+                and {
+                    field: obj.__dict__[field] if field in attnames else value
+                    for field, value in state.items()
+                }
+                for obj, state in zip(objs, previous)
+            ]
+            token = _rollups_synced.set(True)
+            try:
+                rows = super().bulk_update(objs, fields, *args, **kwargs)
+            finally:
+                _rollups_synced.reset(token)
+            ExpensesRollupService.apply_deltas(
+                ExpensesRollupService.merge_deltas(
+                    ExpensesRollupService.get_deltas(previous, sign=-1),
+                    ExpensesRollupService.get_deltas(current),
+                )
+            )
+            with ExpensesSyncService.batch():
+                for obj, before, after in zip(objs, previous, current):
+                    if before and before["user_id"] != after["user_id"]:
+                        ExpensesSyncService.record_move(
+                            obj.pk, before["user_id"], obj.updated_at
+                        )
+        for obj, state in zip(objs, current):
+            obj._saved_state = state
+        return rows
+
+    def update(self, **kwargs):
+        """
+        Update the rows and their `updated_at` in a single `UPDATE` and move
+        their contribution between rollups, computed with one `GROUP BY`
+        query before the update. Rollup fields can only be set to constant
+        values; expressions such as `F("amount") + 1` would need every row's
+        new value. Setting `user` also records a tombstone for each row moved
+        away from another user.
+        """
+        from .services.rollups import ExpensesRollupService
+        from .services.sync import ExpensesSyncService
+
+        kwargs.setdefault("updated_at", timezone.now())
+        if _rollups_synced.get():
+            return super().update(**kwargs)
+        values = {}
+        for name, value in kwargs.items():
+            field = self.model._meta.get_field(name)
+            if field.attname not in self.model.ROLLUP_FIELDS:
+                continue
+            if hasattr(value, "resolve_expression"):
+                raise ValueError(
+                    f"update() can not keep the rollups in sync for an expression "
+                    f"on {name!r}; use bulk_update() instead."
+                )
+            values[field.attname] = field.to_python(getattr(value, "pk", value))
+
+        # Without rollup fields the deltas cancel out and write nothing, but
+        # applying them still invalidates the cached responses of the users.
+        with transaction.atomic(using=self.db):
+            previous = ExpensesRollupService.get_queryset_deltas(self)
+            if "user_id" in values:
+                # Tombstones are written before the rows they describe change
+                # user, while the previous users can still be read.
+                moved = self.exclude(user_id=values["user_id"]).values_list(
+                    "pk", "user_id"
+                )
+                with ExpensesSyncService.batch():
+                    for expense_id, user_id in moved:
+                        ExpensesSyncService.record_move(
+                            expense_id, user_id, kwargs["updated_at"]
+                        )
+            rows = super().update(**kwargs)
+            current = {}
+            for (user_id, year, month, category), (amount, count) in previous.items():
+                if "date" in values:
+                    year, month = values["date"].year, values["date"].month
+                if "amount" in values:
+                    amount = values["amount"] * count
+                key = (
+                    values.get("user_id", user_id),
+                    year,
+                    month,
+                    values.get("category", category),
+                )
+                current[key] = [amount, count]
+            ExpensesRollupService.apply_deltas(
+                ExpensesRollupService.merge_deltas(
+                    {
+                        key: [-amount, -count]
+                        for key, (amount, count) in previous.items()
+                    },
+                    current,
+                )
+            )
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        from .services.rollups import ExpensesRollupService
+        from .services.sync import ExpensesSyncService
+
+        # Deleting still sends `post_delete` per row; batch their deltas into
+        # one write per rollup row, and their tombstones into one insert.
+        with (
+            transaction.atomic(using=self.db),
+            ExpensesRollupService.batch(),
+            ExpensesSyncService.batch(),
+        ):
+            return super().delete()
+
 
 class Expenses(BaseModel):
     CATEGORY_CHOICES = [
@@ -11,16 +179,216 @@ class Expenses(BaseModel):
         ("travel", _("Travel")),
         ("utilities", _("Utilities")),
     ]
-    user = models.ForeignKey("users.User", on_delete=models.CASCADE)
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=100)
     amount = models.PositiveIntegerField(default=0)
     date = models.DateField()
     category = models.CharField(max_length=100, choices=CATEGORY_CHOICES)
+    # Set on every write, including the bulk paths and `COPY` imports (through
+    # the database default), so clients can fetch what changed since their
+    # last sync; see `ExpensesSelector.get_changes`.
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    objects = ExpensesQuerySet.as_manager()
+
+    # Fields that determine which monthly rollup row an expense counts towards.
+    ROLLUP_FIELDS = ("user_id", "date", "category", "amount")
 
     class Meta:
         db_table = "expenses"
         verbose_name = _("Expense")
         verbose_name_plural = _("Expenses")
+        indexes = [
+            # Serves every per-user selector: the leading ``user_id`` replaces
+            # the implicit FK index, ``date`` turns date ranges into index
+            # range scans and the included columns let category summaries
+            # run as index-only scans.
+            models.Index(
+                fields=["user", "date"],
+                include=["category", "amount"],
+                name="expenses_user_date_idx",
+            ),
+            models.Index(fields=["date"], name="expenses_date_idx"),
+            # Serves `get_changes`. Partial, so that only queries bounding
+            # `updated_at` can use it: for lookups by user and whole-partition
+            # date ranges it costs the same as `expenses_user_date_idx`, and
+            # the planner would pick either.
+            models.Index(
+                fields=["user", "updated_at", "id"],
+                condition=models.Q(updated_at__gt=SYNC_EPOCH),
+                name="expenses_user_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.amount} ({self.category})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_state = instance.get_rollup_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        # The reloaded fields hold their stored values again, which may have
+        # been changed by an `update()` since the instance was loaded.
+        if fields is not None:
+            fields = {self._meta.get_field(field).attname for field in fields}
+        state = dict(self.get_saved_rollup_state() or {})
+        state.update(
+            (field, self.__dict__[field])
+            for field in self.ROLLUP_FIELDS
+            if field in self.__dict__ and (fields is None or field in fields)
+        )
+        self._saved_state = state if len(state) == len(self.ROLLUP_FIELDS) else None
+
+    def get_rollup_state(self, base=None):
+        """
+        Return the rollup fields as they currently are on the instance, or
+        `None` when some of them were deferred and are not loaded.
+
+        :param base: Stored state to take deferred fields from; a save does
+            not write deferred fields, so their stored values still apply.
+        """
+        state = dict(base or {})
+        state.update(
+            (field, self.__dict__[field])
+            for field in self.ROLLUP_FIELDS
+            if field in self.__dict__
+        )
+        return state if len(state) == len(self.ROLLUP_FIELDS) else None
+
+    def get_saved_rollup_state(self):
+        """
+        Return the rollup fields as last loaded from or written to the
+        database, or `None` if they are not known.
+        """
+        return getattr(self, "_saved_state", None)
+
+    def save(self, *args, **kwargs):
+        # The rollup receivers run inside `save_base`, so wrapping the save
+        # keeps the expense row and its rollups in one transaction.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        if kwargs.get("update_fields"):
+            kwargs["update_fields"] = {*kwargs["update_fields"], "updated_at"}
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        self._saved_state = self.get_rollup_state(self.get_saved_rollup_state())
+
+
+class ExpensesMonthlyRollup(BaseModel):
+    """
+    Per-user total and number of expenses for a category in a calendar month.
+
+    Maintained incrementally on every expense write; see
+    `ExpensesRollupService`.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, db_index=False)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.CharField(max_length=100, choices=Expenses.CATEGORY_CHOICES)
+    total_amount = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "expenses_monthly_rollup"
+        verbose_name = _("Expenses monthly rollup")
+        verbose_name_plural = _("Expenses monthly rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "year", "month", "category"],
+                name="expenses_monthly_rollup_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.year}-{self.month:02d} {self.category}: {self.total_amount}"
+
+
+class ExpensesTotal(BaseModel):
+    """
+    Per-user running total and number of expenses for a category, across all
+    dates, so "spent to date" reads a row per category however long the
+    user's history is.
+
+    Maintained together with the monthly rollups; see
+    `ExpensesRollupService`.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, db_index=False)
+    category = models.CharField(max_length=100, choices=Expenses.CATEGORY_CHOICES)
+    total_amount = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "expenses_total"
+        verbose_name = _("Expenses total")
+        verbose_name_plural = _("Expenses totals")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category"], name="expenses_total_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.category}: {self.total_amount}"
+
+
+class ExpensesTombstone(BaseModel):
+    """
+    Record of a deleted expense, or of one moved to another user, so that
+    clients syncing incrementally learn about the deletion; see
+    `ExpensesSelector.get_changes`.
+
+    `user_id` is not a foreign key: tombstones are written while a user's
+    expenses are deleted along with the user. They are purged after
+    `EXPENSES_TOMBSTONE_RETENTION_DAYS`.
+    """
+
+    expense_id = models.UUIDField()
+    user_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "expenses_tombstone"
+        verbose_name = _("Expenses tombstone")
+        verbose_name_plural = _("Expenses tombstones")
+        indexes = [
+            models.Index(
+                fields=["user_id", "deleted_at", "id"],
+                name="expenses_tombstone_user_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.expense_id} deleted at {self.deleted_at}"
+
+
+class ExpensesBudget(BaseModel):
+    """
+    Monthly spending limit of a user for a category, applying to every
+    calendar month.
+
+    Checked on every expense write against the month's maintained rollup, so
+    the check reads two rows however many expenses the month has; see
+    `ExpensesSelector.get_budget_status`.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, db_index=False)
+    category = models.CharField(max_length=100, choices=Expenses.CATEGORY_CHOICES)
+    amount = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "expenses_budget"
+        verbose_name = _("Expenses budget")
+        verbose_name_plural = _("Expenses budgets")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category"], name="expenses_budget_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.category}: {self.amount}"
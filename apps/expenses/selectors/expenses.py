@@ -1,8 +1,87 @@
 import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple
 
-from django.db.models import QuerySet, Sum
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.lookups import SearchLookup, TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import (
+    Avg,
+    BigIntegerField,
+    Count,
+    DateField,
+    Expression,
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce, Trunc
 
-from ..models import Expenses
+from base.routers import get_read_database
+
+from ..models import (
+    SYNC_EPOCH,
+    Expenses,
+    ExpensesBudget,
+    ExpensesMonthlyRollup,
+    ExpensesTombstone,
+    ExpensesTotal,
+)
+
+# Dimensions `ExpensesSelector.get_aggregates` can group by: the periods
+# truncate `date`, the others are columns.
+AGGREGATE_PERIODS = ("day", "week", "month", "year")
+AGGREGATE_DIMENSIONS = AGGREGATE_PERIODS + ("category", "user")
+AGGREGATE_METRICS = ("sum", "count", "avg")
+
+# Text search configuration of the generated `search_vector` column; see
+# migration 0009.
+SEARCH_CONFIG = "english"
+
+# Database alias -> whether `pg_trgm` is installed there.
+_trigram_databases: dict[str, bool] = {}
+
+
+class SearchVectorColumn(Expression):
+    """
+    The `search_vector` column of `expenses`, generated from `title` on
+    PostgreSQL only. It is not a model field, so it is never selected (or
+    written) by the ORM.
+    """
+
+    output_field = SearchVectorField()
+
+    def resolve_expression(self, query=None, *args, **kwargs):
+        resolved = super().resolve_expression(query, *args, **kwargs)
+        resolved.alias = query.get_initial_alias()
+        return resolved
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.quote_name_unless_alias(self.alias)
+        return f"{alias}.{connection.ops.quote_name('search_vector')}", []
+
+
+class ExpensesChange(NamedTuple):
+    """
+    A change reported by `ExpensesSelector.get_changes`: an expense as it is
+    now (`row`), or a deleted one (`row` is `None`). `timestamp` and `key`
+    (the primary key of the expense or tombstone) order the changes.
+    """
+
+    timestamp: datetime
+    key: uuid.UUID
+    expense_id: uuid.UUID
+    row: dict | None
 
 
 class ExpensesSelector:
@@ -15,8 +94,10 @@ class ExpensesSelector:
         :param filters: Additional filters to apply (e.g., date range, category).
         :return: Filtered QuerySet of expenses.
         """
-        return Expenses.objects.filter(user_id=user_id, **filters).select_related(
-            "user"
+        return (
+            Expenses.objects.using(get_read_database(user_id))
+            .filter(user_id=user_id, **filters)
+            .select_related("user")
         )
 
     @staticmethod
@@ -38,16 +119,469 @@ class ExpensesSelector:
         )
 
     @staticmethod
-    def get_category_summary(user_id: uuid.UUID, month: int) -> QuerySet:
+    async def alist_expenses_by_user(user_id: uuid.UUID) -> list[Expenses]:
         """
-        Calculate the total expenses per category for a user in a given month.
+        Async variant of `list_expenses_by_user`, evaluated with the async ORM.
+        """
+        return [
+            expense
+            async for expense in ExpensesSelector.list_expenses_by_user(
+                user_id
+            ).aiterator()
+        ]
+
+    @staticmethod
+    async def alist_expenses_by_date_range(
+        user_id: uuid.UUID, start_date: str, end_date: str
+    ) -> list[Expenses]:
+        """
+        Async variant of `list_expenses_by_date_range`, evaluated with the async
+        ORM.
+        """
+        return [
+            expense
+            async for expense in ExpensesSelector.list_expenses_by_date_range(
+                user_id, start_date, end_date
+            ).aiterator()
+        ]
+
+    @staticmethod
+    def search(queryset: QuerySet, text: str) -> QuerySet:
+        """
+        Filter expenses whose title matches `text`, best matches first.
+
+        On PostgreSQL, `text` is a web-search style query (`"lunch -office"`)
+        matched against the indexed `search_vector` column; when `pg_trgm`
+        is installed, titles containing a word similar to `text` match too,
+        so typos still find results. Other backends fall back to an unranked
+        case-insensitive substring match.
+
+        :param queryset: Expenses to search, e.g. already filtered by user.
+        :param text: Search text.
+        :return: Filtered and ordered QuerySet.
+        """
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset.filter(title__icontains=text)
+
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        matches = Q(SearchLookup(SearchVectorColumn(), query))
+        rank = SearchRank(SearchVectorColumn(), query)
+        if ExpensesSelector.has_trigram_search(queryset.db):
+            matches |= Q(TrigramWordSimilar(F("title"), text))
+            rank += TrigramWordSimilarity(text, "title")
+        return queryset.filter(matches).order_by(rank.desc(), "-date", "id")
+
+    @staticmethod
+    def has_trigram_search(database: str) -> bool:
+        """
+        Return whether the `pg_trgm` extension is installed on `database`,
+        checking once per process.
+        """
+        if connections[database].vendor != "postgresql":
+            return False
+        if database not in _trigram_databases:
+            with connections[database].cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _trigram_databases[database] = cursor.fetchone() is not None
+        return _trigram_databases[database]
+
+    @staticmethod
+    async def ahas_trigram_search(database: str) -> bool:
+        """
+        Async variant of `has_trigram_search`. Awaiting it before `search` is
+        called from async code saves `search` its synchronous query.
+        """
+        if database in _trigram_databases:
+            return _trigram_databases[database]
+        return await sync_to_async(ExpensesSelector.has_trigram_search)(database)
+
+    @staticmethod
+    def get_month_range(year: int, month: int) -> tuple[date, date]:
+        """
+        Return the bounds of a calendar month as a half-open range.
+
+        :param year: Year of the month.
+        :param month: Month number (1-12).
+        :return: Tuple of the first day of the month and the first day of the
+            following month.
+        """
+        start_date = date(year, month, 1)
+        end_date = date(year + month // 12, month % 12 + 1, 1)
+        return start_date, end_date
+
+    @staticmethod
+    def get_category_summary(
+        user_id: uuid.UUID, start_date: date, end_date: date
+    ) -> QuerySet:
+        """
+        Calculate the total expenses per category for a user in a period.
+
+        Periods made of whole calendar months are read from the maintained
+        `ExpensesMonthlyRollup` rows, so the cost depends on the number of
+        categories rather than expenses. Other periods are aggregated from
+        the expenses table. The period is half-open
+        (`start_date <= date < end_date`) so that it compiles to a plain range
+        predicate the `(user_id, date)` index can serve.
 
         :param user_id: ID of the user.
-        :param month: Month to filter expenses.
+        :param start_date: First day of the period (inclusive).
+        :param end_date: Day after the last day of the period (exclusive).
         :return: QuerySet with category and total amount.
         """
+        return ExpensesSelector._summarize(
+            start_date,
+            end_date,
+            ["category"],
+            get_read_database(user_id),
+            user_id=user_id,
+        )
+
+    @staticmethod
+    def get_category_summaries(
+        user_ids: list[uuid.UUID], start_date: date, end_date: date
+    ) -> dict[uuid.UUID, list[dict]]:
+        """
+        `get_category_summary` for several users at once, in a single query
+        grouped by user and category.
+
+        :param user_ids: IDs of the users.
+        :param start_date: First day of the period (inclusive).
+        :param end_date: Day after the last day of the period (exclusive).
+        :return: Dictionary of each user ID to its category and total amount
+            rows (empty for users without expenses in the period).
+        """
+        summaries = {user_id: [] for user_id in user_ids}
+        for row in ExpensesSelector._summarize(
+            start_date,
+            end_date,
+            ["user_id", "category"],
+            get_read_database(*user_ids),
+            user_id__in=user_ids,
+        ):
+            summaries[row.pop("user_id")].append(row)
+        return summaries
+
+    @staticmethod
+    def get_running_totals(user_id: uuid.UUID, today: date) -> dict[str, list]:
+        """
+        Return how much a user has spent to date and in the month of `today`,
+        per category.
+
+        Both are read from maintained rows (`ExpensesTotal` and the monthly
+        rollups), at most one per category, so the cost does not depend on
+        the length of the user's history.
+
+        :param user_id: ID of the user.
+        :param today: Day whose calendar month `this_month` covers, including
+            expenses dated later in that month.
+        :return: Dictionary with `to_date` and `this_month` lists of category,
+            total amount and count rows.
+        """
+        database = get_read_database(user_id)
+        start_date, end_date = ExpensesSelector.get_month_range(today.year, today.month)
+        columns = ("category", "total_amount", "count")
+        return {
+            "to_date": list(
+                ExpensesTotal.objects.using(database)
+                .filter(user_id=user_id, count__gt=0)
+                .values(*columns)
+                .order_by("category")
+            ),
+            "this_month": list(
+                ExpensesSelector._filter_rollups(start_date, end_date, user_id=user_id)
+                .using(database)
+                .values(*columns)
+                .order_by("category")
+            ),
+        }
+
+    @staticmethod
+    def get_budgets(year: int, month: int, **filters) -> QuerySet:
+        """
+        Return the budgets matching `filters`, annotated with what their user
+        has spent in their category in a calendar month (`spent`).
+
+        The spend is read from the month's maintained `ExpensesMonthlyRollup`
+        row, one per budget, so checking a budget costs the same however many
+        expenses the month has.
+
+        :param year: Year of the month.
+        :param month: Month number (1-12).
+        :param filters: Lookups on `ExpensesBudget`, e.g. `user_id` and
+            `category`.
+        :return: Queryset of `ExpensesBudget` with a `spent` annotation.
+        """
+        spent = ExpensesMonthlyRollup.objects.filter(
+            user_id=OuterRef("user_id"),
+            category=OuterRef("category"),
+            year=year,
+            month=month,
+        ).values("total_amount")
+        return ExpensesBudget.objects.filter(**filters).annotate(
+            spent=Coalesce(Subquery(spent), 0, output_field=BigIntegerField())
+        )
+
+    @staticmethod
+    def get_changes(
+        user_id: uuid.UUID,
+        position: tuple[datetime, uuid.UUID | None] | None,
+        deleted_after: datetime | None,
+        limit: int,
+    ) -> list[ExpensesChange]:
+        """
+        Return the expenses of a user written, and those deleted, after
+        `position`, oldest first.
+
+        Each side is a range scan of a `(user_id, timestamp, id)` index, so
+        the cost depends on the number of changes rather than on the length
+        of the user's history. Reads go to the primary: a lagging replica
+        could hide a change from a client whose position already moved past
+        it.
+
+        :param user_id: ID of the user.
+        :param position: `(timestamp, key)` of the last change the client has,
+            or `(timestamp, None)` to start right after `timestamp`; `None` for
+            a full sync.
+        :param deleted_after: Skip deletions made before this time, e.g. those
+            of expenses a full sync that started then never returned.
+            Without a `position` or `deleted_after`, no deletions are returned.
+        :param limit: Most changes to return. One more is returned when there
+            are more.
+        """
+
+        def after(queryset, field):
+            if position is None:
+                return queryset
+            timestamp, key = position
+            if key is None:
+                return queryset.filter(**{f"{field}__gt": timestamp})
+            return queryset.filter(
+                Q(**{f"{field}__gt": timestamp}) | Q(id__gt=key),
+                **{f"{field}__gte": timestamp},
+            )
+
+        # Bounding `updated_at` lets a full sync use the partial sync index.
+        expenses = after(
+            Expenses.objects.filter(user_id=user_id, updated_at__gt=SYNC_EPOCH),
+            "updated_at",
+        )
+        changes = [
+            ExpensesChange(row["updated_at"], row["id"], row["id"], row)
+            for row in expenses.order_by("updated_at", "id").values(
+                "id", "user_id", "title", "amount", "date", "category", "updated_at"
+            )[: limit + 1]
+        ]
+        if position is not None or deleted_after is not None:
+            tombstones = after(
+                ExpensesTombstone.objects.filter(user_id=user_id), "deleted_at"
+            )
+            if deleted_after is not None:
+                tombstones = tombstones.filter(deleted_at__gt=deleted_after)
+            changes += [
+                ExpensesChange(deleted_at, key, expense_id, None)
+                for deleted_at, key, expense_id in tombstones.order_by(
+                    "deleted_at", "id"
+                ).values_list("deleted_at", "id", "expense_id")[: limit + 1]
+            ]
+        changes.sort(key=lambda change: (change.timestamp, change.key))
+        return changes[: limit + 1]
+
+    @staticmethod
+    def _summarize(
+        start_date: date,
+        end_date: date,
+        columns: list[str],
+        database: str,
+        **filters,
+    ) -> QuerySet:
+        """
+        Total the expenses in `[start_date, end_date)` grouped by `columns`,
+        from the monthly rollups when the period is made of whole months.
+        """
+        if start_date.day == 1 and end_date.day == 1:
+            queryset = ExpensesSelector._filter_rollups(start_date, end_date, **filters)
+            total_amount = Sum("total_amount")
+        else:
+            queryset = Expenses.objects.filter(
+                date__gte=start_date, date__lt=end_date, **filters
+            )
+            total_amount = Sum("amount")
         return (
-            ExpensesSelector._filter_expenses(user_id, date__month=month)
-            .values("category")
-            .annotate(total_amount=Sum("amount"))
+            queryset.using(database)
+            .values(*columns)
+            .annotate(total_amount=total_amount)
+            .order_by(*columns)
+        )
+
+    @staticmethod
+    def _filter_rollups(start_date: date, end_date: date, **filters) -> QuerySet:
+        """
+        Return the non-empty monthly rollups of the months in
+        `[start_date, end_date)`. Both bounds must be first days of a month.
+        """
+        if (start_date.year, start_date.month) == (end_date.year, end_date.month - 1):
+            months = Q(year=start_date.year, month=start_date.month)
+        else:
+            months = (
+                Q(year__gt=start_date.year)
+                | Q(year=start_date.year, month__gte=start_date.month)
+            ) & (
+                Q(year__lt=end_date.year)
+                | Q(year=end_date.year, month__lt=end_date.month)
+            )
+        return ExpensesMonthlyRollup.objects.filter(months, count__gt=0, **filters)
+
+    @staticmethod
+    def get_aggregates(
+        start_date: date,
+        end_date: date,
+        group_by: list[str],
+        metrics: list[str],
+        limit: int | None = None,
+        **filters,
+    ) -> list[dict]:
+        """
+        Aggregate the expenses of a period in a single query, grouped by any
+        combination of `AGGREGATE_DIMENSIONS` (at most one period).
+
+        Periods made of whole calendar months grouped by month or year (or not
+        by period at all) are read from the monthly rollups; others are
+        aggregated from the expenses table with `date_trunc`.
+
+        :param start_date: First day of the period (inclusive).
+        :param end_date: Day after the last day of the period (exclusive).
+        :param group_by: Dimensions to group by, in output and sort order.
+        :param metrics: Any of `AGGREGATE_METRICS`.
+        :param limit: Most groups to return.
+        :param filters: Filters on `user_id` and `category`.
+        :return: Rows with a key per dimension (`user_id` for `user`, the
+            first day of the period for periods) and per metric.
+        """
+        database = get_read_database(filters.get("user_id"))
+        if (
+            start_date.day == 1
+            and end_date.day == 1
+            and not {"day", "week"}.intersection(group_by)
+        ):
+            rows = ExpensesSelector._get_rollup_aggregates(
+                start_date, end_date, group_by, metrics, filters
+            ).using(database)
+            rows = list(rows[:limit] if limit is not None else rows)
+            for row in rows:
+                values = {
+                    "sum": row.pop("rollup_sum", None),
+                    "count": row.pop("rollup_count", None),
+                }
+                if "avg" in metrics:
+                    values["avg"] = Decimal(values["sum"]) / values["count"]
+                for metric in metrics:
+                    row[metric] = values[metric]
+                if "month" in group_by:
+                    row["month"] = date(row.pop("year"), row["month"], 1)
+                elif "year" in group_by:
+                    row["year"] = date(row["year"], 1, 1)
+            return rows
+
+        periods = {
+            period: Trunc("date", period, output_field=DateField())
+            for period in AGGREGATE_PERIODS
+            if period in group_by
+        }
+        columns = [
+            "user_id" if dimension == "user" else dimension for dimension in group_by
+        ]
+        aggregates = {
+            "sum": Sum("amount"),
+            "count": Count("id"),
+            "avg": Avg("amount"),
+        }
+        rows = (
+            Expenses.objects.using(database)
+            .filter(date__gte=start_date, date__lt=end_date, **filters)
+            .annotate(**periods)
+            .values(*columns)
+            .annotate(**{metric: aggregates[metric] for metric in metrics})
+            .order_by(*columns)
+        )
+        return list(rows[:limit] if limit is not None else rows)
+
+    @staticmethod
+    def _get_rollup_aggregates(
+        start_date: date,
+        end_date: date,
+        group_by: list[str],
+        metrics: list[str],
+        filters: dict,
+    ) -> QuerySet:
+        """
+        `get_aggregates` computed from the monthly rollups of the months in
+        `[start_date, end_date)`. Periods are returned as `year`/`month`
+        columns and metrics as `rollup_<metric>`, since `count` is a rollup
+        column. `avg` is left to the caller as `rollup_sum / rollup_count`,
+        as SQLite would divide the integers.
+        """
+        columns = []
+        for dimension in group_by:
+            if dimension == "month":
+                columns += ["year", "month"]
+            elif dimension == "user":
+                columns.append("user_id")
+            else:
+                columns.append(dimension)
+        aggregates = {}
+        if "sum" in metrics or "avg" in metrics:
+            aggregates["rollup_sum"] = Sum("total_amount")
+        if "count" in metrics or "avg" in metrics:
+            aggregates["rollup_count"] = Sum("count")
+        return (
+            ExpensesSelector._filter_rollups(start_date, end_date, **filters)
+            .values(*columns)
+            .annotate(**aggregates)
+            .order_by(*columns)
+        )
+
+    @staticmethod
+    def get_monthly_category_summary(
+        user_id: uuid.UUID, year: int, month: int
+    ) -> QuerySet:
+        """
+        Calculate the total expenses per category for a user in a given month.
+
+        :param user_id: ID of the user.
+        :param year: Year of the month.
+        :param month: Month to summarize.
+        :return: QuerySet with category and total amount.
+        """
+        start_date, end_date = ExpensesSelector.get_month_range(year, month)
+        return ExpensesSelector.get_category_summary(user_id, start_date, end_date)
+
+    @staticmethod
+    async def aget_category_summary(
+        user_id: uuid.UUID, start_date: date, end_date: date
+    ) -> list[dict]:
+        """
+        Async variant of `get_category_summary`, evaluated with the async ORM.
+
+        :return: List of category and total amount rows.
+        """
+        return [
+            row
+            async for row in ExpensesSelector.get_category_summary(
+                user_id, start_date, end_date
+            )
+        ]
+
+    @staticmethod
+    async def aget_monthly_category_summary(
+        user_id: uuid.UUID, year: int, month: int
+    ) -> list[dict]:
+        """
+        Async variant of `get_monthly_category_summary`, evaluated with the
+        async ORM.
+
+        :return: List of category and total amount rows.
+        """
+        start_date, end_date = ExpensesSelector.get_month_range(year, month)
+        return await ExpensesSelector.aget_category_summary(
+            user_id, start_date, end_date
         )
@@ -0,0 +1,89 @@
+import hashlib
+import time
+import uuid
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ExpensesCacheService:
+    """
+    Per-user versioned caching of expense read responses.
+
+    Every write to a user's expenses bumps the user's version, and cached
+    responses are keyed by that version, so a write makes all of the user's
+    cached responses unreachable without having to find and delete them.
+    """
+
+    @staticmethod
+    def get_cache():
+        return caches[settings.EXPENSES_CACHE_ALIAS]
+
+    @staticmethod
+    def get_version_key(user_id: uuid.UUID) -> str:
+        return f"expenses:version:{user_id}"
+
+    @staticmethod
+    def get_version(user_id: uuid.UUID) -> int:
+        """
+        Return the user's current version.
+
+        A version that is not cached (never set, or evicted) starts from the
+        current time in nanoseconds rather than from zero, so it can't come
+        back to a value that was already handed out.
+        """
+        cache = ExpensesCacheService.get_cache()
+        key = ExpensesCacheService.get_version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def bump_versions(user_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Bump the version of every given user, right away and again once the
+        current transaction commits, so a read made before the commit can't
+        leave the old data cached under the new version.
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+
+        def bump():
+            cache = ExpensesCacheService.get_cache()
+            for user_id in user_ids:
+                key = ExpensesCacheService.get_version_key(user_id)
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    cache.add(key, time.time_ns(), timeout=None)
+
+        bump()
+        transaction.on_commit(bump)
+
+    @staticmethod
+    def get_response_key(user_id: uuid.UUID, version: int, request_key: str) -> str:
+        """
+        Build the cache key of a response from the user's version and a key
+        identifying the request (see `ExpensesViewSet.get_cache_request_key`).
+        """
+        digest = hashlib.sha256(request_key.encode()).hexdigest()
+        return f"expenses:response:{user_id}:{version}:{digest}"
+
+    @staticmethod
+    def get_etag(response_key: str) -> str:
+        return '"%s"' % hashlib.sha256(response_key.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def get_response(response_key: str):
+        return ExpensesCacheService.get_cache().get(response_key)
+
+    @staticmethod
+    def set_response(response_key: str, data) -> None:
+        ExpensesCacheService.get_cache().set(
+            response_key, data, settings.EXPENSES_CACHE_TIMEOUT
+        )
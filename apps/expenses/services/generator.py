@@ -0,0 +1,124 @@
+import math
+import random
+import uuid
+from collections.abc import Iterator
+from datetime import date, timedelta
+from itertools import accumulate, islice
+
+from django.db import transaction
+
+from users.models import User
+
+from ..models import Expenses
+
+# category -> (titles, median amount)
+CATEGORY_PROFILES = {
+    "food": (("Groceries", "Lunch", "Dinner", "Coffee", "Bakery"), 20),
+    "travel": (("Taxi", "Train ticket", "Flight", "Hotel", "Fuel"), 120),
+    "utilities": (("Electricity", "Water", "Internet", "Phone", "Gas"), 80),
+}
+
+
+class ExpensesGeneratorService:
+    """
+    Generate synthetic users and expenses for benchmarking.
+
+    Data is skewed the way real spending is: the number of expenses per user
+    follows a Zipf distribution (a few heavy users, a long tail of light
+    ones), categories follow a configurable mix and amounts are log-normal
+    around a per-category median. The same seed gives the same dataset.
+    """
+
+    @staticmethod
+    def parse_category_mix(value: str) -> dict[str, float]:
+        """
+        Parse a category mix such as `food=6,travel=3,utilities=1` into
+        relative weights.
+        """
+        mix = {}
+        for item in value.split(","):
+            category, _, weight = item.partition("=")
+            category = category.strip()
+            if category not in CATEGORY_PROFILES:
+                raise ValueError(f"Unknown category: {category!r}.")
+            mix[category] = float(weight or 1)
+        if not any(mix.values()):
+            raise ValueError("At least one category needs a positive weight.")
+        return mix
+
+    @staticmethod
+    def create_users(count: int, rng: random.Random) -> list[uuid.UUID]:
+        """
+        Bulk-create `count` users and return their IDs.
+        """
+        users = []
+        for _ in range(count):
+            user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            username = f"bench-{user_id.hex[:16]}"
+            users.append(
+                User(id=user_id, username=username, email=f"{username}@example.com")
+            )
+        User.objects.bulk_create(users, batch_size=5000)
+        return [user.id for user in users]
+
+    @staticmethod
+    def iter_expenses(
+        user_ids: list[uuid.UUID],
+        count: int,
+        start_date: date,
+        end_date: date,
+        category_mix: dict[str, float],
+        skew: float,
+        rng: random.Random,
+    ) -> Iterator[Expenses]:
+        """
+        Yield `count` unsaved expenses dated in `[start_date, end_date]`.
+
+        :param skew: Zipf exponent of the expenses per user; `0` spreads them
+            evenly.
+        """
+        user_weights = list(
+            accumulate(1 / rank**skew for rank in range(1, len(user_ids) + 1))
+        )
+        categories = list(category_mix)
+        category_weights = list(accumulate(category_mix.values()))
+        days = (end_date - start_date).days + 1
+
+        for _ in range(count):
+            category = rng.choices(categories, cum_weights=category_weights)[0]
+            titles, median = CATEGORY_PROFILES[category]
+            yield Expenses(
+                user_id=rng.choices(user_ids, cum_weights=user_weights)[0],
+                title=rng.choice(titles),
+                amount=max(1, round(rng.lognormvariate(math.log(median), 0.8))),
+                date=start_date + timedelta(days=rng.randrange(days)),
+                category=category,
+            )
+
+    @staticmethod
+    def create_expenses(
+        user_ids: list[uuid.UUID],
+        count: int,
+        start_date: date,
+        end_date: date,
+        category_mix: dict[str, float],
+        skew: float,
+        rng: random.Random,
+        batch_size: int = 10000,
+    ) -> int:
+        """
+        Bulk-insert generated expenses (see `iter_expenses`), one transaction
+        per batch so memory use does not grow with `count`. The monthly
+        rollups are maintained by `ExpensesQuerySet.bulk_create`.
+
+        :return: Number of expenses created.
+        """
+        expenses = ExpensesGeneratorService.iter_expenses(
+            user_ids, count, start_date, end_date, category_mix, skew, rng
+        )
+        created = 0
+        while batch := list(islice(expenses, batch_size)):
+            with transaction.atomic():
+                Expenses.objects.bulk_create(batch, batch_size=5000)
+            created += len(batch)
+        return created
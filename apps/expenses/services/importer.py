@@ -0,0 +1,268 @@
+import csv
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import date
+from itertools import islice
+
+from django.db import connections, router, transaction
+
+from base.ids import generate_id
+from base.routers import pin_to_primary
+from users.models import User
+
+from ..models import Expenses, ExpensesMonthlyRollup, ExpensesTotal
+from .cache import ExpensesCacheService
+from .rollups import ROLLUP_KEY_FIELDS, TOTAL_KEY_FIELDS, ExpensesRollupService
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Columns written for every imported expense, in COPY order. An `id` column
+# in the input is ignored: imported rows get fresh time-ordered IDs.
+IMPORT_COLUMNS = ("id", "user_id", "title", "amount", "date", "category")
+
+STAGING_TABLE = "expenses_import_staging"
+
+
+class ExpensesImportService:
+    """
+    Bulk-load expenses from CSV or NDJSON streams.
+
+    Input is parsed and validated a chunk at a time, so memory use does not
+    grow with the size of the file. Each row is checked against the
+    `Expenses` field constraints and a set of the existing user IDs fetched
+    once up front; invalid rows are rejected with their line number and the
+    rest are loaded. On PostgreSQL a chunk is `COPY`-ed into a temporary
+    staging table and moved into `expenses` with one `INSERT ... SELECT`, and
+    its monthly rollups and running totals are upserted in one statement
+    each; other backends use `bulk_create`.
+
+    Rows may name the user as `user` (the export header) or `user_id`.
+    """
+
+    @staticmethod
+    def iter_rows(lines: Iterable[str], import_format: str) -> Iterator[tuple]:
+        """
+        Parse `lines` into `(line number, row)` pairs. Rows that can not be
+        parsed as a JSON object are yielded as `None`.
+        """
+        if import_format == "csv":
+            reader = csv.DictReader(lines)
+            for row in reader:
+                yield reader.line_num, row
+        elif import_format == "ndjson":
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+        else:
+            raise ValueError(f"Unknown import format: {import_format!r}.")
+
+    @staticmethod
+    def get_constraints() -> dict:
+        """
+        Read the limits rows are validated against from the model fields.
+        """
+        amount = Expenses._meta.get_field("amount")
+        connection = connections[router.db_for_write(Expenses)]
+        _, max_amount = connection.ops.integer_field_range(amount.get_internal_type())
+        return {
+            "title_max_length": Expenses._meta.get_field("title").max_length,
+            "max_amount": max_amount,
+            "categories": {choice for choice, _ in Expenses.CATEGORY_CHOICES},
+        }
+
+    @staticmethod
+    def validate_rows(
+        rows: Iterable[tuple], user_ids: set[uuid.UUID], constraints: dict
+    ) -> tuple[list[tuple], list[tuple[int, dict]]]:
+        """
+        Validate a chunk of parsed rows.
+
+        :param rows: `(line number, row)` pairs from `iter_rows`.
+        :param user_ids: IDs of the existing users.
+        :param constraints: Limits from `get_constraints`.
+        :return: The valid rows as `IMPORT_COLUMNS` tuples, and the line
+            number and field errors of the invalid ones.
+        """
+        valid, errors = [], []
+        for line_number, row in rows:
+            if row is None:
+                errors.append((line_number, {"row": "Invalid JSON object."}))
+                continue
+            row_errors = {}
+
+            user_id = row.get("user_id", row.get("user"))
+            try:
+                user_id = uuid.UUID(str(user_id))
+            except ValueError:
+                row_errors["user"] = "Must be a valid UUID."
+            else:
+                if user_id not in user_ids:
+                    row_errors["user"] = "User does not exist."
+
+            title = row.get("title")
+            if not isinstance(title, str) or not title.strip():
+                row_errors["title"] = "This field is required."
+            elif len(title) > constraints["title_max_length"]:
+                row_errors["title"] = (
+                    "Ensure this field has no more than "
+                    f"{constraints['title_max_length']} characters."
+                )
+
+            amount = row.get("amount")
+            try:
+                if isinstance(amount, bool | float):
+                    raise ValueError
+                amount = int(amount)
+            except (TypeError, ValueError):
+                row_errors["amount"] = "A valid integer is required."
+            else:
+                if not 0 < amount <= constraints["max_amount"]:
+                    row_errors["amount"] = (
+                        "Ensure this value is between 1 and "
+                        f"{constraints['max_amount']}."
+                    )
+
+            expense_date = row.get("date")
+            try:
+                expense_date = date.fromisoformat(expense_date)
+            except (TypeError, ValueError):
+                row_errors["date"] = "Must be a date in YYYY-MM-DD format."
+
+            category = row.get("category")
+            if category not in constraints["categories"]:
+                row_errors["category"] = f'"{category}" is not a valid choice.'
+
+            if row_errors:
+                errors.append((line_number, row_errors))
+            else:
+                valid.append(
+                    (generate_id(), user_id, title, amount, expense_date, category)
+                )
+        return valid, errors
+
+    @staticmethod
+    def import_expenses(
+        lines: Iterable[str],
+        import_format: str,
+        chunk_size: int = 10000,
+        max_errors: int = 100,
+    ) -> dict:
+        """
+        Parse, validate and load expenses from `lines` in a single
+        transaction.
+
+        :param lines: Lines of the input, e.g. an open text file.
+        :param import_format: One of `IMPORT_FORMATS`.
+        :param chunk_size: Rows validated and loaded at a time.
+        :param max_errors: Most rejected rows to report; all of them are
+            counted.
+        :return: Numbers of created and rejected rows, and the line number and
+            field errors of the first `max_errors` rejected ones.
+        """
+        rows = ExpensesImportService.iter_rows(lines, import_format)
+        constraints = ExpensesImportService.get_constraints()
+        user_ids = set(User.objects.values_list("id", flat=True).iterator())
+        database = router.db_for_write(Expenses)
+        use_copy = connections[database].vendor == "postgresql"
+        result = {"created": 0, "rejected": 0, "errors": []}
+
+        with transaction.atomic(using=database):
+            if use_copy:
+                ExpensesImportService._create_staging_table(database)
+            while chunk := list(islice(rows, chunk_size)):
+                valid, errors = ExpensesImportService.validate_rows(
+                    chunk, user_ids, constraints
+                )
+                result["rejected"] += len(errors)
+                result["errors"] += errors[: max_errors - len(result["errors"])]
+                if valid and use_copy:
+                    ExpensesImportService._copy_chunk(valid, database)
+                elif valid:
+                    Expenses.objects.using(database).bulk_create(
+                        [Expenses(**dict(zip(IMPORT_COLUMNS, row))) for row in valid],
+                        batch_size=2000,
+                    )
+                result["created"] += len(valid)
+        return result
+
+    @staticmethod
+    def _create_staging_table(database: str) -> None:
+        """
+        Create the temporary table chunks are copied into, dropped when the
+        transaction commits.
+        """
+        with connections[database].cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+                f"(LIKE {Expenses._meta.db_table} INCLUDING DEFAULTS) "
+                "ON COMMIT DROP"
+            )
+
+    @staticmethod
+    def _copy_chunk(rows: list[tuple], database: str) -> None:
+        """
+        `COPY` a chunk into the staging table, move it into `expenses` and add
+        it to the monthly rollups and running totals.
+        """
+        columns = ", ".join(IMPORT_COLUMNS)
+        with connections[database].cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY {STAGING_TABLE} ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+            cursor.execute(
+                f"INSERT INTO {Expenses._meta.db_table} ({columns}) "
+                f"SELECT {columns} FROM {STAGING_TABLE}"
+            )
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        deltas = ExpensesRollupService.get_deltas(
+            dict(zip(IMPORT_COLUMNS, row)) for row in rows
+        )
+        ExpensesImportService._upsert_rollups(deltas, database)
+        user_ids = {user_id for user_id, *_ in deltas}
+        ExpensesCacheService.bump_versions(user_ids)
+        pin_to_primary(user_ids)
+
+    @staticmethod
+    def _upsert_rollups(deltas: dict, database: str) -> None:
+        """
+        Add a chunk's deltas to the monthly rollups and running totals with a
+        single `INSERT ... ON CONFLICT` each, instead of one update per row
+        (`apply_deltas`).
+        """
+        for model, key_fields, rows in (
+            (ExpensesMonthlyRollup, ROLLUP_KEY_FIELDS, deltas),
+            (
+                ExpensesTotal,
+                TOTAL_KEY_FIELDS,
+                ExpensesRollupService.get_total_deltas(deltas),
+            ),
+        ):
+            connection = connections[database]
+            table = model._meta.db_table
+            columns = ("id",) + key_fields + ("total_amount", "count")
+            types = [
+                model._meta.get_field(column).db_type(connection) for column in columns
+            ]
+            keys = list(rows)
+            values = [[generate_id() for _ in keys]]
+            values += [[key[i] for key in keys] for i in range(len(key_fields))]
+            values += [[rows[key][i] for key in keys] for i in range(2)]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    "SELECT * FROM unnest("
+                    + ", ".join(f"%s::{db_type}[]" for db_type in types)
+                    + f") ON CONFLICT ({', '.join(key_fields)}) DO UPDATE SET "
+                    f"total_amount = {table}.total_amount + EXCLUDED.total_amount, "
+                    f"count = {table}.count + EXCLUDED.count",
+                    values,
+                )
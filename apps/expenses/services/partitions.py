@@ -0,0 +1,207 @@
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from base.routers import pin_to_primary
+
+from ..models import Expenses, ExpensesMonthlyRollup
+from .cache import ExpensesCacheService
+from .rollups import ExpensesRollupService
+
+INTERVALS = ("month", "year")
+DEFAULT_PARTITION = "expenses_default"
+
+_BOUNDS_RE = re.compile(r"FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+class ExpensesPartitionService:
+    """
+    Manage the PostgreSQL range partitions of the `expenses` table on `date`.
+
+    Each partition covers one month or one year (`EXPENSES_PARTITION_INTERVAL`)
+    and dates without a partition land in `expenses_default`. A partition is
+    created as a standalone table with its own indexes and then attached, so
+    its indexes have predictable names (`<partition>_user_date_idx`,
+    `<partition>_date_idx`). The search indexes are added by PostgreSQL on
+    attach.
+    """
+
+    table = Expenses._meta.db_table
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+                [ExpensesPartitionService.table],
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def get_interval_bounds(day: date, interval: str) -> tuple[date, date]:
+        """
+        Return the half-open `[start, end)` bounds of the interval containing
+        `day`.
+        """
+        if interval == "year":
+            return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+        start = date(day.year, day.month, 1)
+        return start, date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+    @staticmethod
+    def get_partition_name(start: date, interval: str) -> str:
+        if interval == "year":
+            return f"{ExpensesPartitionService.table}_y{start.year}"
+        return f"{ExpensesPartitionService.table}_y{start.year}m{start.month:02d}"
+
+    @staticmethod
+    def list_partitions() -> list[tuple[str, date | None, date | None]]:
+        """
+        Return the attached partitions as `(name, start, end)`, ordered by
+        start, with `None` bounds for the default partition.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = %s::regclass
+                """,
+                [ExpensesPartitionService.table],
+            )
+            rows = cursor.fetchall()
+        partitions = []
+        for name, bounds in rows:
+            match = _BOUNDS_RE.match(bounds)
+            if match:
+                start, end = map(date.fromisoformat, match.groups())
+                partitions.append((name, start, end))
+            else:
+                partitions.append((name, None, None))
+        return sorted(partitions, key=lambda p: (p[1] is None, p[1] or date.min))
+
+    @staticmethod
+    def create_partition(name: str, start: date | None, end: date | None) -> None:
+        """
+        Create and attach a partition for `[start, end)`, or the default
+        partition when both bounds are `None`. Rows of that range already in
+        the default partition are moved into it.
+        """
+        table = connection.ops.quote_name(ExpensesPartitionService.table)
+        partition = connection.ops.quote_name(name)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {partition} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                f"INCLUDING GENERATED)"
+            )
+            cursor.execute(
+                f'ALTER TABLE {partition} ADD CONSTRAINT "{name}_pkey" '
+                f"PRIMARY KEY (id, date)"
+            )
+            cursor.execute(
+                f'CREATE INDEX "{name}_user_date_idx" ON {partition} '
+                f"(user_id, date) INCLUDE (category, amount)"
+            )
+            cursor.execute(f'CREATE INDEX "{name}_date_idx" ON {partition} (date)')
+            if start is None:
+                cursor.execute(
+                    f"ALTER TABLE {table} ATTACH PARTITION {partition} DEFAULT"
+                )
+                return
+            if name != DEFAULT_PARTITION and ExpensesPartitionService.has_default():
+                # Generated columns (`search_vector`) can not be inserted.
+                columns = ", ".join(
+                    connection.ops.quote_name(field.column)
+                    for field in Expenses._meta.concrete_fields
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE date >= %s AND date < %s RETURNING {columns}) "
+                    f"INSERT INTO {partition} ({columns}) SELECT * FROM moved",
+                    [start, end],
+                )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+    @staticmethod
+    def has_default() -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+            return cursor.fetchone()[0] is not None
+
+    @staticmethod
+    def ensure_partitions(
+        start: date, end: date, interval: str | None = None
+    ) -> list[str]:
+        """
+        Create the missing partitions of every interval overlapping
+        `[start, end)`. Intervals that overlap an existing partition (e.g.
+        after `EXPENSES_PARTITION_INTERVAL` changed) are left to the
+        existing partitions and the default one.
+
+        :return: Names of the created partitions.
+        """
+        interval = interval or settings.EXPENSES_PARTITION_INTERVAL
+        existing = [
+            (p_start, p_end)
+            for _, p_start, p_end in ExpensesPartitionService.list_partitions()
+            if p_start is not None
+        ]
+        created = []
+        day = start
+        while day < end:
+            p_start, p_end = ExpensesPartitionService.get_interval_bounds(day, interval)
+            if not any(s < p_end and p_start < e for s, e in existing):
+                name = ExpensesPartitionService.get_partition_name(p_start, interval)
+                ExpensesPartitionService.create_partition(name, p_start, p_end)
+                existing.append((p_start, p_end))
+                created.append(name)
+            day = p_end
+        return created
+
+    @staticmethod
+    def detach_partitions(before: date, drop: bool = False) -> list[str]:
+        """
+        Detach the partitions that end on or before `before`, dropping them
+        when `drop` is set or otherwise keeping them as standalone tables.
+
+        Their expenses are no longer served, so the monthly rollups of the
+        detached periods are removed as well, and taken out of the running
+        totals. No tombstones are written for them: this is archiving, and
+        clients that synced them keep their copies. The cached responses of
+        the users who had expenses in them are invalidated once the detach
+        commits.
+
+        :return: Names of the detached partitions.
+        """
+        table = connection.ops.quote_name(ExpensesPartitionService.table)
+        detached = []
+        user_ids = set()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for name, start, end in ExpensesPartitionService.list_partitions():
+                if start is None or end > before:
+                    continue
+                partition = connection.ops.quote_name(name)
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {partition}")
+                user_ids |= ExpensesRollupService.remove_rollups(
+                    ExpensesMonthlyRollup.objects.filter(
+                        year__gte=start.year, year__lte=end.year
+                    )
+                    .exclude(year=start.year, month__lt=start.month)
+                    .exclude(year=end.year, month__gte=end.month)
+                )
+                detached.append(name)
+        ExpensesCacheService.bump_versions(user_ids)
+        pin_to_primary(user_ids)
+        return detached
@@ -0,0 +1,402 @@
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from base.routers import pin_to_primary
+
+from ..models import Expenses, ExpensesMonthlyRollup, ExpensesTotal
+from .cache import ExpensesCacheService
+
+# (user_id, year, month, category) -> [amount delta, count delta]
+RollupDeltas = dict[tuple[uuid.UUID, int, int, str], list[int]]
+
+# Key fields of the rows maintained from the deltas: the monthly rollups, and
+# the running totals the months of a user and category add up to.
+ROLLUP_KEY_FIELDS = ("user_id", "year", "month", "category")
+TOTAL_KEY_FIELDS = ("user_id", "category")
+
+_pending_deltas: ContextVar[RollupDeltas | None] = ContextVar(
+    "expenses_pending_rollup_deltas", default=None
+)
+
+
+class ExpensesRollupService:
+    @staticmethod
+    def get_deltas(states: Iterable[dict | None], sign: int = 1) -> RollupDeltas:
+        """
+        Group expense states into per-rollup-row deltas.
+
+        :param states: Rollup states as returned by `Expenses.get_rollup_state`.
+            `None` entries are ignored.
+        :param sign: `1` to add the expenses to their rollups, `-1` to remove
+            them.
+        :return: Mapping of rollup key to amount and count deltas.
+        """
+        deltas = defaultdict(lambda: [0, 0])
+        for state in states:
+            if state is None:
+                continue
+            expense_date = Expenses._meta.get_field("date").to_python(state["date"])
+            amount = Expenses._meta.get_field("amount").to_python(state["amount"])
+            key = (
+                state["user_id"],
+                expense_date.year,
+                expense_date.month,
+                state["category"],
+            )
+            deltas[key][0] += sign * amount
+            deltas[key][1] += sign
+        return deltas
+
+    @staticmethod
+    def merge_deltas(*deltas: RollupDeltas) -> RollupDeltas:
+        """
+        Combine several delta mappings, e.g. the removal of an expense's old
+        state and the addition of its new one.
+        """
+        merged = defaultdict(lambda: [0, 0])
+        for delta in deltas:
+            for key, (amount, count) in delta.items():
+                merged[key][0] += amount
+                merged[key][1] += count
+        return merged
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Collect the deltas applied inside the block and write them once, merged
+        per rollup row, when it exits without an error. Nested batches are
+        folded into the outermost one. Use inside a transaction.
+        """
+        if _pending_deltas.get() is not None:
+            yield
+            return
+        pending = defaultdict(lambda: [0, 0])
+        token = _pending_deltas.set(pending)
+        try:
+            yield
+        finally:
+            _pending_deltas.reset(token)
+        ExpensesRollupService.apply_deltas(pending)
+
+    @staticmethod
+    def apply_deltas(deltas: RollupDeltas) -> None:
+        """
+        Apply deltas to the monthly rollups and running totals with atomic
+        `F()` increments, or add them to the enclosing `batch()`.
+
+        Missing rows are only created for positive counts: a removal that finds
+        no row (e.g. the user and its rollups are being deleted in the same
+        cascade) is dropped.
+
+        Every expense write goes through here, so this is also where the
+        response cache versions of the affected users are bumped.
+        """
+        pending = _pending_deltas.get()
+        if pending is not None:
+            for key, (amount, count) in deltas.items():
+                pending[key][0] += amount
+                pending[key][1] += count
+            return
+
+        ExpensesRollupService._increment(
+            ExpensesMonthlyRollup, ROLLUP_KEY_FIELDS, deltas
+        )
+        ExpensesRollupService._increment(
+            ExpensesTotal,
+            TOTAL_KEY_FIELDS,
+            ExpensesRollupService.get_total_deltas(deltas),
+        )
+
+        user_ids = {user_id for user_id, *_ in deltas}
+        ExpensesCacheService.bump_versions(user_ids)
+        pin_to_primary(user_ids)
+
+    @staticmethod
+    def get_total_deltas(deltas: RollupDeltas) -> dict:
+        """
+        Fold monthly rollup deltas into running total deltas, keyed by
+        `(user_id, category)`. A change of date within the same category
+        cancels out.
+        """
+        totals = defaultdict(lambda: [0, 0])
+        for (user_id, _, _, category), (amount, count) in deltas.items():
+            totals[(user_id, category)][0] += amount
+            totals[(user_id, category)][1] += count
+        return totals
+
+    @staticmethod
+    def _increment(model, key_fields: tuple[str, ...], deltas: dict) -> None:
+        """
+        Add `deltas` to the `total_amount` and `count` of the `model` rows
+        matching their keys, creating missing rows for positive counts.
+        """
+        # Rows are locked in key order, so concurrent writers touching the
+        # same rows can not deadlock on each other.
+        for key, (amount, count) in sorted(
+            deltas.items(), key=lambda item: tuple(map(str, item[0]))
+        ):
+            if not amount and not count:
+                continue
+            lookup = dict(zip(key_fields, key))
+            rows = model.objects.filter(**lookup)
+            changes = {
+                "total_amount": F("total_amount") + amount,
+                "count": F("count") + count,
+            }
+            if rows.update(**changes) or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    model.objects.create(**lookup, total_amount=amount, count=count)
+            except IntegrityError:
+                # A concurrent writer created the row first.
+                rows.update(**changes)
+
+    @staticmethod
+    def remove_rollups(rollups: QuerySet) -> set[uuid.UUID]:
+        """
+        Delete monthly rollups whose expenses are no longer in the expenses
+        table (e.g. a detached partition), taking them out of the running
+        totals as well.
+
+        :return: IDs of the users whose rollups were removed.
+        """
+        rows = (
+            rollups.values_list(*TOTAL_KEY_FIELDS)
+            .annotate(total_amount=Sum("total_amount"), count=Sum("count"))
+            .order_by()
+        )
+        deltas = {
+            (user_id, category): (-total_amount, -count)
+            for user_id, category, total_amount, count in rows
+        }
+        ExpensesRollupService._increment(ExpensesTotal, TOTAL_KEY_FIELDS, deltas)
+        rollups.delete()
+        return {user_id for user_id, _ in deltas}
+
+    @staticmethod
+    def record_save(expense: Expenses, created: bool) -> None:
+        """
+        Move a saved expense's contribution from its previous rollup row, if
+        any, to its current one.
+        """
+        previous = None if created else expense.get_saved_rollup_state()
+        ExpensesRollupService.apply_deltas(
+            ExpensesRollupService.merge_deltas(
+                ExpensesRollupService.get_deltas([previous], sign=-1),
+                ExpensesRollupService.get_deltas([expense.get_rollup_state(previous)]),
+            )
+        )
+
+    @staticmethod
+    def record_delete(expense: Expenses) -> None:
+        """
+        Remove a deleted expense's contribution from its rollup row.
+        """
+        state = expense.get_saved_rollup_state() or expense.get_rollup_state()
+        ExpensesRollupService.apply_deltas(
+            ExpensesRollupService.get_deltas([state], sign=-1)
+        )
+
+    @staticmethod
+    def get_expected_rollups(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Aggregate the rollups from the raw expenses table.
+
+        :param user_id: Restrict the aggregation to a single user.
+        :return: Mapping of rollup key to `(total_amount, count)`.
+        """
+        expenses = Expenses.objects.all()
+        if user_id is not None:
+            expenses = expenses.filter(user_id=user_id)
+        return {
+            key: tuple(totals)
+            for key, totals in ExpensesRollupService.get_queryset_deltas(
+                expenses
+            ).items()
+        }
+
+    @staticmethod
+    def get_queryset_deltas(expenses: QuerySet) -> RollupDeltas:
+        """
+        Aggregate the contribution of `expenses` to the monthly rollups in a
+        single `GROUP BY` query.
+
+        :return: Mapping of rollup key to amount and count.
+        """
+        rows = (
+            expenses.order_by()
+            .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+            .values_list(*ROLLUP_KEY_FIELDS)
+            .annotate(total_amount=Sum("amount"), count=Count("id"))
+        )
+        return {
+            (user, year, month, category): [total_amount, count]
+            for user, year, month, category, total_amount, count in rows.iterator(
+                chunk_size=2000
+            )
+        }
+
+    @staticmethod
+    def get_stored_rollups(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Read the maintained rollups, skipping rows emptied by deletes.
+
+        :param user_id: Restrict the result to a single user.
+        :return: Mapping of rollup key to `(total_amount, count)`.
+        """
+        rollups = ExpensesMonthlyRollup.objects.exclude(total_amount=0, count=0)
+        if user_id is not None:
+            rollups = rollups.filter(user_id=user_id)
+        rows = rollups.values_list(
+            "user_id", "year", "month", "category", "total_amount", "count"
+        )
+        return {
+            (user, year, month, category): (total_amount, count)
+            for user, year, month, category, total_amount, count in rows.iterator(
+                chunk_size=2000
+            )
+        }
+
+    @staticmethod
+    def rebuild(user_id: uuid.UUID | None = None) -> int:
+        """
+        Replace the rollups with a fresh aggregation of the expenses table.
+
+        :param user_id: Restrict the rebuild to a single user.
+        :return: Number of rollup rows written.
+        """
+        expected = ExpensesRollupService.get_expected_rollups(user_id)
+        with transaction.atomic():
+            rollups = ExpensesMonthlyRollup.objects.all()
+            if user_id is not None:
+                rollups = rollups.filter(user_id=user_id)
+            rollups.delete()
+            ExpensesMonthlyRollup.objects.bulk_create(
+                (
+                    ExpensesMonthlyRollup(
+                        user_id=user,
+                        year=year,
+                        month=month,
+                        category=category,
+                        total_amount=total_amount,
+                        count=count,
+                    )
+                    for (user, year, month, category), (
+                        total_amount,
+                        count,
+                    ) in expected.items()
+                ),
+                batch_size=2000,
+            )
+        return len(expected)
+
+    @staticmethod
+    def verify(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Compare the maintained rollups with the expenses table.
+
+        :param user_id: Restrict the check to a single user.
+        :return: Mapping of every drifted rollup key to a tuple of the stored
+            and expected `(total_amount, count)`; empty when in sync.
+        """
+        expected = ExpensesRollupService.get_expected_rollups(user_id)
+        stored = ExpensesRollupService.get_stored_rollups(user_id)
+        return {
+            key: (stored.get(key), expected.get(key))
+            for key in expected.keys() | stored.keys()
+            if stored.get(key) != expected.get(key)
+        }
+
+    @staticmethod
+    def get_expected_totals(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Aggregate the running totals from the raw expenses table.
+
+        :param user_id: Restrict the aggregation to a single user.
+        :return: Mapping of `(user_id, category)` to `(total_amount, count)`.
+        """
+        expenses = Expenses.objects.all()
+        if user_id is not None:
+            expenses = expenses.filter(user_id=user_id)
+        rows = (
+            expenses.values_list(*TOTAL_KEY_FIELDS)
+            .annotate(total_amount=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        return {
+            (user, category): (total_amount, count)
+            for user, category, total_amount, count in rows.iterator(chunk_size=2000)
+        }
+
+    @staticmethod
+    def get_stored_totals(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Read the maintained running totals, skipping rows emptied by deletes.
+
+        :param user_id: Restrict the result to a single user.
+        :return: Mapping of `(user_id, category)` to `(total_amount, count)`.
+        """
+        totals = ExpensesTotal.objects.exclude(total_amount=0, count=0)
+        if user_id is not None:
+            totals = totals.filter(user_id=user_id)
+        rows = totals.values_list(*TOTAL_KEY_FIELDS, "total_amount", "count")
+        return {
+            (user, category): (total_amount, count)
+            for user, category, total_amount, count in rows.iterator(chunk_size=2000)
+        }
+
+    @staticmethod
+    def rebuild_totals(user_id: uuid.UUID | None = None) -> int:
+        """
+        Replace the running totals with a fresh aggregation of the expenses
+        table.
+
+        :param user_id: Restrict the rebuild to a single user.
+        :return: Number of running total rows written.
+        """
+        expected = ExpensesRollupService.get_expected_totals(user_id)
+        with transaction.atomic():
+            totals = ExpensesTotal.objects.all()
+            if user_id is not None:
+                totals = totals.filter(user_id=user_id)
+            totals.delete()
+            ExpensesTotal.objects.bulk_create(
+                (
+                    ExpensesTotal(
+                        user_id=user,
+                        category=category,
+                        total_amount=total_amount,
+                        count=count,
+                    )
+                    for (user, category), (total_amount, count) in expected.items()
+                ),
+                batch_size=2000,
+            )
+        return len(expected)
+
+    @staticmethod
+    def verify_totals(user_id: uuid.UUID | None = None) -> dict:
+        """
+        Compare the maintained running totals with the expenses table.
+
+        :param user_id: Restrict the check to a single user.
+        :return: Mapping of every drifted `(user_id, category)` to a tuple of
+            the stored and expected `(total_amount, count)`; empty when in
+            sync.
+        """
+        expected = ExpensesRollupService.get_expected_totals(user_id)
+        stored = ExpensesRollupService.get_stored_totals(user_id)
+        return {
+            key: (stored.get(key), expected.get(key))
+            for key in expected.keys() | stored.keys()
+            if stored.get(key) != expected.get(key)
+        }
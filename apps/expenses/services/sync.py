@@ -0,0 +1,95 @@
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from ..models import Expenses, ExpensesTombstone
+
+_pending_tombstones: ContextVar[list | None] = ContextVar(
+    "expenses_pending_tombstones", default=None
+)
+
+
+class ExpensesSyncService:
+    """
+    Write and purge the tombstones of deleted expenses, and of those moved to
+    another user, which incremental sync (`ExpensesSelector.get_changes`)
+    reports alongside the updated expenses.
+    """
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Collect the tombstones recorded inside the block and insert them with
+        a single `bulk_create` when it exits without an error. Nested batches
+        are folded into the outermost one. Use inside a transaction.
+        """
+        if _pending_tombstones.get() is not None:
+            yield
+            return
+        pending = []
+        token = _pending_tombstones.set(pending)
+        try:
+            yield
+        finally:
+            _pending_tombstones.reset(token)
+        ExpensesTombstone.objects.bulk_create(pending, batch_size=2000)
+
+    @staticmethod
+    def record_delete(expense: Expenses) -> None:
+        """
+        Record the deletion of an expense, or add it to the enclosing
+        `batch()`.
+        """
+        ExpensesSyncService._record(
+            ExpensesTombstone(expense_id=expense.pk, user_id=expense.user_id)
+        )
+
+    @staticmethod
+    def record_save(expense: Expenses, created: bool) -> None:
+        """
+        Record the move of a saved expense away from its previous user, if
+        its user changed.
+        """
+        previous = None if created else expense.get_saved_rollup_state()
+        if previous and previous["user_id"] != expense.user_id:
+            ExpensesSyncService.record_move(
+                expense.pk, previous["user_id"], expense.updated_at
+            )
+
+    @staticmethod
+    def record_move(
+        expense_id: uuid.UUID, user_id: uuid.UUID, moved_at: datetime
+    ) -> None:
+        """
+        Record that an expense no longer belongs to `user_id`, which to that
+        user's clients is a deletion, or add it to the enclosing `batch()`.
+
+        :param moved_at: The `updated_at` written with the new user.
+        """
+        ExpensesSyncService._record(
+            ExpensesTombstone(
+                expense_id=expense_id, user_id=user_id, deleted_at=moved_at
+            )
+        )
+
+    @staticmethod
+    def _record(tombstone: ExpensesTombstone) -> None:
+        pending = _pending_tombstones.get()
+        if pending is not None:
+            pending.append(tombstone)
+        else:
+            tombstone.save(force_insert=True)
+
+    @staticmethod
+    def purge_tombstones(before: datetime) -> int:
+        """
+        Delete the tombstones of deletions made before `before`. Sync tokens
+        older than that are rejected, so no client still needs them.
+
+        :return: Number of deleted tombstones.
+        """
+        # Tombstones have no signals or relations to collect, so this is a
+        # single `DELETE`.
+        return ExpensesTombstone.objects.filter(deleted_at__lt=before).delete()[0]
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Expenses
+from .services.rollups import ExpensesRollupService
+from .services.sync import ExpensesSyncService
+
+
+@receiver(pre_save, sender=Expenses)
+def load_saved_rollup_state(sender, instance, raw=False, **kwargs):
+    """
+    Fetch the stored rollup fields of an existing expense that was not loaded
+    from the database (e.g. built with an explicit primary key), so that the
+    update can be moved out of its previous rollup row.
+    """
+    if raw or instance._state.adding or instance.get_saved_rollup_state():
+        return
+    instance._saved_state = (
+        Expenses.objects.filter(pk=instance.pk).values(*Expenses.ROLLUP_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Expenses)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    # Fixtures are loaded with `raw=True`; run `rebuild_expense_rollups` after
+    # `loaddata` instead.
+    if raw:
+        return
+    ExpensesRollupService.record_save(instance, created)
+
+
+@receiver(post_delete, sender=Expenses)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    ExpensesRollupService.record_delete(instance)
+
+
+@receiver(post_save, sender=Expenses)
+def record_tombstone_on_move(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    ExpensesSyncService.record_save(instance, created)
+
+
+@receiver(post_delete, sender=Expenses)
+def record_tombstone_on_delete(sender, instance, **kwargs):
+    ExpensesSyncService.record_delete(instance)
@@ -0,0 +1,182 @@
+from datetime import date
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from base.admin import EstimatedCountPaginator
+from users.models import User
+from expenses.models import Expenses
+from expenses.services.rollups import ExpensesRollupService
+
+
+class ExpensesAdminTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with expenses in November 2024 and March 2025, and
+        log in as an admin.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        self.expenses = Expenses.objects.bulk_create(
+            Expenses(
+                user=user,
+                title="Expense",
+                amount=10,
+                date=expense_date,
+                category="food",
+            )
+            for user in self.users
+            for expense_date in (date(2024, 11, 5), date(2025, 3, 1))
+        )
+        admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(admin)
+
+    def get_changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/expenses/expenses/", params or {})
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Test the users are joined instead of fetched per row, and the whole
+        table is only counted once.
+        """
+        queries = self.get_changelist_queries()
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=User.objects.create(username=f"extra{i}", email=f"e{i}@x.com"),
+                title="Expense",
+                amount=10,
+                date=date(2024, 11, 6),
+                category="travel",
+            )
+            for i in range(5)
+        )
+
+        self.assertEqual(len(self.get_changelist_queries()), len(queries))
+        self.assertEqual(len([sql for sql in queries if "COUNT(" in sql]), 1)
+
+    def test_date_hierarchy(self):
+        """
+        Test the years, then the months of a year with expenses are listed.
+        """
+        response = self.client.get("/admin/expenses/expenses/")
+        self.assertContains(response, "?date__year=2024")
+        self.assertContains(response, "?date__year=2025")
+
+        response = self.client.get("/admin/expenses/expenses/", {"date__year": 2024})
+        self.assertContains(response, "date__month=11")
+        self.assertNotContains(response, "date__month=10")
+
+        changelist = response.context["cl"]
+        self.assertEqual(
+            changelist.queryset.dates("date", "month", order="DESC"),
+            [date(2024, 11, 1)],
+        )
+        # Outside the admin, `dates()` is Django's own.
+        self.assertIsInstance(Expenses.objects.dates("date", "month"), QuerySet)
+
+    def test_user_autocomplete(self):
+        response = self.client.get(
+            "/admin/autocomplete/",
+            {
+                "app_label": "expenses",
+                "model_name": "expenses",
+                "field_name": "user",
+                "term": "USER1",
+            },
+        )
+        self.assertEqual(
+            [result["text"] for result in response.json()["results"]], ["user1"]
+        )
+
+    def test_set_category_action(self):
+        """
+        Test the action moves the selected expenses with one UPDATE and keeps
+        the rollups and running totals in sync.
+        """
+        selected = [str(expense.pk) for expense in self.expenses[:3]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/admin/expenses/expenses/",
+                {"action": "set_category_travel", "_selected_action": selected},
+            )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Expenses.objects.filter(category="travel").count(), len(selected)
+        )
+        self.assertEqual(
+            len([q for q in queries if q["sql"].startswith('UPDATE "expenses"')]), 1
+        )
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+
+class ExpensesQuerySetUpdateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="testuser", email="t@example.com")
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title="Expense",
+                amount=day,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for day in range(1, 5)
+        )
+
+    def test_update_keeps_rollups_in_sync(self):
+        other = User.objects.create(username="other", email="o@example.com")
+        Expenses.objects.filter(amount__lte=2).update(amount=7, date=date(2025, 1, 1))
+        Expenses.objects.filter(amount=3).update(user=other, category="travel")
+        Expenses.objects.update(title="Renamed")
+
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_update_with_expression(self):
+        from django.db.models import F
+
+        with self.assertRaises(ValueError):
+            Expenses.objects.update(amount=F("amount") + 1)
+        Expenses.objects.update(title=F("category"))
+        self.assertEqual(Expenses.objects.filter(title="food").count(), 4)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def test_count(self):
+        """
+        Test small results are counted exactly and large ones estimated.
+        """
+        user = User.objects.create(username="testuser", email="t@example.com")
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=user,
+                title="Expense",
+                amount=1,
+                date=date(2024, 11, 1),
+                category="food",
+            )
+            for _ in range(3)
+        )
+        queryset = Expenses.objects.order_by("date")
+
+        self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 3)
+
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.exact_count_threshold = 0
+        if connection.vendor == "postgresql":
+            with self.assertNumQueries(1):
+                self.assertGreater(paginator.count, 0)
+        self.assertEqual(EstimatedCountPaginator([1, 2], 10).count, 2)
@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from threading import Barrier
+from unittest import skipUnless
+from uuid import uuid4
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses, ExpensesBudget, ExpensesMonthlyRollup
+from expenses.services.rollups import ExpensesRollupService
+
+
+class ExpensesBudgetViewSetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        self.budget = ExpensesBudget.objects.create(
+            user=self.user, category="food", amount=100
+        )
+        self.client = APIClient()
+
+    def test_create_budget(self):
+        response = self.client.post(
+            "/api/budgets/",
+            {"user": str(self.user.id), "category": "travel", "amount": 500},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["amount"], 500)
+
+        response = self.client.get("/api/budgets/", {"user_id": str(self.user.id)})
+        self.assertEqual(
+            [row["category"] for row in response.data["results"]], ["food", "travel"]
+        )
+
+    def test_invalid_budget(self):
+        for data in (
+            {"user": str(self.user.id), "category": "food", "amount": 200},
+            {"user": str(self.user.id), "category": "travel", "amount": 0},
+            {"user": str(uuid4()), "category": "travel", "amount": 10},
+        ):
+            with self.subTest(data=data):
+                response = self.client.post("/api/budgets/", data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpensesBudgetStatusTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        ExpensesBudget.objects.create(user=self.user, category="food", amount=100)
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title="Groceries",
+                amount=30,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for day in range(1, 4)
+        )
+        self.client = APIClient()
+        self.item = {
+            "user": str(self.user.id),
+            "title": "Dinner",
+            "amount": 20,
+            "date": "2024-11-20",
+            "category": "food",
+        }
+
+    def test_create_reports_budget(self):
+        response = self.client.post("/api/", self.item, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data["budget"],
+            {"category": "food", "amount": 100, "spent": 110, "over_budget": True},
+        )
+
+        response = self.client.post(
+            "/api/", {**self.item, "date": "2024-12-01"}, format="json"
+        )
+        self.assertEqual(response.data["budget"]["spent"], 20)
+        self.assertFalse(response.data["budget"]["over_budget"])
+
+        response = self.client.post(
+            "/api/", {**self.item, "category": "travel"}, format="json"
+        )
+        self.assertIsNone(response.data["budget"])
+
+    def test_update_reports_budget(self):
+        expense = Expenses.objects.filter(user=self.user).first()
+        response = self.client.patch(
+            f"/api/{expense.id}/", {"amount": 10}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["budget"]["spent"], 70)
+        self.assertFalse(response.data["budget"]["over_budget"])
+
+        response = self.client.put(
+            f"/api/{expense.id}/", {**self.item, "amount": 50}, format="json"
+        )
+        self.assertEqual(response.data["budget"]["spent"], 110)
+        self.assertTrue(response.data["budget"]["over_budget"])
+
+    def test_budget_does_not_read_expenses(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/api/", self.item, format="json")
+
+        (budget_query,) = [
+            query["sql"] for query in queries if '"expenses_budget"' in query["sql"]
+        ]
+        self.assertIn('"expenses_monthly_rollup"', budget_query)
+        self.assertNotIn('FROM "expenses"', budget_query)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Concurrent writers need row-level locks"
+)
+class ExpensesBudgetConcurrencyTest(TransactionTestCase):
+    writers = 8
+    writes_per_writer = 5
+
+    def setUp(self):
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        ExpensesBudget.objects.create(user=self.user, category="food", amount=100)
+
+    def write(self, barrier):
+        """
+        Post `writes_per_writer` expenses from a thread with its own
+        connection, all threads starting together, and return the spend
+        reported by each write.
+        """
+        client = APIClient()
+        item = {
+            "user": str(self.user.id),
+            "title": "Coffee",
+            "amount": 3,
+            "date": "2024-11-15",
+            "category": "food",
+        }
+        try:
+            barrier.wait()
+            spent = []
+            for _ in range(self.writes_per_writer):
+                response = client.post("/api/", item, format="json")
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+                spent.append(response.data["budget"]["spent"])
+            return spent
+        finally:
+            connection.close()
+
+    def test_parallel_writers(self):
+        """
+        Test concurrent writes neither lose rollup updates nor report the
+        same spend twice: each write sees the total up to and including
+        itself.
+        """
+        barrier = Barrier(self.writers)
+        with ThreadPoolExecutor(self.writers) as executor:
+            results = list(executor.map(self.write, [barrier] * self.writers))
+
+        writes = self.writers * self.writes_per_writer
+        reported = sorted(spent for result in results for spent in result)
+        self.assertEqual(reported, [3 * n for n in range(1, writes + 1)])
+        rollup = ExpensesMonthlyRollup.objects.get(
+            user=self.user, year=2024, month=11, category="food"
+        )
+        self.assertEqual((rollup.total_amount, rollup.count), (3 * writes, writes))
+        self.assertEqual(ExpensesRollupService.verify(self.user.id), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(self.user.id), {})
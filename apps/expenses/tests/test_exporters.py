@@ -0,0 +1,84 @@
+import csv
+import json
+from io import StringIO
+from uuid import uuid4
+from datetime import date
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses
+from expenses.api.serializers import ExpensesSerializer
+
+
+class ExpensesExportTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with three expenses each, on the 1st, 2nd and 3rd of
+        November 2024.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=user,
+                title=f'Expense "{day}", with comma',
+                amount=10 * day,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for user in self.users
+            for day in (3, 1, 2)
+        )
+        self.client = APIClient()
+
+    def get_expected(self, user):
+        expenses = Expenses.objects.filter(user=user).order_by("date", "id")
+        return json.loads(
+            JSONRenderer().render(ExpensesSerializer(expenses, many=True).data)
+        )
+
+    def export(self, params):
+        response = self.client.get("/api/export/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_export_matches_serializer(self):
+        response, content = self.export({"user_id": str(self.users[0].id)})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            self.get_expected(self.users[0]),
+        )
+
+    def test_csv_export_matches_serializer(self):
+        response, content = self.export(
+            {"user_id": str(self.users[0].id), "export_format": "csv"}
+        )
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(content)))
+        expected = [
+            {key: str(value) for key, value in item.items()}
+            for item in self.get_expected(self.users[0])
+        ]
+        self.assertEqual(rows, expected)
+
+    def test_date_filters_apply(self):
+        _, content = self.export({"start_date": "2024-11-02"})
+
+        dates = [json.loads(line)["date"] for line in content.splitlines()]
+        self.assertEqual(dates, ["2024-11-02"] * 2 + ["2024-11-03"] * 2)
+
+    def test_invalid_format(self):
+        response = self.client.get("/api/export/", {"export_format": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("export_format", response.data)
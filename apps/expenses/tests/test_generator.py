@@ -0,0 +1,99 @@
+import random
+from collections import Counter
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from users.models import User
+from expenses.models import Expenses
+from expenses.services.generator import ExpensesGeneratorService
+from expenses.services.rollups import ExpensesRollupService
+
+
+class ExpensesGeneratorServiceTest(TestCase):
+    def test_parse_category_mix(self):
+        self.assertEqual(
+            ExpensesGeneratorService.parse_category_mix("food=3, travel"),
+            {"food": 3.0, "travel": 1.0},
+        )
+        with self.assertRaises(ValueError):
+            ExpensesGeneratorService.parse_category_mix("rent=1")
+
+    def test_create_expenses(self):
+        """
+        Test the requested number of expenses is created in several batches,
+        within the date spread and category mix, skewed towards the first
+        users, with the rollups kept in sync.
+        """
+        rng = random.Random(0)
+        user_ids = ExpensesGeneratorService.create_users(20, rng)
+        created = ExpensesGeneratorService.create_expenses(
+            user_ids,
+            2500,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 3, 31),
+            category_mix={"food": 3, "travel": 1},
+            skew=1.1,
+            rng=rng,
+            batch_size=1000,
+        )
+
+        self.assertEqual(created, 2500)
+        self.assertEqual(Expenses.objects.count(), 2500)
+        self.assertEqual(
+            set(Expenses.objects.values_list("category", flat=True)),
+            {"food", "travel"},
+        )
+        self.assertFalse(
+            Expenses.objects.exclude(
+                date__range=(date(2024, 1, 1), date(2024, 3, 31))
+            ).exists()
+        )
+        per_user = Counter(Expenses.objects.values_list("user_id", flat=True))
+        self.assertGreater(per_user[user_ids[0]], 5 * per_user[user_ids[-1]])
+        self.assertEqual(ExpensesRollupService.verify(), {})
+
+    def test_same_seed_same_data(self):
+        def generate():
+            rng = random.Random(42)
+            return [
+                (expense.title, expense.amount, expense.date, expense.category)
+                for expense in ExpensesGeneratorService.iter_expenses(
+                    [User(username="user").id],
+                    50,
+                    date(2024, 1, 1),
+                    date(2024, 12, 31),
+                    {"food": 1, "travel": 1, "utilities": 1},
+                    1.0,
+                    rng,
+                )
+            ]
+
+        self.assertEqual(generate(), generate())
+
+
+class GenerateExpensesCommandTest(TestCase):
+    def test_generate(self):
+        out = StringIO()
+        call_command(
+            "generate_expenses",
+            "--users=5",
+            "--expenses=300",
+            "--days=30",
+            "--end-date=2024-06-30",
+            "--seed=1",
+            stdout=out,
+        )
+
+        self.assertIn("Created 5 users and 300 expenses", out.getvalue())
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(
+            Expenses.objects.filter(date__gte=date(2024, 6, 1)).count(), 300
+        )
+
+    def test_invalid_categories(self):
+        with self.assertRaises(CommandError):
+            call_command("generate_expenses", "--categories=rent=1", stdout=StringIO())
@@ -0,0 +1,186 @@
+import json
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses
+from expenses.services.importer import ExpensesImportService
+from expenses.services.rollups import ExpensesRollupService
+
+
+class ExpensesImportServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="importer", email="i@example.com")
+
+    def csv_lines(self, *rows):
+        header = "id,user,title,amount,date,category\n"
+        return StringIO(header + "".join(f"{row}\n" for row in rows))
+
+    def test_csv_import(self):
+        """
+        Test valid rows are loaded in several chunks with their rollups, and
+        invalid ones are rejected with their line number and field errors.
+        """
+        user = self.user.id
+        lines = self.csv_lines(
+            f",{user},Lunch,12,2024-01-05,food",
+            f",{user},Taxi,30,2024-01-06,travel",
+            f",{uuid4()},Unknown user,5,2024-01-06,food",
+            f',{user},"Quoted, title",7,2024-02-01,food',
+            f",{user},Rent,-3,2024-13-01,rent",
+            f",{user},{'x' * 101},4,2024-02-02,food",
+            f",{user},Dinner,25,2024-02-03,food",
+        )
+
+        result = ExpensesImportService.import_expenses(lines, "csv", chunk_size=2)
+
+        self.assertEqual(result["created"], 4)
+        self.assertEqual(result["rejected"], 3)
+        self.assertEqual(
+            [(line, sorted(errors)) for line, errors in result["errors"]],
+            [
+                (4, ["user"]),
+                (6, ["amount", "category", "date"]),
+                (7, ["title"]),
+            ],
+        )
+        self.assertEqual(
+            sorted(Expenses.objects.values_list("title", "amount", "date")),
+            [
+                ("Dinner", 25, date(2024, 2, 3)),
+                ("Lunch", 12, date(2024, 1, 5)),
+                ("Quoted, title", 7, date(2024, 2, 1)),
+                ("Taxi", 30, date(2024, 1, 6)),
+            ],
+        )
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_ndjson_import(self):
+        user = str(self.user.id)
+        rows = [
+            {"user_id": user, "title": "Coffee", "amount": 3, "date": "2024-03-01"},
+            {"user": user, "title": "Flight", "amount": 300, "date": "2024-03-02"},
+        ]
+        rows[0]["category"] = "food"
+        rows[1]["category"] = "travel"
+        lines = [json.dumps(row) + "\n" for row in rows]
+        lines += ["\n", "not json\n", '{"user": "1", "amount": 2.5}\n']
+
+        result = ExpensesImportService.import_expenses(lines, "ndjson")
+
+        self.assertEqual(result["created"], 2)
+        self.assertEqual([line for line, _ in result["errors"]], [4, 5])
+        self.assertEqual(result["errors"][0][1], {"row": "Invalid JSON object."})
+        self.assertIn("amount", result["errors"][1][1])
+        self.assertEqual(Expenses.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_bulk_create_fallback(self):
+        """
+        Test backends without COPY load the rows through `bulk_create`.
+        """
+        lines = self.csv_lines(f",{self.user.id},Water,40,2024-04-01,utilities")
+
+        with patch.object(connection, "vendor", "sqlite"):
+            result = ExpensesImportService.import_expenses(lines, "csv")
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(Expenses.objects.get().title, "Water")
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_max_errors(self):
+        lines = self.csv_lines(*[f",{self.user.id},Bad,0,2024-01-01,food"] * 5)
+
+        result = ExpensesImportService.import_expenses(lines, "csv", max_errors=2)
+
+        self.assertEqual(result["rejected"], 5)
+        self.assertEqual([line for line, _ in result["errors"]], [2, 3])
+
+    def test_command(self):
+        path = Path(self.enterContext(TemporaryDirectory())) / "expenses.csv"
+        path.write_text(
+            self.csv_lines(
+                f",{self.user.id},Lunch,12,2024-01-05,food",
+                f",{self.user.id},Lunch,12,yesterday,food",
+            ).getvalue()
+        )
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("import_expenses", str(path), stdout=stdout, stderr=stderr)
+
+        self.assertIn("Imported 1 expenses", stdout.getvalue())
+        self.assertIn("rows/sec", stdout.getvalue())
+        self.assertIn("rejected 1 rows", stdout.getvalue())
+        self.assertEqual(
+            stderr.getvalue().strip(),
+            "line 3: date: Must be a date in YYYY-MM-DD format.",
+        )
+        with self.assertRaises(CommandError):
+            call_command("import_expenses", "expenses.txt")
+
+
+class ExpensesImportViewSetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="uploader", email="u@example.com")
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f"Expense {day}",
+                amount=day,
+                date=date(2024, 5, day),
+                category="food",
+            )
+            for day in range(1, 4)
+        )
+        self.client = APIClient()
+
+    def test_import_export_round_trip(self):
+        """
+        Test a CSV export can be imported back as new expenses.
+        """
+        exported = b"".join(
+            self.client.get("/api/export/", {"export_format": "csv"}).streaming_content
+        )
+        exported += b"not-an-id,,,,,\n"
+
+        response = self.client.post(
+            "/api/import/",
+            {"file": SimpleUploadedFile("expenses.csv", exported)},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["rejected"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 5)
+        self.assertEqual(Expenses.objects.count(), 6)
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_invalid_upload(self):
+        response = self.client.post("/api/import/", {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+
+        response = self.client.post(
+            "/api/import/",
+            {"file": SimpleUploadedFile("expenses.xlsx", b"")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("import_format", response.data)
@@ -0,0 +1,89 @@
+from uuid import uuid4
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses
+
+
+class ExpensesKeysetPaginationTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with 25 expenses each, spread over five days so that
+        several expenses share a date.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=user,
+                title=f"Expense {i}",
+                amount=10,
+                date=date(2024, 11, i % 5 + 1),
+                category="food",
+            )
+            for user in self.users
+            for i in range(25)
+        )
+        self.client = APIClient()
+
+    def walk(self, params):
+        """
+        Follow the `next` links from the first page and return the pages.
+        """
+        pages = []
+        response = self.client.get("/api/", {"pagination": "cursor", **params})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data["results"])
+            if response.data["next"] is None:
+                return pages
+            response = self.client.get(response.data["next"])
+
+    def test_pages_cover_filtered_expenses_in_order(self):
+        user_id = str(self.users[0].id)
+        pages = self.walk({"user_id": user_id, "page_size": 7})
+
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4])
+        results = [item for page in pages for item in page]
+        expected = Expenses.objects.filter(user_id=user_id).order_by("date", "id")
+        self.assertEqual(
+            [item["id"] for item in results], [str(e.id) for e in expected]
+        )
+
+    def test_date_filters_apply(self):
+        pages = self.walk({"start_date": "2024-11-04", "page_size": 8})
+
+        results = [item for page in pages for item in page]
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(item["date"] >= "2024-11-04" for item in results))
+
+    def test_deep_pages_do_not_count(self):
+        response = self.client.get("/api/", {"pagination": "cursor", "page_size": 5})
+        response = self.client.get(response.data["next"])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data["next"])
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT", queries[0]["sql"])
+        self.assertNotIn("OFFSET", queries[0]["sql"])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(
+            "/api/", {"pagination": "cursor", "page_size": 100000}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 50)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/", {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
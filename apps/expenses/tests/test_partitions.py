@@ -0,0 +1,134 @@
+from io import StringIO
+from uuid import uuid4
+from datetime import date
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from expenses.models import Expenses, ExpensesMonthlyRollup
+from expenses.services.cache import ExpensesCacheService
+from expenses.services.partitions import ExpensesPartitionService
+from expenses.services.rollups import ExpensesRollupService
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning is PostgreSQL-specific")
+class ExpensesPartitionServiceTest(TestCase):
+    def setUp(self):
+        """
+        Create a test user with one expense in October and one in November
+        2024, both landing in the default partition.
+        """
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+        for month in (10, 11):
+            Expenses.objects.create(
+                user=self.user,
+                title="Groceries",
+                amount=50,
+                date=date(2024, month, 15),
+                category="food",
+            )
+
+    def count_rows(self, partition):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {partition}")
+            return cursor.fetchone()[0]
+
+    def get_partition_names(self):
+        return [name for name, _, _ in ExpensesPartitionService.list_partitions()]
+
+    def test_is_partitioned(self):
+        self.assertTrue(ExpensesPartitionService.is_partitioned())
+        self.assertIn("expenses_default", self.get_partition_names())
+
+    def test_ensure_partitions_moves_rows_out_of_default(self):
+        created = ExpensesPartitionService.ensure_partitions(
+            date(2024, 10, 1), date(2024, 12, 1), "month"
+        )
+
+        self.assertEqual(created, ["expenses_y2024m10", "expenses_y2024m11"])
+        self.assertEqual(self.count_rows("expenses_y2024m10"), 1)
+        self.assertEqual(self.count_rows("expenses_y2024m11"), 1)
+        self.assertEqual(
+            Expenses.objects.filter(date__year=2024, user=self.user).count(), 2
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM expenses_default WHERE date >= '2024-10-01' "
+                "AND date < '2024-12-01'"
+            )
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_ensure_partitions_is_idempotent(self):
+        ExpensesPartitionService.ensure_partitions(
+            date(2024, 10, 1), date(2024, 12, 1), "month"
+        )
+        self.assertEqual(
+            ExpensesPartitionService.ensure_partitions(
+                date(2024, 10, 1), date(2024, 12, 1), "month"
+            ),
+            [],
+        )
+        # A yearly interval overlapping the monthly partitions is skipped.
+        self.assertEqual(
+            ExpensesPartitionService.ensure_partitions(
+                date(2024, 1, 1), date(2025, 1, 1), "year"
+            ),
+            [],
+        )
+
+    def test_detach_partitions(self):
+        ExpensesPartitionService.ensure_partitions(
+            date(2024, 10, 1), date(2024, 12, 1), "month"
+        )
+
+        detached = ExpensesPartitionService.detach_partitions(
+            date(2024, 11, 1), drop=True
+        )
+
+        self.assertEqual(detached, ["expenses_y2024m10"])
+        self.assertNotIn("expenses_y2024m10", self.get_partition_names())
+        self.assertEqual(
+            list(Expenses.objects.values_list("date", flat=True)),
+            [date(2024, 11, 15)],
+        )
+        self.assertEqual(
+            list(
+                ExpensesMonthlyRollup.objects.filter(user=self.user).values_list(
+                    "year", "month"
+                )
+            ),
+            [(2024, 11)],
+        )
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+    def test_detach_partitions_invalidates_cached_responses(self):
+        ExpensesPartitionService.ensure_partitions(
+            date(2024, 10, 1), date(2024, 12, 1), "month"
+        )
+        version = ExpensesCacheService.get_version(self.user.id)
+
+        ExpensesPartitionService.detach_partitions(date(2024, 11, 1), drop=True)
+
+        self.assertNotEqual(ExpensesCacheService.get_version(self.user.id), version)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("manage_expense_partitions", "--ahead=0", stdout=out)
+        self.assertIn("Expense partitions are up to date.", out.getvalue())
+
+        interval = settings.EXPENSES_PARTITION_INTERVAL
+        today = timezone.localdate()
+        start, _ = ExpensesPartitionService.get_interval_bounds(today, interval)
+        self.assertIn(
+            ExpensesPartitionService.get_partition_name(start, interval),
+            self.get_partition_names(),
+        )
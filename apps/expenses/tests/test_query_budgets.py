@@ -0,0 +1,184 @@
+from uuid import uuid4
+from datetime import date, timedelta
+
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from base.testing import QueryBudgetTestMixin
+from users.models import User
+from users.selectors.user import _local_users
+from expenses.models import Expenses
+
+
+class ExpensesQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        """
+        Create a user with 30 expenses, enough for an N+1 query in the list
+        to exceed its budget, and warm the user cache as in the steady state.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        self.expenses = Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f"Expense {day}",
+                amount=10,
+                date=date(2024, 11, 1) + timedelta(days=day),
+                category="food",
+            )
+            for day in range(30)
+        )
+        self.client = APIClient()
+        self.item = {
+            "user": str(self.user.id),
+            "title": "Dinner",
+            "amount": 30,
+            "date": "2024-11-02",
+            "category": "food",
+        }
+        self.client.post("/api/", self.item, format="json")
+
+    def test_reads(self):
+        user_id = str(self.user.id)
+        for params in (
+            {"user_id": user_id},
+            {"user_id": user_id, "pagination": "cursor"},
+            {"summary": 1, "user_id": user_id, "year": 2024, "month": 11},
+            {
+                "summary": 1,
+                "user_id": user_id,
+                "start_date": "2024-11-03",
+                "end_date": "2024-11-20",
+            },
+            {"user_id": user_id, "_": "uncached"},
+        ):
+            with self.subTest(params=params):
+                self.assertWithinQueryBudget(self.client.get("/api/", params))
+
+        self.assertWithinQueryBudget(self.client.get(f"/api/{self.expenses[0].id}/"))
+        self.assertWithinQueryBudget(
+            self.client.get("/api/export/", {"user_id": user_id})
+        )
+        self.assertWithinQueryBudget(
+            self.client.post(
+                "/api/summaries/",
+                {"user_ids": [user_id], "year": 2024, "month": 11},
+                format="json",
+            )
+        )
+        self.assertWithinQueryBudget(
+            self.client.get("/api/totals/", {"user_id": user_id})
+        )
+        changes = self.client.get("/api/changes/", {"user_id": user_id})
+        self.assertWithinQueryBudget(changes)
+        self.assertWithinQueryBudget(
+            self.client.get(
+                "/api/changes/", {"user_id": user_id, "since": changes.data["token"]}
+            )
+        )
+        self.assertWithinQueryBudget(
+            self.client.get(
+                "/api/aggregate/",
+                {
+                    "user_id": user_id,
+                    "start_date": "2024-11-01",
+                    "end_date": "2024-11-30",
+                    "group_by": "day,category",
+                },
+            )
+        )
+
+    def test_writes(self):
+        expense_url = f"/api/{self.expenses[0].id}/"
+        for response in (
+            self.client.post("/api/", self.item, format="json"),
+            self.client.put(expense_url, self.item, format="json"),
+            self.client.patch(expense_url, {"amount": 20}, format="json"),
+            self.client.delete(expense_url),
+        ):
+            with self.subTest(endpoint=response.metrics.endpoint):
+                self.assertLess(response.status_code, 400)
+                self.assertWithinQueryBudget(response)
+
+    def test_cold_cache(self):
+        """
+        Test the actions stay within budget with nothing cached (e.g. after a
+        restart), writing to a month and category without rollup rows yet.
+        """
+        user_id = str(self.user.id)
+        expense_url = f"/api/{self.expenses[0].id}/"
+        new_month = {**self.item, "date": "2025-03-01", "category": "travel"}
+        requests = (
+            lambda: self.client.post("/api/", new_month, format="json"),
+            lambda: self.client.put(
+                expense_url,
+                {**new_month, "date": "2025-04-01", "category": "utilities"},
+                format="json",
+            ),
+            lambda: self.client.patch(
+                expense_url, {"date": "2025-05-01", "category": "food"}, format="json"
+            ),
+            lambda: self.client.get("/api/", {"user_id": user_id}),
+            lambda: self.client.get(
+                "/api/", {"summary": 1, "user_id": user_id, "year": 2024, "month": 11}
+            ),
+            lambda: self.client.get("/api/totals/", {"user_id": user_id}),
+            lambda: self.client.get("/api/changes/", {"user_id": user_id}),
+            lambda: self.client.get("/api/export/", {"user_id": user_id}),
+            lambda: self.client.delete(expense_url),
+        )
+        for request in requests:
+            caches["default"].clear()
+            _local_users.clear()
+            response = request()
+            with self.subTest(endpoint=response.metrics.endpoint):
+                self.assertLess(response.status_code, 400)
+                self.assertWithinQueryBudget(response)
+
+    def test_bulk(self):
+        ids = [str(expense.id) for expense in self.expenses[1:21]]
+        for response in (
+            self.client.post("/api/bulk/", [self.item] * 20, format="json"),
+            self.client.patch(
+                "/api/bulk/",
+                [{"id": expense_id, "amount": 5} for expense_id in ids],
+                format="json",
+            ),
+            self.client.delete("/api/bulk/", {"ids": ids}, format="json"),
+        ):
+            with self.subTest(method=response.request["REQUEST_METHOD"]):
+                self.assertLess(response.status_code, 400)
+                self.assertWithinQueryBudget(response)
+
+    def test_budgets(self):
+        """
+        Test the budget endpoints, and an expense write with a budget, with
+        nothing cached.
+        """
+        user_id = str(self.user.id)
+        budget = {"user": user_id, "category": "food", "amount": 100}
+        budget_url = "/api/budgets/{}/".format
+        requests = (
+            lambda: self.client.post("/api/budgets/", budget, format="json"),
+            lambda: self.client.get("/api/budgets/", {"user_id": user_id}),
+            lambda: self.client.get(budget_url(self.budget_id)),
+            lambda: self.client.put(
+                budget_url(self.budget_id), {**budget, "amount": 150}, format="json"
+            ),
+            lambda: self.client.patch(
+                budget_url(self.budget_id), {"amount": 200}, format="json"
+            ),
+            lambda: self.client.post("/api/", self.item, format="json"),
+            lambda: self.client.delete(budget_url(self.budget_id)),
+        )
+        for request in requests:
+            caches["default"].clear()
+            _local_users.clear()
+            response = request()
+            with self.subTest(endpoint=response.metrics.endpoint):
+                self.assertLess(response.status_code, 400)
+                self.assertWithinQueryBudget(response)
+            if response.metrics.endpoint == "ExpensesBudgetViewSet.create":
+                self.budget_id = response.data["id"]
@@ -0,0 +1,138 @@
+from uuid import uuid4
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from expenses.models import SYNC_EPOCH, Expenses
+from expenses.filters import ExpensesFilter
+from expenses.selectors.expenses import ExpensesSelector
+from expenses.services.partitions import ExpensesPartitionService
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are PostgreSQL-specific")
+class ExpensesQueryPlanTest(TestCase):
+    """
+    Guards the indexes declared on `Expenses.Meta` and the pruning of the
+    monthly partitions of the expenses table.
+
+    The test tables are tiny, so sequential scans are disabled for the
+    transaction: the planner then picks an index whenever one can serve the
+    query, and a plan that still contains a sequential scan means the query
+    shape can no longer use any index.
+    """
+
+    def setUp(self):
+        """
+        Create twenty users with two months of daily expenses each, so that
+        both the user and the date predicates are selective.
+        """
+        ExpensesPartitionService.ensure_partitions(
+            date(2024, 10, 1), date(2024, 12, 1), "month"
+        )
+        users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(20)
+        )
+        self.user = users[0]
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=user,
+                title=f"Expense {day}",
+                amount=day * 10,
+                date=date(2024, month, day),
+                category="food" if day % 2 else "travel",
+            )
+            for user in users
+            for month in (10, 11)
+            for day in range(1, 29)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE expenses")
+            cursor.execute("ANALYZE expenses_monthly_rollup")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name, pruned=()):
+        """
+        Assert that the plan reads `index_name` without any sequential scan
+        and never touches the `pruned` partitions.
+        """
+        plan = queryset.explain()
+        self.assertNotIn("Seq Scan on expenses", plan, plan)
+        self.assertIn(index_name, plan, plan)
+        for partition in pruned:
+            self.assertNotIn(partition, plan, plan)
+
+    def test_list_expenses_by_user(self):
+        queryset = ExpensesSelector.list_expenses_by_user(user_id=self.user.id)
+        self.assertUsesIndex(queryset, "expenses_y2024m10_user_date_idx")
+        self.assertUsesIndex(queryset, "expenses_y2024m11_user_date_idx")
+
+    def test_list_expenses_by_date_range(self):
+        self.assertUsesIndex(
+            ExpensesSelector.list_expenses_by_date_range(
+                user_id=self.user.id, start_date="2024-11-01", end_date="2024-11-30"
+            ),
+            "expenses_y2024m11_user_date_idx",
+            pruned=["expenses_y2024m10", "expenses_default"],
+        )
+
+    def test_get_category_summary(self):
+        queryset = ExpensesSelector.get_category_summary(
+            user_id=self.user.id,
+            start_date=date(2024, 11, 5),
+            end_date=date(2024, 11, 20),
+        )
+        self.assertUsesIndex(
+            queryset,
+            "expenses_y2024m11_user_date_idx",
+            pruned=["expenses_y2024m10", "expenses_default"],
+        )
+        self.assertRegex(queryset.explain(), r"Index Cond: .*\(date >= ")
+
+    def test_get_changes(self):
+        for since in (SYNC_EPOCH, timezone.now()):
+            with self.subTest(since=since):
+                queryset = Expenses.objects.filter(
+                    user_id=self.user.id, updated_at__gt=since
+                ).order_by("updated_at", "id")
+                self.assertUsesIndex(
+                    queryset, "expenses_y2024m11_user_id_updated_at_id_idx"
+                )
+
+    def test_get_monthly_category_summary(self):
+        self.assertUsesIndex(
+            ExpensesSelector.get_monthly_category_summary(
+                user_id=self.user.id, year=2024, month=11
+            ),
+            "expenses_monthly_rollup_unique",
+        )
+
+    def test_filter_by_user_and_date_range(self):
+        queryset = ExpensesFilter(
+            {
+                "user_id": str(self.user.id),
+                "start_date": "2024-11-01",
+                "end_date": "2024-11-30",
+            },
+            queryset=Expenses.objects.all(),
+        ).qs
+        self.assertUsesIndex(
+            queryset,
+            "expenses_y2024m11_user_date_idx",
+            pruned=["expenses_y2024m10", "expenses_default"],
+        )
+
+    def test_filter_by_date_range(self):
+        queryset = ExpensesFilter(
+            {"start_date": "2024-11-01", "end_date": "2024-11-30"},
+            queryset=Expenses.objects.all(),
+        ).qs
+        self.assertUsesIndex(
+            queryset,
+            "expenses_y2024m11_date_idx",
+            pruned=["expenses_y2024m10", "expenses_default"],
+        )
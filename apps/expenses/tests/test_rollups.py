@@ -0,0 +1,262 @@
+from io import StringIO
+from uuid import uuid4
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from expenses.models import Expenses, ExpensesMonthlyRollup, ExpensesTotal
+from expenses.selectors.expenses import ExpensesSelector
+from expenses.services.rollups import ExpensesRollupService
+
+
+class ExpensesMonthlyRollupTest(TestCase):
+    def setUp(self):
+        """
+        Create a test user with a single November food expense.
+        """
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+        self.expense = Expenses.objects.create(
+            user=self.user,
+            title="Groceries",
+            amount=50,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+
+    def get_rollups(self):
+        return {
+            (rollup.year, rollup.month, rollup.category): (
+                rollup.total_amount,
+                rollup.count,
+            )
+            for rollup in ExpensesMonthlyRollup.objects.filter(user=self.user)
+        }
+
+    def test_create_adds_to_rollup(self):
+        Expenses.objects.create(
+            user=self.user,
+            title="Dinner",
+            amount=30,
+            date=date(2024, 11, 20),
+            category="food",
+        )
+        self.assertEqual(self.get_rollups(), {(2024, 11, "food"): (80, 2)})
+
+    def test_update_amount(self):
+        self.expense.amount = 70
+        self.expense.save()
+        self.assertEqual(self.get_rollups(), {(2024, 11, "food"): (70, 1)})
+
+    def test_update_moves_between_months_and_categories(self):
+        expense = Expenses.objects.get(pk=self.expense.pk)
+        expense.date = date(2024, 12, 3)
+        expense.category = "travel"
+        expense.save()
+        self.assertEqual(
+            self.get_rollups(),
+            {(2024, 11, "food"): (0, 0), (2024, 12, "travel"): (50, 1)},
+        )
+
+    def test_update_of_deferred_instance(self):
+        expense = Expenses.objects.only("id", "title").get(pk=self.expense.pk)
+        expense.category = "travel"
+        expense.save()
+        self.assertEqual(
+            self.get_rollups(),
+            {(2024, 11, "food"): (0, 0), (2024, 11, "travel"): (50, 1)},
+        )
+
+    def test_delete_removes_from_rollup(self):
+        self.expense.delete()
+        self.assertEqual(self.get_rollups(), {(2024, 11, "food"): (0, 0)})
+
+    def test_bulk_create_adds_to_rollup(self):
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f"Trip {day}",
+                amount=10,
+                date=date(2024, 11, day),
+                category="travel",
+            )
+            for day in range(1, 4)
+        )
+        self.assertEqual(
+            self.get_rollups(),
+            {(2024, 11, "food"): (50, 1), (2024, 11, "travel"): (30, 3)},
+        )
+
+    def test_user_delete_cascades(self):
+        self.user.delete()
+        self.assertFalse(ExpensesMonthlyRollup.objects.exists())
+
+    def test_summary_reads_rollups(self):
+        Expenses.objects.create(
+            user=self.user,
+            title="Trip",
+            amount=200,
+            date=date(2025, 1, 10),
+            category="travel",
+        )
+        with self.assertNumQueries(1):
+            summary = list(
+                ExpensesSelector.get_category_summary(
+                    user_id=self.user.id,
+                    start_date=date(2024, 11, 1),
+                    end_date=date(2025, 2, 1),
+                )
+            )
+        self.assertEqual(
+            summary,
+            [
+                {"category": "food", "total_amount": 50},
+                {"category": "travel", "total_amount": 200},
+            ],
+        )
+
+    def test_summary_skips_emptied_rollups(self):
+        self.expense.delete()
+        summary = ExpensesSelector.get_monthly_category_summary(
+            user_id=self.user.id, year=2024, month=11
+        )
+        self.assertEqual(list(summary), [])
+
+    def test_verify_and_rebuild(self):
+        ExpensesMonthlyRollup.objects.filter(user=self.user).update(total_amount=1)
+        self.assertEqual(
+            ExpensesRollupService.verify(),
+            {(self.user.id, 2024, 11, "food"): ((1, 1), (50, 1))},
+        )
+
+        ExpensesRollupService.rebuild()
+        self.assertEqual(ExpensesRollupService.verify(), {})
+        self.assertEqual(self.get_rollups(), {(2024, 11, "food"): (50, 1)})
+
+
+class ExpensesTotalTest(TestCase):
+    def setUp(self):
+        """
+        Create a test user with a food expense in November and December.
+        """
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+        self.expenses = [
+            Expenses.objects.create(
+                user=self.user,
+                title="Groceries",
+                amount=amount,
+                date=date(2024, month, 1),
+                category="food",
+            )
+            for month, amount in ((11, 50), (12, 20))
+        ]
+
+    def get_totals(self):
+        return {
+            total.category: (total.total_amount, total.count)
+            for total in ExpensesTotal.objects.filter(user=self.user)
+        }
+
+    def test_create_adds_to_total(self):
+        self.assertEqual(self.get_totals(), {"food": (70, 2)})
+
+    def test_update_amount_and_category(self):
+        expense = self.expenses[0]
+        expense.amount = 80
+        expense.category = "travel"
+        expense.save()
+        self.assertEqual(self.get_totals(), {"food": (20, 1), "travel": (80, 1)})
+
+    def test_date_change_keeps_total(self):
+        expense = self.expenses[0]
+        expense.date = date(2025, 3, 1)
+        with CaptureQueriesContext(connection) as queries:
+            expense.save()
+        self.assertFalse(
+            [query for query in queries if "expenses_total" in query["sql"]]
+        )
+        self.assertEqual(self.get_totals(), {"food": (70, 2)})
+
+    def test_delete_and_bulk_delete(self):
+        self.expenses[0].delete()
+        self.assertEqual(self.get_totals(), {"food": (20, 1)})
+        Expenses.objects.all().delete()
+        self.assertEqual(self.get_totals(), {"food": (0, 0)})
+
+    def test_running_totals(self):
+        with self.assertNumQueries(2):
+            totals = ExpensesSelector.get_running_totals(
+                self.user.id, date(2024, 12, 5)
+            )
+        self.assertEqual(
+            totals,
+            {
+                "to_date": [{"category": "food", "total_amount": 70, "count": 2}],
+                "this_month": [{"category": "food", "total_amount": 20, "count": 1}],
+            },
+        )
+
+    def test_verify_and_rebuild(self):
+        ExpensesTotal.objects.update(total_amount=1)
+        self.assertEqual(
+            ExpensesRollupService.verify_totals(),
+            {(self.user.id, "food"): ((1, 2), (70, 2))},
+        )
+
+        ExpensesRollupService.rebuild_totals()
+        self.assertEqual(ExpensesRollupService.verify_totals(), {})
+
+
+class RebuildExpenseRollupsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+        Expenses.objects.create(
+            user=self.user,
+            title="Groceries",
+            amount=50,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+
+    def test_verify_reports_drift(self):
+        ExpensesMonthlyRollup.objects.all().delete()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_expense_rollups", "--verify", stdout=out)
+        self.assertIn("stored=None expected=(50, 1)", out.getvalue())
+
+    def test_rebuild(self):
+        ExpensesMonthlyRollup.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_expense_rollups", stdout=out)
+        self.assertIn("Rebuilt 1 monthly rollup rows.", out.getvalue())
+        self.assertIn("Rebuilt 1 running total rows.", out.getvalue())
+        call_command("rebuild_expense_rollups", "--verify", stdout=out)
+        self.assertIn("Monthly rollups are in sync.", out.getvalue())
+        self.assertIn("Running totals are in sync.", out.getvalue())
+
+    def test_verify_reports_total_drift(self):
+        ExpensesTotal.objects.all().delete()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_expense_rollups", "--verify", stdout=out)
+        self.assertIn(
+            f"{self.user.id} to date food: stored=None expected=(50, 1)",
+            out.getvalue(),
+        )
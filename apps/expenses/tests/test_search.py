@@ -0,0 +1,131 @@
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses
+from expenses.selectors import expenses as expenses_selectors
+from expenses.selectors.expenses import ExpensesSelector
+
+
+class ExpensesSearchTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with expenses titled after coffee shops and hotels.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        for user in self.users:
+            Expenses.objects.bulk_create(
+                Expenses(
+                    user=user,
+                    title=title,
+                    amount=10,
+                    date=date(2024, 11, day),
+                    category="food",
+                )
+                for day, title in (
+                    (1, "Coffee at the station"),
+                    (2, "Coffee and coffee beans"),
+                    (3, "Hotel breakfast"),
+                    (4, "Iced coffees"),
+                )
+            )
+        self.client = APIClient()
+
+    def search(self, **params):
+        response = self.client.get("/api/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["title"] for row in response.data["results"]]
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+    def test_ranked_full_text_search(self):
+        """
+        Test titles matching the stemmed query come back best match first,
+        then by most recent date.
+        """
+        titles = self.search(search="coffee", user_id=str(self.users[0].id))
+        self.assertEqual(
+            titles,
+            ["Coffee and coffee beans", "Iced coffees", "Coffee at the station"],
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+    def test_search_is_combined_with_filters(self):
+        titles = self.search(
+            search="coffee -beans",
+            user_id=str(self.users[1].id),
+            start_date="2024-11-01",
+            end_date="2024-11-03",
+        )
+        self.assertEqual(titles, ["Coffee at the station"])
+
+    @skipUnless(connection.vendor == "postgresql", "Fuzzy search needs PostgreSQL")
+    def test_fuzzy_search(self):
+        if not ExpensesSelector.has_trigram_search(connection.alias):
+            self.skipTest("pg_trgm is not installed.")
+        titles = self.search(search="hotl", user_id=str(self.users[0].id))
+        self.assertEqual(titles, ["Hotel breakfast"])
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+    async def test_async_search(self):
+        """
+        Test the async list searches without a synchronous query, even before
+        `pg_trgm` was looked up, and keeps the rank order.
+        """
+        with patch.dict(expenses_selectors._trigram_databases, clear=True):
+            response = await AsyncClient().get(
+                "/api/async/", {"search": "coffee", "user_id": str(self.users[0].id)}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["title"] for row in response.json()["results"]],
+            ["Coffee and coffee beans", "Iced coffees", "Coffee at the station"],
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+    def test_search_keeps_rank_order_across_pages(self):
+        """
+        Test ranked results are page-number paginated, and refused with a
+        cursor, whose `(date, id)` order would replace the rank.
+        """
+        user_id = str(self.users[0].id)
+        with patch.object(PageNumberPagination, "page_size", 2):
+            titles = self.search(search="coffee", user_id=user_id)
+            titles += self.search(search="coffee", user_id=user_id, page=2)
+        self.assertEqual(
+            titles,
+            ["Coffee and coffee beans", "Iced coffees", "Coffee at the station"],
+        )
+
+        for params in ({"pagination": "cursor"}, {"cursor": "x"}):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    "/api/", {"search": "coffee", "user_id": user_id, **params}
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("search", response.data)
+
+    def test_fallback(self):
+        """
+        Test backends without full-text search fall back to a substring match.
+        """
+        queryset = Expenses.objects.filter(user=self.users[0])
+        with patch.object(connection, "vendor", "sqlite"):
+            titles = ExpensesSelector.search(queryset, "COFFEE").values_list(
+                "title", flat=True
+            )
+            self.assertEqual(
+                sorted(titles),
+                ["Coffee and coffee beans", "Coffee at the station", "Iced coffees"],
+            )
@@ -83,7 +83,9 @@ class ExpensesSelectorTest(TestCase):
         - The total amount for the "Food" category is 50.00.
         - The total amount for the "Travel" category is 20.00.
         """
-        summary = ExpensesSelector.get_category_summary(user_id=self.user.id, month=11)
+        summary = ExpensesSelector.get_monthly_category_summary(
+            user_id=self.user.id, year=2024, month=11
+        )
         self.assertEqual(len(summary), 2)
         food_summary = next((s for s in summary if s["category"] == "Food"), None)
         travel_summary = next((s for s in summary if s["category"] == "Travel"), None)
@@ -92,3 +94,149 @@ class ExpensesSelectorTest(TestCase):
         self.assertIsNotNone(travel_summary)
         self.assertEqual(food_summary["total_amount"], 50.00)
         self.assertEqual(travel_summary["total_amount"], 20.00)
+
+    def test_get_category_summary_ignores_other_years(self):
+        """
+        Tests that the monthly summary only includes the requested year.
+        """
+        Expenses.objects.create(
+            user=self.user,
+            title="Old groceries",
+            amount=70.00,
+            date=date(2023, 11, 10),
+            category="Food",
+        )
+        summary = ExpensesSelector.get_monthly_category_summary(
+            user_id=self.user.id, year=2024, month=11
+        )
+        food_summary = next(s for s in summary if s["category"] == "Food")
+        self.assertEqual(food_summary["total_amount"], 50.00)
+
+    def test_get_category_summary_for_date_range(self):
+        """
+        Tests that get_category_summary treats the end date as exclusive and
+        can span several months.
+        """
+        summary = ExpensesSelector.get_category_summary(
+            user_id=self.user.id,
+            start_date=date(2024, 10, 30),
+            end_date=date(2024, 11, 15),
+        )
+        self.assertEqual(
+            list(summary),
+            [
+                {"category": "Food", "total_amount": 50},
+                {"category": "Utilities", "total_amount": 100},
+            ],
+        )
+
+    def test_get_category_summaries(self):
+        other_user = User.objects.create(
+            id=uuid4(), username="otheruser", email="otheruser@example.com"
+        )
+        Expenses.objects.create(
+            user=other_user,
+            title="Hotel",
+            amount=80,
+            date=date(2024, 11, 2),
+            category="Travel",
+        )
+        for start_date, end_date in (
+            (date(2024, 11, 1), date(2024, 12, 1)),
+            (date(2024, 11, 1), date(2024, 11, 20)),
+        ):
+            with self.subTest(end_date=end_date):
+                summaries = ExpensesSelector.get_category_summaries(
+                    [self.user.id, other_user.id], start_date, end_date
+                )
+                self.assertEqual(
+                    summaries,
+                    {
+                        self.user.id: [
+                            {"category": "Food", "total_amount": 50},
+                            {"category": "Travel", "total_amount": 20},
+                        ],
+                        other_user.id: [{"category": "Travel", "total_amount": 80}],
+                    },
+                )
+
+    def test_get_month_range(self):
+        """
+        Tests that get_month_range rolls December over into the next year.
+        """
+        self.assertEqual(
+            ExpensesSelector.get_month_range(2024, 12),
+            (date(2024, 12, 1), date(2025, 1, 1)),
+        )
+
+    def test_get_aggregates(self):
+        rows = ExpensesSelector.get_aggregates(
+            date(2024, 10, 1),
+            date(2024, 11, 20),
+            group_by=["month", "category"],
+            metrics=["sum", "count", "avg"],
+        )
+        self.assertEqual(
+            [(row["month"], row["category"], row["sum"], row["count"]) for row in rows],
+            [
+                (date(2024, 10, 1), "Utilities", 100, 1),
+                (date(2024, 11, 1), "Food", 50, 1),
+                (date(2024, 11, 1), "Travel", 20, 1),
+            ],
+        )
+        self.assertEqual(rows[0]["avg"], 100)
+
+    def test_get_aggregates_from_rollups_matches_expenses_table(self):
+        """
+        Test whole-month periods read from the rollups give the same groups
+        as other periods aggregated from the expenses table.
+        """
+        Expenses.objects.create(
+            user=self.user,
+            title="Dinner",
+            amount=25,
+            date=date(2024, 11, 30),
+            category="Food",
+        )
+        for group_by in (["month", "category"], ["year", "user"], ["category"]):
+            with self.subTest(group_by=group_by):
+                rollups = ExpensesSelector.get_aggregates(
+                    date(2024, 10, 1),
+                    date(2024, 12, 1),
+                    group_by=group_by,
+                    metrics=["sum", "count", "avg"],
+                )
+                # Same expenses, but a period that is not made of whole months.
+                expenses = ExpensesSelector.get_aggregates(
+                    date(2024, 10, 1),
+                    date(2024, 12, 2),
+                    group_by=group_by,
+                    metrics=["sum", "count", "avg"],
+                    user_id=self.user.id,
+                )
+                self.assertEqual(rollups, expenses)
+
+    async def test_async_variants(self):
+        """
+        Tests that the async selectors return the same rows as their sync
+        counterparts.
+        """
+        expenses = await ExpensesSelector.alist_expenses_by_date_range(
+            user_id=self.user.id, start_date="2024-11-01", end_date="2024-11-30"
+        )
+        self.assertEqual(
+            {expense.id for expense in expenses}, {self.expense1.id, self.expense2.id}
+        )
+        self.assertEqual(
+            len(await ExpensesSelector.alist_expenses_by_user(user_id=self.user.id)),
+            3,
+        )
+        self.assertEqual(
+            await ExpensesSelector.aget_monthly_category_summary(
+                user_id=self.user.id, year=2024, month=11
+            ),
+            [
+                {"category": "Food", "total_amount": 50},
+                {"category": "Travel", "total_amount": 20},
+            ],
+        )
@@ -0,0 +1,244 @@
+import base64
+from datetime import date, timedelta
+from io import StringIO
+from uuid import uuid4
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from expenses.models import Expenses, ExpensesTombstone
+from expenses.services.importer import ExpensesImportService
+
+
+@override_settings(EXPENSES_SYNC_OVERLAP=0)
+class ExpensesChangesViewSetTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with five expenses, another user with one, and an
+        APIClient instance.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        self.other = User.objects.create(
+            id=uuid4(), username="other", email="other@example.com"
+        )
+        self.expenses = Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f"Expense {day}",
+                amount=day,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for day in range(1, 6)
+        )
+        Expenses.objects.create(
+            user=self.other,
+            title="Other",
+            amount=1,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+        self.client = APIClient()
+
+    def sync(self, since=None, **params):
+        params = {"user_id": str(self.user.id), **params}
+        if since is not None:
+            params["since"] = since
+        response = self.client.get("/api/changes/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def sync_all(self, since=None, **params):
+        """
+        Follow `has_more` to the end and return the updated and deleted IDs
+        and the final token.
+        """
+        updated, deleted = [], []
+        while True:
+            data = self.sync(since, **params)
+            updated += [row["id"] for row in data["updated"]]
+            deleted += data["deleted"]
+            since = data["token"]
+            if not data["has_more"]:
+                return updated, deleted, since
+
+    def test_full_sync(self):
+        """
+        Test a sync without a token returns every expense of the user once,
+        page by page, in the list representation.
+        """
+        first = self.sync(page_size=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["updated"]), 2)
+        self.assertEqual(
+            set(first["updated"][0]),
+            {"id", "user", "title", "amount", "date", "category"},
+        )
+
+        updated, deleted, _ = self.sync_all(page_size=2)
+        self.assertCountEqual(updated, [str(expense.id) for expense in self.expenses])
+        self.assertEqual(deleted, [])
+
+    def test_incremental_sync(self):
+        """
+        Test a token only brings the expenses written and deleted after it,
+        through every write path.
+        """
+        *_, token = self.sync_all()
+        self.assertEqual(self.sync(token)["updated"], [])
+
+        saved, bulk_updated, updated, deleted, bulk_deleted = self.expenses
+        deleted_ids = [str(deleted.id), str(bulk_deleted.id)]
+        saved.title = "Renamed"
+        saved.save()
+        bulk_updated.amount = 50
+        Expenses.objects.bulk_update([bulk_updated], ["amount"])
+        Expenses.objects.filter(pk=updated.pk).update(category="travel")
+        deleted.delete()
+        Expenses.objects.filter(pk=bulk_deleted.pk).delete()
+        created = Expenses.objects.create(
+            user=self.user,
+            title="New",
+            amount=7,
+            date=date(2020, 1, 1),
+            category="food",
+        )
+        Expenses.objects.filter(user=self.other).update(title="Not mine")
+
+        changed, removed, token = self.sync_all(token, page_size=2)
+
+        self.assertCountEqual(
+            changed,
+            [str(expense.id) for expense in (saved, bulk_updated, updated, created)],
+        )
+        self.assertCountEqual(removed, deleted_ids)
+        data = self.sync(token)
+        self.assertEqual((data["updated"], data["deleted"]), ([], []))
+
+    def test_moved_expenses_are_synced(self):
+        """
+        Test moving expenses to another user, through every write path,
+        reports them as deleted to the previous user and as updated to the
+        new one.
+        """
+        *_, token = self.sync_all()
+        *_, other_token = self.sync_all(user_id=str(self.other.id))
+
+        patched, bulk_updated, updated, *_ = self.expenses
+        response = self.client.patch(
+            f"/api/{patched.id}/", {"user": str(self.other.id)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        bulk_updated.user = self.other
+        Expenses.objects.bulk_update([bulk_updated], ["user"])
+        Expenses.objects.filter(pk__in=[updated.pk, self.expenses[3].pk]).update(
+            user=self.other, title="Moved"
+        )
+        self.expenses[3].refresh_from_db()
+        self.expenses[3].save()
+        moved_ids = [
+            str(expense.id)
+            for expense in (patched, bulk_updated, updated, self.expenses[3])
+        ]
+
+        changed, removed, _ = self.sync_all(token, page_size=2)
+        self.assertEqual(changed, [])
+        self.assertCountEqual(removed, moved_ids)
+        changed, removed, _ = self.sync_all(other_token, user_id=str(self.other.id))
+        self.assertCountEqual(changed, moved_ids)
+        self.assertEqual(removed, [])
+
+    def test_import_is_synced(self):
+        *_, token = self.sync_all()
+        lines = StringIO(
+            "user,title,amount,date,category\n"
+            f"{self.user.id},Imported,12,2024-01-05,food\n"
+        )
+        ExpensesImportService.import_expenses(lines, "csv")
+
+        self.assertEqual(
+            [row["title"] for row in self.sync(token)["updated"]], ["Imported"]
+        )
+
+    def test_overlap(self):
+        """
+        Test an up-to-date token points the overlap back, so recent changes
+        are returned again rather than missed.
+        """
+        with override_settings(EXPENSES_SYNC_OVERLAP=3600):
+            *_, token = self.sync_all()
+            self.assertEqual(len(self.sync(token)["updated"]), len(self.expenses))
+
+    def test_invalid_token(self):
+        expired = base64.urlsafe_b64encode(
+            f"{(timezone.now() - timedelta(days=365)).isoformat()}||".encode()
+        ).decode()
+        for since, message in (
+            ("not-a-token", "Invalid sync token."),
+            (base64.urlsafe_b64encode(b"2024-01-01||").decode(), "Invalid sync token."),
+            (expired, "expired"),
+        ):
+            with self.subTest(since=since):
+                response = self.client.get(
+                    "/api/changes/", {"user_id": str(self.user.id), "since": since}
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(message, str(response.data["since"]))
+
+        response = self.client.get("/api/changes/", {"user_id": str(uuid4())})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpensesTombstoneTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="testuser", email="t@example.com")
+        self.expenses = Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title="Expense",
+                amount=1,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for day in range(1, 4)
+        )
+
+    def test_queryset_delete_batches_tombstones(self):
+        with CaptureQueriesContext(connection) as queries:
+            Expenses.objects.filter(user=self.user).delete()
+
+        inserts = [
+            query
+            for query in queries
+            if query["sql"].startswith('INSERT INTO "expenses_tombstone"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertCountEqual(
+            ExpensesTombstone.objects.values_list("expense_id", flat=True),
+            [expense.id for expense in self.expenses],
+        )
+
+    def test_purge(self):
+        kept_id = self.expenses[1].id
+        self.expenses[0].delete()
+        ExpensesTombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=365)
+        )
+        self.expenses[1].delete()
+        stdout = StringIO()
+
+        call_command("purge_expense_tombstones", stdout=stdout)
+
+        self.assertIn("Purged 1 tombstones.", stdout.getvalue())
+        self.assertEqual(
+            list(ExpensesTombstone.objects.values_list("expense_id", flat=True)),
+            [kept_id],
+        )
@@ -1,12 +1,24 @@
-from uuid import uuid4
+from uuid import uuid1, uuid4
 from datetime import date
+from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 from users.models import User
+from users.selectors.user import UserSelector
 from expenses.models import Expenses
+from expenses.api.serializers import (
+    ExpensesAggregateSerializer,
+    ExpensesSerializer,
+    ExpensesValuesSerializer,
+)
 
 
 class ExpensesViewSetTest(TestCase):
@@ -112,3 +124,779 @@ class ExpensesViewSetTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("month", response.data)
+
+    def test_list_summary(self):
+        """
+        Test the `?summary=1` branch of the list endpoint returns per-category
+        totals for the requested year and month only.
+        """
+        Expenses.objects.create(
+            user=self.user,
+            title="Old groceries",
+            amount=70.00,
+            date=date(2023, 11, 1),
+            category="Food",
+        )
+        response = self.client.get(
+            "/api/",
+            {"summary": 1, "user_id": str(self.user.id), "year": 2024, "month": 11},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{"category": "Food", "total_amount": "50.00"}])
+
+    def test_list_summary_for_date_range(self):
+        """
+        Test the summary accepts an inclusive `start_date`/`end_date` period.
+        """
+        response = self.client.get(
+            "/api/",
+            {
+                "summary": 1,
+                "user_id": str(self.user.id),
+                "start_date": "2024-11-01",
+                "end_date": "2024-11-01",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["total_amount"], "50.00")
+
+    def test_list_summary_for_uuid7_user(self):
+        """
+        Test the summary accepts the time-ordered UUID7 IDs generated by
+        default, and still rejects other UUID versions.
+        """
+        user = User.objects.create(username="v7user", email="v7user@example.com")
+        self.assertEqual(user.id.version, 7)
+
+        response = self.client.get(
+            "/api/",
+            {"summary": 1, "user_id": str(user.id), "year": 2024, "month": 11},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            "/api/",
+            {"summary": 1, "user_id": str(uuid1()), "year": 2024, "month": 11},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_summary_requires_period(self):
+        """
+        Test the summary returns 400 when no month or date range is given.
+        """
+        response = self.client.get(
+            "/api/", {"summary": 1, "user_id": str(self.user.id)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_list_summary_out_of_range(self):
+        """
+        Test the summary returns 400 for periods ending after the last
+        representable date.
+        """
+        for params, field in (
+            ({"year": 9999, "month": 12}, "year"),
+            ({"start_date": "9999-12-01", "end_date": "9999-12-31"}, "end_date"),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    "/api/", {"summary": 1, "user_id": str(self.user.id), **params}
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(field, response.data)
+
+
+class ExpensesBulkViewSetTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with one expense each and an APIClient instance.
+        """
+        self.users = [
+            User.objects.create(
+                id=uuid4(), username=f"user{i}", email=f"user{i}@example.com"
+            )
+            for i in range(2)
+        ]
+        self.expenses = [
+            Expenses.objects.create(
+                user=user,
+                title="Groceries",
+                amount=50,
+                date=date(2024, 11, 1),
+                category="food",
+            )
+            for user in self.users
+        ]
+        self.client = APIClient()
+
+    def get_items(self, count):
+        return [
+            {
+                "user": str(self.users[i % 2].id),
+                "title": f"Item {i}",
+                "amount": 10 + i,
+                "date": "2024-11-05",
+                "category": "food",
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        """
+        Test a batch is created with a number of queries that does not depend
+        on its size, and returned in request order.
+        """
+        # Warm the user cache so both batches run in the steady state.
+        self.client.post("/api/bulk/", self.get_items(2), format="json")
+        with CaptureQueriesContext(connection) as small_batch:
+            self.client.post("/api/bulk/", self.get_items(5), format="json")
+        with CaptureQueriesContext(connection) as large_batch:
+            response = self.client.post("/api/bulk/", self.get_items(50), format="json")
+
+        self.assertEqual(len(large_batch), len(small_batch))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(response.data[3]["title"], "Item 3")
+        self.assertEqual(response.data[3]["user"], str(self.users[1].id))
+        self.assertEqual(Expenses.objects.count(), 59)
+
+    def test_create_uses_cached_user(self):
+        """
+        Test creating an expense for a known user does not query the users
+        table once the user is cached.
+        """
+        item = self.get_items(1)[0]
+        self.client.post("/api/", item, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/", item, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(any('"users"' in query["sql"] for query in queries))
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """
+        Test invalid items are reported by position and nothing is written.
+        """
+        items = self.get_items(3)
+        items[1]["user"] = str(uuid4())
+        response = self.client.post("/api/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("user", response.data[1])
+        self.assertEqual(Expenses.objects.count(), 2)
+
+    def test_bulk_update(self):
+        """
+        Test a batch of partial updates is applied and moves the rollups.
+        """
+        response = self.client.patch(
+            "/api/bulk/",
+            [
+                {"id": str(self.expenses[0].id), "amount": 70},
+                {"id": str(self.expenses[1].id), "date": "2024-12-01"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["amount"], 70)
+        self.assertEqual(response.data[1]["date"], "2024-12-01")
+        self.assertEqual(
+            list(
+                Expenses.objects.filter(user=self.users[1]).values_list(
+                    "date", flat=True
+                )
+            ),
+            [date(2024, 12, 1)],
+        )
+        summary = self.client.get(
+            "/api/",
+            {
+                "summary": 1,
+                "user_id": str(self.users[1].id),
+                "year": 2024,
+                "month": 12,
+            },
+        )
+        self.assertEqual(summary.data, [{"category": "food", "total_amount": "50.00"}])
+
+    def test_bulk_update_unknown_id(self):
+        response = self.client.patch(
+            "/api/bulk/", [{"id": str(uuid4()), "amount": 70}], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data[0])
+
+    def test_bulk_delete(self):
+        response = self.client.delete(
+            "/api/bulk/",
+            {"ids": [str(expense.id) for expense in self.expenses]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 2})
+        self.assertFalse(Expenses.objects.exists())
+
+    def test_bulk_delete_unknown_id(self):
+        response = self.client.delete(
+            "/api/bulk/",
+            {"ids": [str(self.expenses[0].id), str(uuid4())]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, response.data["ids"])
+        self.assertEqual(Expenses.objects.count(), 2)
+
+
+class ExpensesValuesSerializerTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with a few expenses and an APIClient instance.
+        """
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f'Expense "{day}" – ünïcode',
+                amount=day * 10,
+                date=date(2024, 11, day),
+                category="food",
+            )
+            for day in range(1, 6)
+        )
+        self.client = APIClient()
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_matches_model_serializer_bytes(self):
+        """
+        Test the values-based fast path renders byte-identical JSON to
+        `ExpensesSerializer`.
+        """
+        expenses = Expenses.objects.order_by("date")
+        rows = expenses.values(*ExpensesValuesSerializer.source_fields)
+
+        self.assertEqual(
+            self.render(ExpensesValuesSerializer(rows, many=True).data),
+            self.render(ExpensesSerializer(expenses, many=True).data),
+        )
+
+    def test_list_uses_fast_path(self):
+        """
+        Test the list endpoint output matches `ExpensesSerializer` and does
+        not join the users table.
+        """
+        expected = ExpensesSerializer(Expenses.objects.order_by("date"), many=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/", {"pagination": "cursor", "user_id": str(self.user.id)}
+            )
+
+        self.assertEqual(
+            self.render(response.data["results"]), self.render(expected.data)
+        )
+        self.assertNotIn('"users"', queries[0]["sql"])
+
+    def test_retrieve_uses_fast_path(self):
+        expense = Expenses.objects.first()
+        response = self.client.get(f"/api/{expense.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.content, self.render(ExpensesSerializer(expense).data)
+        )
+
+    def test_retrieve_unknown_expense(self):
+        response = self.client.get(f"/api/{uuid4()}/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExpensesResponseCacheTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with one expense and an APIClient instance.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        self.expense = Expenses.objects.create(
+            user=self.user,
+            title="Groceries",
+            amount=50,
+            date=date(2024, 11, 1),
+            category="food",
+        )
+        self.client = APIClient()
+        self.summary_params = {
+            "summary": 1,
+            "user_id": str(self.user.id),
+            "year": 2024,
+            "month": 11,
+        }
+
+    def test_repeated_request_is_cached(self):
+        """
+        Test a repeated summary is served from the cache with the same `ETag`,
+        whatever the order of its query parameters.
+        """
+        response = self.client.get("/api/", self.summary_params)
+        with self.assertNumQueries(0):
+            cached = self.client.get(
+                "/api/", dict(reversed(list(self.summary_params.items())))
+            )
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_conditional_request_not_modified(self):
+        """
+        Test a request with the current `ETag` gets a `304` without touching
+        the database.
+        """
+        etag = self.client.get("/api/", {"user_id": str(self.user.id)})["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                "/api/", {"user_id": str(self.user.id)}, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_write_invalidates_cached_responses(self):
+        """
+        Test creating, updating and deleting an expense each change the
+        `ETag` and the cached summary.
+        """
+        etags = [self.client.get("/api/", self.summary_params)["ETag"]]
+
+        self.client.post(
+            "/api/",
+            {
+                "user": str(self.user.id),
+                "title": "Dinner",
+                "amount": 30,
+                "date": "2024-11-02",
+                "category": "food",
+            },
+            format="json",
+        )
+        response = self.client.get("/api/", self.summary_params)
+        self.assertEqual(response.data[0]["total_amount"], "80.00")
+        etags.append(response["ETag"])
+
+        self.client.patch(f"/api/{self.expense.id}/", {"title": "Market"})
+        response = self.client.get(
+            "/api/", self.summary_params, HTTP_IF_NONE_MATCH=etags[-1]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etags.append(response["ETag"])
+
+        self.client.delete("/api/bulk/", {"ids": [str(self.expense.id)]}, format="json")
+        response = self.client.get("/api/", self.summary_params)
+        self.assertEqual(response.data[0]["total_amount"], "30.00")
+        etags.append(response["ETag"])
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_queryset_update_invalidates_cached_responses(self):
+        """
+        Test an `update()` that changes no rollup field still changes the
+        `ETag` and the cached list.
+        """
+        params = {"user_id": str(self.user.id)}
+        etag = self.client.get("/api/", params)["ETag"]
+
+        Expenses.objects.filter(pk=self.expense.pk).update(title="Market")
+        response = self.client.get("/api/", params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["results"][0]["title"], "Market")
+
+    def test_invalid_request_is_not_cached(self):
+        response = self.client.get("/api/", {"summary": 1, "user_id": str(uuid4())})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class ExpensesAsyncViewTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with five expenses in November 2024 and an APIClient
+        instance.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=self.user,
+                title=f"Expense {day}",
+                amount=day * 10,
+                date=date(2024, 11, day),
+                category="food" if day % 2 else "travel",
+            )
+            for day in range(1, 6)
+        )
+        self.client = APIClient()
+
+    async def test_list_matches_sync_list(self):
+        """
+        Test the async list pages and renders like the sync keyset-paginated
+        list.
+        """
+        params = {"user_id": str(self.user.id), "page_size": 2}
+        response = await self.async_client.get("/api/async/", params)
+        expected = await sync_to_async(self.client.get)(
+            "/api/", {**params, "pagination": "cursor"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+        self.assertIn("cursor=", response.json()["next"])
+
+        response = await self.async_client.get(response.json()["next"])
+        self.assertEqual(
+            [row["title"] for row in response.json()["results"]],
+            ["Expense 3", "Expense 4"],
+        )
+
+    async def test_summary_matches_sync_summary(self):
+        for params in (
+            {"year": 2024, "month": 11},
+            {"start_date": "2024-11-02", "end_date": "2024-11-04"},
+        ):
+            params = {"summary": 1, "user_id": str(self.user.id), **params}
+            with self.subTest(params=params):
+                response = await self.async_client.get("/api/async/", params)
+                expected = await sync_to_async(self.client.get)("/api/", params)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.content, expected.content)
+
+    async def test_summary_validation_does_not_use_sync_orm(self):
+        """
+        Test the summary is validated with the user looked up asynchronously,
+        without relying on it still being in the in-process cache.
+        """
+        params = {"summary": 1, "user_id": str(self.user.id), "month": 11}
+        with patch.object(
+            UserSelector, "get_user_by_id", side_effect=AssertionError("sync lookup")
+        ):
+            response = await self.async_client.get("/api/async/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = await self.async_client.get(
+                "/api/async/", {**params, "user_id": str(uuid4())}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json()["user_id"], ["User with this ID does not exist."]
+            )
+
+    async def test_invalid_requests(self):
+        response = await self.async_client.get(
+            "/api/async/", {"summary": 1, "user_id": str(uuid4()), "month": 11}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", response.json())
+
+        response = await self.async_client.get(
+            "/api/async/", {"start_date": "not-a-date"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start_date", response.json())
+
+        response = await self.async_client.get("/api/async/", {"cursor": "x"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExpensesAggregateViewSetTest(TestCase):
+    def setUp(self):
+        """
+        Create two users with expenses in November and December 2024.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(2)
+        )
+        for user in self.users:
+            for day, category in ((3, "food"), (20, "food"), (10, "travel")):
+                Expenses.objects.create(
+                    user=user,
+                    title="Expense",
+                    amount=day,
+                    date=date(2024, 11, day),
+                    category=category,
+                )
+            Expenses.objects.create(
+                user=user,
+                title="Expense",
+                amount=40,
+                date=date(2024, 12, 1),
+                category="food",
+            )
+        self.client = APIClient()
+
+    def test_aggregate_by_month_and_category(self):
+        response = self.client.get(
+            "/api/aggregate/",
+            {
+                "start_date": "2024-11-01",
+                "end_date": "2024-12-31",
+                "group_by": "month,category",
+                "metrics": "sum,count,avg",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "columns": {
+                    "month": ["2024-11-01", "2024-11-01", "2024-12-01"],
+                    "category": ["food", "travel", "food"],
+                    "sum": ["46.00", "20.00", "80.00"],
+                    "count": [4, 2, 2],
+                    "avg": ["11.50", "10.00", "40.00"],
+                },
+                "rows": 3,
+            },
+        )
+
+    def test_aggregate_by_week_and_user(self):
+        user = self.users[0]
+        response = self.client.get(
+            "/api/aggregate/",
+            {
+                "user_id": str(user.id),
+                "category": "food",
+                "start_date": "2024-11-02",
+                "end_date": "2024-12-01",
+                "group_by": "user,week",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["columns"],
+            {
+                "user": [str(user.id)] * 3,
+                "week": ["2024-10-28", "2024-11-18", "2024-11-25"],
+                "sum": ["3.00", "20.00", "40.00"],
+                "count": [1, 1, 1],
+            },
+        )
+
+    def test_aggregate_runs_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/aggregate/",
+                {
+                    "start_date": "2024-11-05",
+                    "end_date": "2024-12-31",
+                    "group_by": "day,category,user",
+                },
+            )
+        self.assertEqual(response.data["rows"], 6)
+
+    def test_invalid_aggregate(self):
+        for params, field in (
+            ({"start_date": "2024-11-01"}, "end_date"),
+            (
+                {"start_date": "2024-11-01", "end_date": "2024-11-30", "group_by": "x"},
+                "group_by",
+            ),
+            (
+                {
+                    "start_date": "2024-11-01",
+                    "end_date": "2024-11-30",
+                    "group_by": "day,month",
+                },
+                "group_by",
+            ),
+            (
+                {
+                    "start_date": "2024-11-01",
+                    "end_date": "2024-11-30",
+                    "metrics": "sum,sum",
+                },
+                "metrics",
+            ),
+            ({"start_date": "9999-12-01", "end_date": "9999-12-31"}, "end_date"),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get("/api/aggregate/", params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(field, response.data)
+
+    def test_aggregate_group_limit(self):
+        with patch.object(ExpensesAggregateSerializer, "max_groups", 2):
+            for start_date, group_by in (
+                ("2024-11-29", "day"),
+                ("2024-11-01", "category,user"),
+            ):
+                with self.subTest(group_by=group_by):
+                    response = self.client.get(
+                        "/api/aggregate/",
+                        {
+                            "start_date": start_date,
+                            "end_date": "2024-12-01",
+                            "group_by": group_by,
+                        },
+                    )
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                    self.assertIn("non_field_errors", response.data)
+
+
+class ExpensesBatchSummaryViewSetTest(TestCase):
+    def setUp(self):
+        """
+        Create three users, the first two with November 2024 expenses.
+        """
+        self.users = User.objects.bulk_create(
+            User(id=uuid4(), username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(3)
+        )
+        for amount, user in enumerate(self.users[:2], start=1):
+            for category in ("food", "travel"):
+                Expenses.objects.create(
+                    user=user,
+                    title="Expense",
+                    amount=amount * 10,
+                    date=date(2024, 11, 5),
+                    category=category,
+                )
+        self.client = APIClient()
+
+    def test_summaries(self):
+        """
+        Test the summaries of every user are returned keyed by user ID, with
+        one query to check the users and one to compute the summaries.
+        """
+        for period in (
+            {"year": 2024, "month": 11},
+            {"start_date": "2024-11-01", "end_date": "2024-11-05"},
+        ):
+            with self.subTest(period=period), self.assertNumQueries(2):
+                UserSelector.invalidate_user(self.users[0].id)
+                response = self.client.post(
+                    "/api/summaries/",
+                    {"user_ids": [str(user.id) for user in self.users], **period},
+                    format="json",
+                )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                response.data,
+                {
+                    str(self.users[0].id): [
+                        {"category": "food", "total_amount": "10.00"},
+                        {"category": "travel", "total_amount": "10.00"},
+                    ],
+                    str(self.users[1].id): [
+                        {"category": "food", "total_amount": "20.00"},
+                        {"category": "travel", "total_amount": "20.00"},
+                    ],
+                    str(self.users[2].id): [],
+                },
+            )
+
+    def test_invalid_summaries(self):
+        response = self.client.post(
+            "/api/summaries/",
+            {"user_ids": [str(self.users[0].id), str(uuid4())], "month": 11},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["user_ids"]), [1])
+
+        response = self.client.post(
+            "/api/summaries/", {"user_ids": [str(self.users[0].id)]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+
+class ExpensesTotalsViewSetTest(TestCase):
+    def setUp(self):
+        """
+        Create a user with a food and a travel expense this month and a food
+        expense a year ago.
+        """
+        self.user = User.objects.create(
+            id=uuid4(), username="testuser", email="testuser@example.com"
+        )
+        today = timezone.localdate().replace(day=1)
+        for amount, category, expense_date in (
+            (10, "food", today),
+            (25, "travel", today),
+            (40, "food", today.replace(year=today.year - 1)),
+        ):
+            Expenses.objects.create(
+                user=self.user,
+                title="Expense",
+                amount=amount,
+                date=expense_date,
+                category=category,
+            )
+        self.client = APIClient()
+
+    def test_totals(self):
+        response = self.client.get("/api/totals/", {"user_id": str(self.user.id)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "to_date": {
+                    "total_amount": "75.00",
+                    "count": 3,
+                    "categories": [
+                        {"category": "food", "total_amount": "50.00", "count": 2},
+                        {"category": "travel", "total_amount": "25.00", "count": 1},
+                    ],
+                },
+                "this_month": {
+                    "total_amount": "35.00",
+                    "count": 2,
+                    "categories": [
+                        {"category": "food", "total_amount": "10.00", "count": 1},
+                        {"category": "travel", "total_amount": "25.00", "count": 1},
+                    ],
+                },
+            },
+        )
+
+    def test_totals_follow_writes(self):
+        expense = Expenses.objects.get(amount=40)
+        expense.amount = 100
+        expense.save()
+        Expenses.objects.get(amount=10).delete()
+
+        response = self.client.get("/api/totals/", {"user_id": str(self.user.id)})
+
+        self.assertEqual(response.data["to_date"]["total_amount"], "125.00")
+        self.assertEqual(response.data["this_month"]["count"], 1)
+
+    def test_invalid_user(self):
+        response = self.client.get("/api/totals/", {"user_id": str(uuid4())})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", response.data)
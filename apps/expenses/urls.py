@@ -1,9 +1,14 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .api.viewsets import ExpensesViewSet
+from .api.views import ExpensesAsyncView
+from .api.viewsets import ExpensesBudgetViewSet, ExpensesViewSet
 
 router = DefaultRouter()
+# Registered before the expenses, whose detail route would match `budgets/`.
+router.register(r"budgets", ExpensesBudgetViewSet, basename="budgets")
 router.register(r"", ExpensesViewSet, basename="expenses")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("async/", ExpensesAsyncView.as_view(), name="expenses-async"),
+] + router.urls
@@ -1,10 +1,18 @@
 from django.contrib import admin
 
+from base.admin import EstimatedCountPaginator
+
 from .models import User
 
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ("id", "username", "email")
+    # Prefix matches, served by the `users_username_upper_idx` and
+    # `users_email_upper_idx` indexes. Also used by the expense form's user
+    # autocomplete.
+    search_fields = ("^username", "^email")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(User, UserAdmin)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from base.cache import check_shared_cache
+
+        from . import signals  # noqa: F401
+
+        check_shared_cache("USER_CACHE_ALIAS")
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def add_search_indexes(apps, schema_editor):
+    """
+    Add `UPPER(column) text_pattern_ops` indexes on `username` and `email`,
+    which serve the admin's case-insensitive prefix search
+    (`UPPER(username) LIKE 'ABC%'`) that the unique indexes can not.
+    Operator classes are PostgreSQL-specific.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for column in ("username", "email"):
+            cursor.execute(
+                f"CREATE INDEX users_{column}_upper_idx ON users "
+                f"(UPPER({column}) text_pattern_ops)"
+            )
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for column in ("username", "email"):
+            cursor.execute(f"DROP INDEX users_{column}_upper_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
@@ -12,6 +12,9 @@ class User(BaseModel):
         db_table = "users"
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        # The admin's prefix search is served by `UPPER(...) text_pattern_ops`
+        # indexes on `username` and `email`, created on PostgreSQL by migration
+        # 0003.
 
     def __str__(self):
         return self.username
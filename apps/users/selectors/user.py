@@ -1,10 +1,109 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from base.cache import LocalLRUCache
+
 from ..models import User
 
+_local_users = LocalLRUCache(
+    maxsize=settings.USER_CACHE_LOCAL_MAXSIZE,
+    ttl=settings.USER_CACHE_LOCAL_TTL,
+)
+
 
 class UserSelector:
+    @staticmethod
+    def get_cache_key(user_id):
+        return f"users:user:{user_id}"
+
     @staticmethod
     def get_user_by_id(user_id):
+        """
+        Return the user with the given ID, or `None` if it does not exist.
+
+        Lookups are read through an in-process LRU (`USER_CACHE_LOCAL_*`) and
+        then the `USER_CACHE_ALIAS` cache before querying the database, and
+        are invalidated when a user is saved or deleted. Missing users are not
+        cached: a user created by another process must be found right away,
+        and that process can only invalidate its own LRU.
+        """
         try:
-            return User.objects.get(id=user_id)
-        except User.DoesNotExist:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
             return None
+        key = UserSelector.get_cache_key(user_id)
+
+        user = _local_users.get(key)
+        if user is None:
+            cache = caches[settings.USER_CACHE_ALIAS]
+            user = cache.get(key)
+            if user is None:
+                user = User.objects.filter(id=user_id).first()
+                if user is None:
+                    return None
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+            _local_users.set(key, user)
+        return user
+
+    @staticmethod
+    async def aget_user_by_id(user_id):
+        """
+        Async variant of `get_user_by_id`, sharing its caches.
+        """
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return None
+        key = UserSelector.get_cache_key(user_id)
+
+        user = _local_users.get(key)
+        if user is None:
+            cache = caches[settings.USER_CACHE_ALIAS]
+            user = await cache.aget(key)
+            if user is None:
+                user = await User.objects.filter(id=user_id).afirst()
+                if user is None:
+                    return None
+                await cache.aset(key, user, settings.USER_CACHE_TIMEOUT)
+            _local_users.set(key, user)
+        return user
+
+    @staticmethod
+    def get_existing_user_ids(user_ids):
+        """
+        Return which of the given user IDs exist, querying the database once
+        for those not already cached.
+        """
+        keys = {
+            UserSelector.get_cache_key(user_id): user_id for user_id in set(user_ids)
+        }
+        found = {key: _local_users.get(key) for key in keys}
+        missing = [key for key, user in found.items() if user is None]
+        if missing:
+            cache = caches[settings.USER_CACHE_ALIAS]
+            found.update(cache.get_many(missing))
+            uncached = [keys[key] for key in missing if found.get(key) is None]
+            if uncached:
+                fetched = {
+                    UserSelector.get_cache_key(user.id): user
+                    for user in User.objects.filter(id__in=uncached)
+                }
+                cache.set_many(fetched, settings.USER_CACHE_TIMEOUT)
+                found.update(fetched)
+            for key in missing:
+                if found.get(key) is not None:
+                    _local_users.set(key, found[key])
+        return {keys[key] for key, user in found.items() if user is not None}
+
+    @staticmethod
+    def invalidate_user(user_id):
+        """
+        Drop a user from the caches, e.g. after it was saved or deleted.
+        Other processes' in-process caches expire it after
+        `USER_CACHE_LOCAL_TTL` seconds.
+        """
+        key = UserSelector.get_cache_key(user_id)
+        _local_users.delete(key)
+        caches[settings.USER_CACHE_ALIAS].delete(key)
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .selectors.user import UserSelector
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, using, **kwargs):
+    """
+    Drop the user from the caches right away and again once the transaction
+    commits, so a lookup made in between can't leave the old state cached.
+    """
+    UserSelector.invalidate_user(instance.pk)
+    transaction.on_commit(
+        lambda: UserSelector.invalidate_user(instance.pk), using=using
+    )
@@ -0,0 +1,134 @@
+from uuid import uuid4
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from base.cache import LocalLRUCache, check_shared_cache
+from users.models import User
+from users.selectors.user import UserSelector
+
+
+class UserSelectorCacheTest(TestCase):
+    def setUp(self):
+        """
+        Create a test user.
+        """
+        self.user = User.objects.create(
+            id=uuid4(),
+            username="testuser",
+            email="testuser@example.com",
+        )
+
+    def test_get_user_by_id_is_cached(self):
+        """
+        Test a repeated lookup is served without querying the database.
+        """
+        self.assertEqual(UserSelector.get_user_by_id(self.user.id), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(UserSelector.get_user_by_id(str(self.user.id)), self.user)
+
+    def test_get_user_by_id_does_not_cache_missing_users(self):
+        """
+        Test an unknown ID is found as soon as the user exists, even when no
+        invalidation reached this process (`bulk_create` sends no signals).
+        """
+        user_id = uuid4()
+        self.assertIsNone(UserSelector.get_user_by_id(user_id))
+        self.assertEqual(UserSelector.get_existing_user_ids([user_id]), set())
+
+        User.objects.bulk_create(
+            [User(id=user_id, username="new", email="new@example.com")]
+        )
+        self.assertEqual(UserSelector.get_user_by_id(user_id).username, "new")
+        self.assertEqual(UserSelector.get_existing_user_ids([user_id]), {user_id})
+
+    def test_get_user_by_id_invalid_id(self):
+        """
+        Test an ID that is not a UUID is reported as missing.
+        """
+        with self.assertNumQueries(0):
+            self.assertIsNone(UserSelector.get_user_by_id("not-a-uuid"))
+
+    def test_cache_invalidated_on_save(self):
+        """
+        Test saving a user replaces the cached copy.
+        """
+        UserSelector.get_user_by_id(self.user.id)
+        self.user.username = "renamed"
+        self.user.save()
+
+        self.assertEqual(UserSelector.get_user_by_id(self.user.id).username, "renamed")
+
+    def test_cache_invalidated_on_delete(self):
+        """
+        Test a deleted user is no longer returned.
+        """
+        UserSelector.get_user_by_id(self.user.id)
+        user_id = self.user.id
+        self.user.delete()
+
+        self.assertIsNone(UserSelector.get_user_by_id(user_id))
+
+    def test_get_existing_user_ids(self):
+        """
+        Test existing IDs are returned, and only uncached IDs are queried.
+        """
+        missing_id = uuid4()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                UserSelector.get_existing_user_ids([self.user.id, missing_id]),
+                {self.user.id},
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                UserSelector.get_existing_user_ids([self.user.id]), {self.user.id}
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(UserSelector.get_user_by_id(self.user.id), self.user)
+
+
+class CheckSharedCacheTest(SimpleTestCase):
+    @override_settings(
+        CACHES={
+            "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {"BACKEND": "django.core.cache.backends.redis.RedisCache"},
+        }
+    )
+    def test_requires_shared_cache_without_debug(self):
+        with self.settings(USER_CACHE_ALIAS="local", DEBUG=False):
+            with self.assertRaisesMessage(ImproperlyConfigured, "USER_CACHE_ALIAS"):
+                check_shared_cache("USER_CACHE_ALIAS")
+        with self.settings(USER_CACHE_ALIAS="local", DEBUG=True):
+            check_shared_cache("USER_CACHE_ALIAS")
+        with self.settings(USER_CACHE_ALIAS="shared", DEBUG=False):
+            check_shared_cache("USER_CACHE_ALIAS")
+
+
+class LocalLRUCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """
+        Test the least recently read entry is evicted first.
+        """
+        cache = LocalLRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        """
+        Test entries are dropped once their TTL has passed.
+        """
+        cache = LocalLRUCache(maxsize=2, ttl=5)
+        with mock.patch("base.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with mock.patch("base.cache.time.monotonic", return_value=104):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("base.cache.time.monotonic", return_value=106):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)